@@ -7,128 +7,68 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import pandas as pd
-import numpy as np
 import warnings
+from dataclasses import replace
 warnings.filterwarnings('ignore')
 
 from data.download_data import get_sp500_tickers, download_stock_data
 from strategies.momentum import MomentumStrategy, MomentumConfig
+from strategies.sizing import resolve_sizer
+from strategies.trade_log import replay_trade_log, value_metrics, sweep_frame
+from strategies.cost_models import EXAMPLE_SCHEDULES, as_cost_model
 
 
-def run_backtest_with_costs(prices, config, transaction_cost_pct=0.0, verbose=False):
+def run_fee_sweep(prices, config, fee_rates, recorded=None, universe=None):
     """
-    Execute le backtest avec prise en compte des frais de transaction
-    """
-    all_stocks = prices.columns.tolist()
-    
-    lookback_days = config.lookback_months * 21
-    n_stocks = min(config.n_stocks, len(all_stocks))
-    init_cash = config.init_cash
-    
-    # Generer les dates de rebalancement
-    if config.rebalancing_freq == 'M':
-        dates = pd.date_range(start=prices.index[0], end=prices.index[-1], freq='MS')
-    else:
-        dates = pd.date_range(start=prices.index[0], end=prices.index[-1], freq='QS')
-    
-    rebalance_dates = prices.index[prices.index.isin(dates)]
-    if len(rebalance_dates) < 2:
-        interval = 63 if config.rebalancing_freq == 'Q' else 21
-        rebalance_dates = prices.index[::interval]
-    
-    cash = init_cash
-    holdings = {stock: 0 for stock in all_stocks}
-    current_portfolio = []
-    portfolio_values = []
-    total_fees_paid = 0
-    n_transactions = 0
-    
-    for i, date in enumerate(rebalance_dates):
-        if date not in prices.index:
-            continue
-        
-        current_prices = prices.loc[date]
-        
-        # Calculer la valeur du portefeuille
-        portfolio_value = cash
-        for stock, qty in holdings.items():
-            if qty > 0 and stock in current_prices.index and not pd.isna(current_prices[stock]):
-                portfolio_value += qty * current_prices[stock]
-        
-        portfolio_values.append({'date': date, 'value': portfolio_value})
-        
-        hist_prices = prices.loc[:date]
-        
-        if len(hist_prices) >= lookback_days:
-            # Calculer momentum
-            start_prices = hist_prices.iloc[-lookback_days]
-            end_prices = hist_prices.iloc[-1]
-            momentum = ((end_prices - start_prices) / start_prices).fillna(-np.inf)
-            valid_momentum = momentum[momentum != -np.inf]
-            
-            if len(valid_momentum) >= n_stocks:
-                top_stocks = valid_momentum.nlargest(n_stocks).index.tolist()
-                
-                # Transactions
-                stocks_to_buy = [s for s in top_stocks if s not in current_portfolio]
-                stocks_to_sell = [s for s in current_portfolio if s not in top_stocks]
-                
-                # Vendre avec frais
-                for stock in stocks_to_sell:
-                    if holdings[stock] > 0 and stock in current_prices.index:
-                        sale_value = holdings[stock] * current_prices[stock]
-                        fees = sale_value * transaction_cost_pct
-                        cash += sale_value - fees
-                        total_fees_paid += fees
-                        holdings[stock] = 0
-                        n_transactions += 1
-                
-                # Acheter avec frais
-                if stocks_to_buy:
-                    allocation_per_stock = cash / len(stocks_to_buy)
-                    for stock in stocks_to_buy:
-                        if stock in current_prices.index and current_prices[stock] > 0:
-                            gross_qty = int(allocation_per_stock / current_prices[stock])
-                            if gross_qty > 0:
-                                gross_cost = gross_qty * current_prices[stock]
-                                fees = gross_cost * transaction_cost_pct
-                                net_cost = gross_cost + fees
-                                if net_cost <= cash:
-                                    qty = gross_qty
-                                    holdings[stock] = qty
-                                    cash -= net_cost
-                                    total_fees_paid += fees
-                                    n_transactions += 1
-                
-                current_portfolio = top_stocks
+    Evalue plusieurs niveaux de frais a partir d'un seul journal d'ordres
+    fee_rates: taux ou CostModel par niveau (strategies/cost_models.py)
+    recorded: (log, values) de MomentumStrategy.record_trade_log, pour
+              reutiliser un journal deja enregistre
     
-    # Metriques finales
-    final_value = portfolio_values[-1]['value'] if portfolio_values else init_cash
-    total_return = (final_value - init_cash) / init_cash * 100
+    Les achats restent finances (frais compris), comme dans run_backtest_with_costs.
     
-    values_df = pd.DataFrame(portfolio_values).set_index('date')
-    returns = values_df['value'].pct_change().dropna()
+    Returns:
+        DataFrame avec une ligne par taux de frais
+    """
+    log, values = recorded or MomentumStrategy(config).record_trade_log(prices, universe)
     
-    if len(returns) > 1 and returns.std() > 0:
-        sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252)
-        cummax = values_df['value'].cummax()
-        drawdown = (values_df['value'] - cummax) / cummax
-        max_drawdown = drawdown.min() * 100
-        volatility = returns.std() * np.sqrt(252) * 100
-    else:
-        sharpe_ratio = 0
-        max_drawdown = 0
-        volatility = 0
+    sizer, lots = resolve_sizer(config.sizer, prices.columns)
+    replay = replay_trade_log(log, values, fee_rates, config.init_cash, check_cash=True, sizer=sizer, lots=lots)
+    metrics = value_metrics(replay['values_before'], config.init_cash)
+    return sweep_frame(replay, metrics)
+
+
+def run_backtest_with_costs(prices, config, transaction_cost_pct=0.0, verbose=False, universe=None):
+    """
+    Execute le backtest avec prise en compte des frais de transaction
+    (rejeu du journal de MomentumStrategy; avec weight_tolerance, les
+    redimensionnements partiels passent par run_backtest_simple)
+    """
+    if config.weight_tolerance is not None:
+        result = MomentumStrategy(replace(config, cost_model=as_cost_model(transaction_cost_pct))) \
+            .run_backtest_simple(prices, verbose, universe)
+        result['total_fees_paid'] = result.pop('total_fees')
+        return result
+    
+    log, values = MomentumStrategy(config).record_trade_log(prices, universe)
+    sizer, lots = resolve_sizer(config.sizer, prices.columns)
+    replay = replay_trade_log(log, values, [transaction_cost_pct], config.init_cash, check_cash=True,
+                              sizer=sizer, lots=lots)
+    metrics = {name: metric[0] for name, metric in
+               value_metrics(replay['values_before'], config.init_cash).items()}
+    
+    portfolio_values = [{'date': date, 'value': value}
+                        for date, value in zip(log.dates, replay['values_before'][:, 0])]
     
     return {
-        'total_return': total_return,
-        'sharpe_ratio': sharpe_ratio,
-        'max_drawdown': max_drawdown,
-        'volatility': volatility,
-        'final_value': final_value,
-        'initial_value': init_cash,
-        'n_transactions': n_transactions,
-        'total_fees_paid': total_fees_paid,
+        'total_return': metrics['total_return'],
+        'sharpe_ratio': metrics['sharpe_ratio'],
+        'max_drawdown': metrics['max_drawdown'],
+        'volatility': metrics['volatility'],
+        'final_value': metrics['final_value'],
+        'initial_value': config.init_cash,
+        'n_transactions': int(replay['n_transactions'][0]),
+        'total_fees_paid': replay['total_fees'][0],
         'portfolio_values': portfolio_values
     }
 
@@ -138,13 +78,7 @@ def run_monte_carlo_with_costs(prices, config, n_simulations=30, transaction_cos
     results = []
     
     for i in range(n_simulations):
-        sim_config = MomentumConfig(
-            n_stocks=config.n_stocks,
-            lookback_months=config.lookback_months,
-            rebalancing_freq=config.rebalancing_freq,
-            init_cash=config.init_cash,
-            seed=i
-        )
+        sim_config = replace(config, seed=i)
         
         result = run_backtest_with_costs(prices, sim_config, transaction_cost_pct, verbose=False)
         
@@ -205,23 +139,21 @@ def main():
         (0.01, "1.0%")
     ]
     
+    # Le momentum est deterministe (la graine n'intervient pas): un seul journal
+    # d'ordres suffit pour tous les niveaux de frais
+    recorded = MomentumStrategy(config).record_trade_log(prices)
+    sweep = run_fee_sweep(prices, config, [fee_pct for fee_pct, _ in fee_levels], recorded=recorded)
+    
     results_summary = []
     
-    for fee_pct, fee_label in fee_levels:
+    for (fee_pct, fee_label), (_, level) in zip(fee_levels, sweep.iterrows()):
         print(f"\n[Frais: {fee_label} par transaction]")
         
-        mc_results = run_monte_carlo_with_costs(
-            prices=prices,
-            config=config,
-            n_simulations=30,
-            transaction_cost_pct=fee_pct
-        )
-        
-        mean_return = mc_results['total_return'].mean()
-        mean_sharpe = mc_results['sharpe_ratio'].mean()
-        mean_dd = mc_results['max_drawdown'].mean()
-        mean_txn = mc_results['n_transactions'].mean()
-        mean_fees = mc_results['total_fees_paid'].mean()
+        mean_return = level['total_return']
+        mean_sharpe = level['sharpe_ratio']
+        mean_dd = level['max_drawdown']
+        mean_txn = level['n_transactions']
+        mean_fees = level['total_fees']
         outperf = mean_return - benchmark_return
         
         results_summary.append({
@@ -276,17 +208,37 @@ def main():
     else:
         print("\nSurperformance negative meme sans frais")
     
+    # Baremes non proportionnels (minimum par ordre, paliers, spread, taxe)
+    print("\n[4b] BAREMES DE COURTAGE")
+    print("="*70)
+    schedules = run_fee_sweep(prices, config, list(EXAMPLE_SCHEDULES.values()), recorded=recorded)
+    for name, (_, level) in zip(EXAMPLE_SCHEDULES, schedules.iterrows()):
+        print(f"  {name:<34} Return: {level['total_return']:7.1f}%  "
+              f"Frais: ${level['total_fees']:>8,.0f}  "
+              f"Surperf: {level['total_return'] - benchmark_return:+7.1f}%")
+
+    # Bandes de conservation: moins de rotation, donc moins de frais
+    print("\n[4c] BANDES DE CONSERVATION (frais 0.5%)")
+    print("="*70)
+    for buffer in [0, 5, 10, 20]:
+        buffered_config = MomentumConfig(n_stocks=config.n_stocks, lookback_months=config.lookback_months,
+                                         rebalancing_freq=config.rebalancing_freq,
+                                         init_cash=config.init_cash, rank_buffer=buffer)
+        level = run_fee_sweep(prices, buffered_config, [0.005]).iloc[0]
+        print(f"  Buffer {buffer:>2} rangs -> Return: {level['total_return']:7.1f}%  "
+              f"Txns: {level['n_transactions']:4.0f}  Frais: ${level['total_fees']:>8,.0f}")
+
     # Comparaison avec config de base (20, 12, M)
     print("\n[5] COMPARAISON AVEC CONFIGURATION DE BASE")
     print("="*70)
     print("\nConfiguration de base (20 actions, 12 mois, Mensuel):")
     
     base_config = MomentumConfig(n_stocks=20, lookback_months=12, rebalancing_freq='M')
-    base_results = run_monte_carlo_with_costs(prices, base_config, n_simulations=30, transaction_cost_pct=0.005)
+    base_results = run_fee_sweep(prices, base_config, [0.005]).iloc[0]
     
-    base_return = base_results['total_return'].mean()
-    base_sharpe = base_results['sharpe_ratio'].mean()
-    base_txn = base_results['n_transactions'].mean()
+    base_return = base_results['total_return']
+    base_sharpe = base_results['sharpe_ratio']
+    base_txn = base_results['n_transactions']
     base_outperf = base_return - benchmark_return
     
     print(f"  Avec 0.5% de frais:")
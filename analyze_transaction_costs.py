@@ -12,7 +12,11 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from data.download_data import get_sp500_tickers, download_stock_data
-from strategies.random_stoploss import StrategyConfig
+from strategies.random_stoploss import StrategyConfig, RandomStopLossStrategy
+from strategies.profiling import profiler
+from strategies.cost_models import describe_cost
+from strategies.sizing import resolve_sizer
+from strategies.trade_log import replay_trade_log, value_metrics, sweep_frame
 
 
 class TransactionCostAnalyzer:
@@ -22,177 +26,92 @@ class TransactionCostAnalyzer:
         """
         Args:
             transaction_cost_pct: Cout par transaction (0.001 = 0.1%)
+                                  ou CostModel (strategies/cost_models.py)
         """
         self.config = config
         self.transaction_cost_pct = transaction_cost_pct
         
+    def record_trade_log(self, prices):
+        """
+        Enregistre les ordres d'une simulation (une passe, independante des frais)
+        Meme selection que RandomStopLossStrategy (graine de la configuration comprise).
+        """
+        return RandomStopLossStrategy(self.config).record_trade_log(prices)
+    
+    def run_fee_sweep(self, prices, fee_rates, log=None):
+        """
+        Evalue plusieurs niveaux de frais sur les memes ordres (une seule simulation)
+        fee_rates: taux ou CostModel par niveau
+        
+        Returns:
+            DataFrame avec une ligne par taux de frais
+        """
+        if log is None:
+            log, values = self.record_trade_log(prices)
+        else:
+            values = prices.to_numpy(dtype=float)
+        
+        sizer, lots = resolve_sizer(self.config.sizer, prices.columns)
+        replay = replay_trade_log(log, values, fee_rates, self.config.init_cash, sizer=sizer, lots=lots)
+        metrics = value_metrics(replay['values_after'], self.config.init_cash)
+        sweep = sweep_frame(replay, metrics)
+        
+        # Valeur avant le dernier rebalancement (reference 'sans frais' historique)
+        final_no_fees = replay['values_before'][-1] if len(log) else np.full(len(sweep), self.config.init_cash)
+        sweep['final_value_no_fees'] = final_no_fees
+        sweep['total_return_no_fees'] = (final_no_fees - self.config.init_cash) / self.config.init_cash * 100
+        sweep['impact_fees_pct'] = sweep['total_return_no_fees'] - sweep['total_return']
+        return sweep
+        
     def run_backtest_with_costs(self, prices, verbose=False):
         """
         Backtest avec prise en compte des frais de transaction
         """
         all_stocks = prices.columns.tolist()
-        lookback_days = self.config.lookback_months * 21
-        n_stocks = self.config.n_stocks
         init_cash = self.config.init_cash
         
-        # Dates de rebalancement
-        rebalance_dates = pd.date_range(start=prices.index[0], 
-                                       end=prices.index[-1], 
-                                       freq='MS')
-        rebalance_dates = prices.index[prices.index.isin(rebalance_dates)]
-        
-        if len(rebalance_dates) < 2:
-            rebalance_dates = prices.index[::21]
-        
-        # Suivi des transactions
-        transactions_count = 0
-        buy_volume = 0
-        sell_volume = 0
-        total_fees = 0
-        
-        # Initialisation
-        current_portfolio = np.random.choice(all_stocks, size=n_stocks, replace=False).tolist()
-        cash = init_cash
-        holdings = {stock: 0 for stock in all_stocks}
-        portfolio_values = []
-        portfolio_history = []
+        log, values = self.record_trade_log(prices)
+        sizer, lots = resolve_sizer(self.config.sizer, all_stocks)
+        replay = replay_trade_log(log, values, [self.transaction_cost_pct], init_cash, sizer=sizer, lots=lots)
+        profiler.count('costs.trades', int(replay['n_transactions'][0]))
         
-        for i, date in enumerate(rebalance_dates):
-            if date not in prices.index:
-                continue
-                
-            current_prices = prices.loc[date]
-            
-            # Valeur avant rebalancement
-            portfolio_value_before = cash
-            for stock, qty in holdings.items():
-                if qty > 0 and stock in current_prices.index:
-                    portfolio_value_before += qty * current_prices[stock]
-            
-            actions_sold = []
-            actions_bought = []
+        # Calculer les metriques
+        with profiler.phase('costs.metrics'):
+            metrics = value_metrics(replay['values_after'], init_cash)
+            final_value = metrics['final_value'][0]
+            final_value_no_fees = replay['values_before'][-1, 0] if len(log) else init_cash
             
-            if i == 0:
-                # Premier achat
-                allocation_per_stock = init_cash / n_stocks
-                for stock in current_portfolio:
-                    if stock in current_prices.index and current_prices[stock] > 0:
-                        qty = int(allocation_per_stock / current_prices[stock])
-                        if qty > 0:
-                            cost = qty * current_prices[stock]
-                            fee = cost * self.transaction_cost_pct
-                            holdings[stock] = qty
-                            cash -= (cost + fee)
-                            buy_volume += cost
-                            total_fees += fee
-                            transactions_count += 1
-                            actions_bought.append(stock)
-            else:
-                # Verifier les actions a evincer
-                hist_prices = prices.loc[:date]
-                
-                if len(hist_prices) >= lookback_days:
-                    # Calculer les performances
-                    recent_prices = hist_prices.iloc[-lookback_days:]
-                    performances = (recent_prices.iloc[-1] - recent_prices.iloc[0]) / recent_prices.iloc[0]
-                    
-                    stocks_to_evict = []
-                    for stock in current_portfolio:
-                        if stock in performances.index:
-                            if performances[stock] < self.config.stop_loss_threshold:
-                                stocks_to_evict.append(stock)
-                    
-                    if len(stocks_to_evict) > 0:
-                        # Vendre les actions evincees
-                        for stock in stocks_to_evict:
-                            if holdings[stock] > 0 and stock in current_prices.index:
-                                sale_value = holdings[stock] * current_prices[stock]
-                                fee = sale_value * self.transaction_cost_pct
-                                cash += (sale_value - fee)
-                                sell_volume += sale_value
-                                total_fees += fee
-                                holdings[stock] = 0
-                                transactions_count += 1
-                                actions_sold.append(stock)
-                        
-                        # Acheter de nouvelles actions
-                        available = [s for s in all_stocks if s not in current_portfolio]
-                        n_to_add = len(stocks_to_evict)
-                        
-                        if len(available) >= n_to_add and n_to_add > 0:
-                            new_stocks = np.random.choice(available, size=n_to_add, replace=False).tolist()
-                            
-                            # Mettre a jour le portefeuille
-                            for old_stock in stocks_to_evict:
-                                current_portfolio.remove(old_stock)
-                            current_portfolio.extend(new_stocks)
-                            
-                            # Acheter
-                            allocation_per_stock = cash / n_to_add
-                            for stock in new_stocks:
-                                if stock in current_prices.index and current_prices[stock] > 0:
-                                    qty = int(allocation_per_stock / current_prices[stock])
-                                    if qty > 0:
-                                        cost = qty * current_prices[stock]
-                                        fee = cost * self.transaction_cost_pct
-                                        holdings[stock] = qty
-                                        cash -= (cost + fee)
-                                        buy_volume += cost
-                                        total_fees += fee
-                                        transactions_count += 1
-                                        actions_bought.append(stock)
+            total_return = metrics['total_return'][0]
+            total_return_no_fees = (final_value_no_fees - init_cash) / init_cash * 100
             
-            # Valeur apres rebalancement
-            portfolio_value_after = cash
-            for stock, qty in holdings.items():
-                if qty > 0 and stock in current_prices.index:
-                    portfolio_value_after += qty * current_prices[stock]
+            portfolio_values = [{'date': date, 'value': after, 'value_no_fees': before}
+                                for date, after, before in zip(log.dates,
+                                                               replay['values_after'][:, 0],
+                                                               replay['values_before'][:, 0])]
             
-            portfolio_values.append({
-                'date': date, 
-                'value': portfolio_value_after,
-                'value_no_fees': portfolio_value_before
-            })
-            
-            portfolio_history.append({
-                'date': date,
-                'portfolio': current_portfolio.copy(),
-                'actions_sold': actions_sold,
-                'actions_bought': actions_bought,
-                'n_transactions': len(actions_sold) + len(actions_bought)
-            })
-        
-        # Calculer les metriques
-        final_value = portfolio_values[-1]['value'] if portfolio_values else init_cash
-        final_value_no_fees = portfolio_values[-1]['value_no_fees'] if portfolio_values else init_cash
-        
-        total_return = (final_value - init_cash) / init_cash * 100
-        total_return_no_fees = (final_value_no_fees - init_cash) / init_cash * 100
-        
-        # Calculer le Sharpe
-        values_df = pd.DataFrame(portfolio_values).set_index('date')
-        returns = values_df['value'].pct_change().dropna()
-        
-        if len(returns) > 1 and returns.std() > 0:
-            sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252)
-            cummax = values_df['value'].cummax()
-            drawdown = (values_df['value'] - cummax) / cummax
-            max_drawdown = drawdown.min() * 100
-        else:
-            sharpe_ratio = 0
-            max_drawdown = 0
+            portfolio_history = []
+            for k, date in enumerate(log.dates):
+                sells = log.sells(k)[replay['sell_executed'][k][:, 0]]
+                buys = log.buys(k)[replay['buy_executed'][k][:, 0]]
+                portfolio_history.append({
+                    'date': date,
+                    'portfolio': [all_stocks[j] for j in log.portfolios[k]],
+                    'actions_sold': [all_stocks[j] for j in sells],
+                    'actions_bought': [all_stocks[j] for j in buys],
+                    'n_transactions': len(sells) + len(buys)
+                })
         
         return {
             'total_return': total_return,
             'total_return_no_fees': total_return_no_fees,
-            'sharpe_ratio': sharpe_ratio,
-            'max_drawdown': max_drawdown,
+            'sharpe_ratio': metrics['sharpe_ratio'][0],
+            'max_drawdown': metrics['max_drawdown'][0],
             'final_value': final_value,
             'final_value_no_fees': final_value_no_fees,
-            'total_fees': total_fees,
-            'transactions_count': transactions_count,
-            'buy_volume': buy_volume,
-            'sell_volume': sell_volume,
+            'total_fees': replay['total_fees'][0],
+            'transactions_count': int(replay['n_transactions'][0]),
+            'buy_volume': replay['buy_volume'][0],
+            'sell_volume': replay['sell_volume'][0],
             'portfolio_values': portfolio_values,
             'portfolio_history': portfolio_history,
             'impact_fees_pct': total_return_no_fees - total_return
@@ -205,7 +124,7 @@ def run_monte_carlo_with_costs(prices, config, n_simulations=50, transaction_cos
     """
     results = []
     
-    print(f"Simulations avec frais de {transaction_cost_pct*100:.2f}% par transaction...")
+    print(f"Simulations avec frais de {describe_cost(transaction_cost_pct)} par transaction...")
     
     for i in range(n_simulations):
         if (i + 1) % 10 == 0:
@@ -216,7 +135,8 @@ def run_monte_carlo_with_costs(prices, config, n_simulations=50, transaction_cos
             lookback_months=config.lookback_months,
             stop_loss_threshold=config.stop_loss_threshold,
             init_cash=100_000,
-            seed=i
+            seed=i,
+            sizer=config.sizer
         )
         
         analyzer = TransactionCostAnalyzer(sim_config, transaction_cost_pct)
@@ -240,6 +160,40 @@ def run_monte_carlo_with_costs(prices, config, n_simulations=50, transaction_cos
     return pd.DataFrame(results)
 
 
+def run_monte_carlo_fee_sweep(prices, config, fee_rates, n_simulations=50):
+    """
+    Monte Carlo sur plusieurs niveaux de frais: chaque simulation tire ses
+    portefeuilles une fois, puis tous les niveaux sont rejoues sur les memes ordres
+    
+    Returns:
+        DataFrame avec une ligne par (simulation, taux de frais)
+    """
+    results = []
+    
+    print(f"Simulations pour {len(fee_rates)} niveaux de frais...")
+    
+    for i in range(n_simulations):
+        if (i + 1) % 10 == 0:
+            print(f"  Simulation {i + 1}/{n_simulations}")
+        
+        sim_config = StrategyConfig(
+            n_stocks=config.n_stocks,
+            lookback_months=config.lookback_months,
+            stop_loss_threshold=config.stop_loss_threshold,
+            init_cash=100_000,
+            seed=i,
+            sizer=config.sizer
+        )
+        
+        sweep = TransactionCostAnalyzer(sim_config).run_fee_sweep(prices, fee_rates)
+        sweep.insert(0, 'simulation', i + 1)
+        sweep.insert(1, 'seed', i)
+        results.append(sweep)
+    
+    results = pd.concat(results, ignore_index=True)
+    return results.rename(columns={'n_transactions': 'transactions_count'})
+
+
 def main():
     print("="*70)
     print("ANALYSE DE L'IMPACT DES FRAIS DE TRANSACTION")
@@ -248,7 +202,8 @@ def main():
     # 1. Charger les donnees
     print("\n[ETAPE 1] Chargement des donnees")
     tickers = get_sp500_tickers(100)
-    prices = download_stock_data(tickers, start_date='2018-01-01', end_date='2024-12-31')
+    with profiler.phase('data_load'):
+        prices = download_stock_data(tickers, start_date='2018-01-01', end_date='2024-12-31')
     
     # 2. Configurations a tester
     configs = {
@@ -273,15 +228,18 @@ def main():
         print(f"Configuration: {config_name}")
         print(f"{'='*70}")
         
-        for fee_label, fee_pct in fee_levels:
-            print(f"\n  Frais: {fee_label}")
-            
-            mc_results = run_monte_carlo_with_costs(
+        # Une seule serie de simulations pour tous les niveaux de frais
+        with profiler.phase('monte_carlo'):
+            sweep_results = run_monte_carlo_fee_sweep(
                 prices=prices,
                 config=config,
-                n_simulations=30,
-                transaction_cost_pct=fee_pct
+                fee_rates=[fee_pct for _, fee_pct in fee_levels],
+                n_simulations=30
             )
+        
+        for fee_label, fee_pct in fee_levels:
+            print(f"\n  Frais: {fee_label}")
+            mc_results = sweep_results[sweep_results['fee_pct'] == fee_pct]
             
             result_summary = {
                 'config': config_name,
@@ -359,8 +317,9 @@ def main():
         ax4.legend()
         ax4.grid(True, alpha=0.3)
     
-    plt.tight_layout()
-    plt.savefig('charts/transaction_costs_impact.png', dpi=150, bbox_inches='tight')
+    with profiler.phase('charts'):
+        plt.tight_layout()
+        plt.savefig('charts/transaction_costs_impact.png', dpi=150, bbox_inches='tight')
     print("  Sauvegarde: charts/transaction_costs_impact.png")
     
     # 7. Analyse de la surperformance
@@ -405,6 +364,11 @@ def main():
     print("ANALYSE TERMINEE")
     print("="*70)
     
+    # Profil d'execution (WORKSHOP_PROFILE=1)
+    if profiler.enabled:
+        profiler.report()
+        profiler.to_json('data/profile_transaction_costs.json')
+    
     return results_df
 
 
@@ -0,0 +1,85 @@
+"""
+Alignement de plusieurs marches sur un calendrier commun
+
+Les index sont des jours de seance normalises (data/price_store.py): un
+meme jour a la meme valeur int64 quel que soit le marche, l'alignement se
+fait sur les entiers (union / intersection triees puis searchsorted), sans
+comparaison de dates texte ni de fuseaux.
+
+    us = open_price_store('data/stock_prices.csv').load()
+    eu = open_price_store('data/european_prices_extended.csv').load()
+    prices = align_markets({'US': us, 'EU': eu}, how='union', ffill_limit=3)
+
+Union: un marche ferme un jour ou l'autre est ouvert reprend son dernier prix
+pendant au plus ffill_limit seances du calendrier commun (NaN au-dela, et
+avant sa premiere cotation). Intersection: seuls les jours ouverts partout.
+"""
+from functools import reduce
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+from data.price_store import normalize_index
+
+
+CALENDARS = ('union', 'intersection')
+
+
+def common_calendar(indices, how: str = 'union') -> pd.DatetimeIndex:
+    """Calendrier commun (jours de seance tries) de plusieurs index"""
+    if how not in CALENDARS:
+        raise ValueError(f"Calendrier inconnu: {how} (disponibles: {', '.join(CALENDARS)})")
+    days = [normalize_index(index).asi8 for index in indices]
+    combine = np.union1d if how == 'union' else np.intersect1d
+    merged = reduce(combine, days) if days else np.empty(0, dtype=np.int64)
+    return pd.DatetimeIndex(merged.view('datetime64[ns]'), name='Date')
+
+
+def reindex_sessions(prices: pd.DataFrame, calendar: pd.DatetimeIndex, ffill_limit: int = 5) -> pd.DataFrame:
+    """
+    Prix d'un marche sur un calendrier: ligne du jour s'il cote, sinon sa
+    derniere ligne si elle date d'au plus ffill_limit seances du calendrier
+
+    Les NaN propres au marche (action non cotee un jour ouvert) sont conserves.
+    """
+    days = normalize_index(prices.index).asi8
+    if not np.all(days[1:] > days[:-1]):
+        raise ValueError("Index non trie ou avec des seances en double")
+    target = calendar.asi8
+    # Derniere ligne du marche a la date du calendrier ou avant
+    rows = np.searchsorted(days, target, side='right') - 1
+    present = np.zeros(len(target), dtype=bool)
+    present[rows >= 0] = days[rows[rows >= 0]] == target[rows >= 0]
+    # Position dans le calendrier du dernier jour ou le marche a cote
+    positions = np.arange(len(target))
+    last_present = np.maximum.accumulate(np.where(present, positions, -1))
+    valid = (rows >= 0) & (last_present >= 0) & (positions - last_present <= ffill_limit)
+
+    values = prices.to_numpy(dtype=np.float64)
+    aligned = np.full((len(target), values.shape[1]), np.nan)
+    aligned[valid] = values[rows[valid]]
+    return pd.DataFrame(aligned, index=calendar, columns=prices.columns)
+
+
+def align_markets(markets: Dict[str, pd.DataFrame], how: str = 'union', ffill_limit: int = 5) -> pd.DataFrame:
+    """
+    Matrice de prix unique de plusieurs marches sur leur calendrier commun
+
+    Args:
+        markets: {nom du marche: prix (jours x actions)}
+        how: 'union' (tous les jours de seance) ou 'intersection' (jours communs)
+        ffill_limit: seances maximales reprenant le dernier prix d'un marche ferme
+
+    Returns:
+        DataFrame (calendrier x actions de tous les marches, dans l'ordre)
+    """
+    columns = [column for prices in markets.values() for column in prices.columns]
+    duplicates = pd.Index(columns)[pd.Index(columns).duplicated()]
+    if len(duplicates) > 0:
+        raise ValueError(f"Actions presentes dans plusieurs marches: {', '.join(map(str, duplicates[:5]))}")
+    calendar = common_calendar([prices.index for prices in markets.values()], how)
+    aligned = [reindex_sessions(prices, calendar, ffill_limit) for prices in markets.values()]
+    if not aligned:
+        return pd.DataFrame(index=calendar)
+    return pd.concat(aligned, axis=1)
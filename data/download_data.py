@@ -5,6 +5,11 @@ import yfinance as yf
 import pandas as pd
 from typing import List
 import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.price_store import normalize_index
+from data.quality import load_clean_prices
 
 
 def get_sp500_tickers(n: int = 100) -> List[str]:
@@ -30,16 +35,25 @@ def get_sp500_tickers(n: int = 100) -> List[str]:
 def download_stock_data(tickers: List[str], 
                        start_date: str = '2018-01-01',
                        end_date: str = '2024-12-31',
-                       cache_dir: str = 'data') -> pd.DataFrame:
+                       cache_dir: str = 'data',
+                       min_coverage: float = 0.8) -> pd.DataFrame:
     """
     Telecharge les donnees de prix pour une liste de tickers
+    
+    min_coverage: part minimale de jours cotes pour garder une action.
+    Mettre 0 pour un univers point-in-time (data/universe.py): les actions
+    introduites ou radiees en cours de periode sont conservees.
+    
+    Le cache garde les prix bruts; le controle qualite (data/quality.py) est
+    fait une fois a la premiere lecture et mis en cache avec le store.
     """
     cache_file = os.path.join(cache_dir, 'stock_prices.csv')
+    store_dir = os.path.join(cache_dir, 'store')
     
     # Verifier si les donnees sont en cache
     if os.path.exists(cache_file):
         print(f"Chargement des donnees depuis le cache: {cache_file}")
-        return pd.read_csv(cache_file, index_col=0, parse_dates=True)
+        return load_clean_prices(cache_file, min_coverage, store_dir=store_dir)
     
     print(f"Telechargement des donnees pour {len(tickers)} actions...")
     print(f"Periode: {start_date} a {end_date}")
@@ -67,17 +81,15 @@ def download_stock_data(tickers: List[str],
     
     # Combiner toutes les donnees
     prices = pd.concat(all_data, axis=1)
-    prices = prices.dropna(axis=1, thresh=len(prices) * 0.8)  # Garder les colonnes avec >80% de donnees
-    prices = prices.ffill()  # Remplir les valeurs manquantes (forward fill)
-    prices = prices.bfill()  # Backward fill pour les valeurs au debut
+    prices.index = normalize_index(prices.index)  # Jours de seance (minuit UTC)
     
     print(f"\nDonnees telechargees: {prices.shape[0]} jours, {prices.shape[1]} actions")
     
-    # Sauvegarder en cache
+    # Sauvegarder en cache (prix bruts, sans remplissage)
     prices.to_csv(cache_file)
     print(f"Donnees sauvegardees dans: {cache_file}")
     
-    return prices
+    return load_clean_prices(cache_file, min_coverage, store_dir=store_dir)
 
 
 if __name__ == "__main__":
@@ -5,6 +5,11 @@ import yfinance as yf
 import pandas as pd
 from typing import List
 import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.price_store import normalize_index
+from data.quality import load_clean_prices
 
 
 def get_eurostoxx50_tickers() -> List[str]:
@@ -35,14 +40,20 @@ def get_eurostoxx50_tickers() -> List[str]:
 def get_extended_period_data(tickers: List[str], 
                               start_date: str = '2005-01-01',
                               end_date: str = '2024-12-31',
-                              cache_file: str = 'data/european_prices.csv') -> pd.DataFrame:
+                              cache_file: str = 'data/european_prices.csv',
+                              min_coverage: float = 0.5) -> pd.DataFrame:
     """
     Telecharge les donnees historiques pour une longue periode incluant les crises
-    """
     
+    Le cache garde les prix bruts, nettoyes une fois par data/quality.py
+    (min_coverage: part minimale de jours cotes pour garder une action).
+    Les seances sans aucun prix sont retirees; les NaN restants (actions pas
+    encore ou plus cotees) sont laisses aux strategies, qui les ignorent.
+    """
+    store_dir = os.path.join(os.path.dirname(cache_file), 'store')
     if os.path.exists(cache_file):
         print(f"Chargement depuis le cache: {cache_file}")
-        return pd.read_csv(cache_file, index_col=0, parse_dates=True)
+        return load_clean_prices(cache_file, min_coverage, store_dir=store_dir, drop_rows='all')
     
     print(f"Telechargement des donnees europeennes pour {len(tickers)} actions...")
     print(f"Periode: {start_date} a {end_date}")
@@ -77,17 +88,17 @@ def get_extended_period_data(tickers: List[str],
     
     # Combiner toutes les donnees
     prices = pd.concat(all_data, axis=1)
-    prices = prices.dropna(axis=1, thresh=len(prices) * 0.5)  # Garder colonnes avec >50% de donnees
-    prices = prices.ffill().bfill()  # Remplir valeurs manquantes
+    prices.index = normalize_index(prices.index)  # Jours de seance (minuit UTC)
+    prices = prices.groupby(level=0).first()  # Une ligne par seance, toutes places confondues
     
     print(f"\nDonnees telechargees: {prices.shape[0]} jours, {prices.shape[1]} actions")
     print(f"Periode couverte: {prices.index[0].strftime('%Y-%m-%d')} a {prices.index[-1].strftime('%Y-%m-%d')}")
     
-    # Sauvegarder
+    # Sauvegarder (prix bruts, sans remplissage)
     prices.to_csv(cache_file)
     print(f"Donnees sauvegardees: {cache_file}")
     
-    return prices
+    return load_clean_prices(cache_file, min_coverage, store_dir=store_dir, drop_rows='all')
 
 
 def analyze_periods(prices: pd.DataFrame):
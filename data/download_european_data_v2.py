@@ -7,6 +7,11 @@ import pandas as pd
 import numpy as np
 from typing import List
 import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from data.price_store import normalize_index
+from data.quality import load_clean_prices
 
 
 def get_european_tickers() -> List[str]:
@@ -36,15 +41,23 @@ def get_european_tickers() -> List[str]:
 
 def download_european_data(start_date='2005-01-01', 
                            end_date='2024-12-31',
-                           min_days=500):
+                           min_days=500,
+                           min_coverage=0.7):
     """
     Telecharge les donnees europeennes avec gestion intelligente des NaN
+    
+    Les NaN sont traites par le controle qualite (data/quality.py), une fois
+    par cache: trous combles par le dernier prix sur 5 seances au plus, sans
+    bfill ni interpolation (aucun prix futur), actions sous min_coverage retirees.
+    Seules les seances ou toutes les actions restantes ont un prix sont gardees
+    (matrice rectangulaire, comme avant le controle qualite).
     """
     cache_file = 'data/european_prices_clean.csv'
+    store_dir = os.path.join(os.path.dirname(cache_file), 'store')
     
     if os.path.exists(cache_file):
         print(f"Chargement depuis le cache: {cache_file}")
-        return pd.read_csv(cache_file, index_col=0, parse_dates=True)
+        return load_clean_prices(cache_file, min_coverage, store_dir=store_dir, drop_rows='any')
     
     tickers = get_european_tickers()
     print(f"Telechargement de {len(tickers)} actions europeennes...")
@@ -73,34 +86,17 @@ def download_european_data(start_date='2005-01-01',
     
     # Creer le DataFrame
     prices = pd.DataFrame(all_data)
+    prices.index = normalize_index(prices.index)  # Jours de seance (minuit UTC)
+    prices = prices.groupby(level=0).first()  # Une ligne par seance, toutes places confondues
     print(f"Shape initial: {prices.shape}")
     
-    # Strategie de gestion des NaN:
-    # 1. Remplir les trous avec la derniere valeur connue (forward fill)
-    # 2. Puis backward fill pour les valeurs au debut
-    # 3. Supprimer les colonnes qui ont encore trop de NaN (>30%)
-    
-    prices = prices.ffill(limit=5)  # Max 5 jours consecutifs
-    prices = prices.bfill(limit=5)
-    
-    # Supprimer les colonnes avec >30% de NaN
-    nan_ratio = prices.isna().sum() / len(prices)
-    valid_cols = nan_ratio[nan_ratio < 0.3].index
-    prices = prices[valid_cols]
-    
-    print(f"Shape apres nettoyage: {prices.shape}")
-    print(f"Periode: {prices.index[0].strftime('%Y-%m-%d')} a {prices.index[-1].strftime('%Y-%m-%d')}")
-    
-    # Remplir les NaN restants par interpolation
-    prices = prices.interpolate(method='linear', limit=3)
-    prices = prices.dropna()  # Supprimer les lignes avec encore des NaN
-    
-    print(f"Shape final: {prices.shape}")
-    
-    # Sauvegarder
+    # Sauvegarder (prix bruts: le nettoyage est fait a la lecture, une fois)
     prices.to_csv(cache_file)
     print(f"Donnees sauvegardees: {cache_file}")
     
+    prices = load_clean_prices(cache_file, min_coverage, store_dir=store_dir, drop_rows='any')
+    print(f"Shape apres nettoyage: {prices.shape}")
+    print(f"Periode: {prices.index[0].strftime('%Y-%m-%d')} a {prices.index[-1].strftime('%Y-%m-%d')}")
     return prices
 
 
@@ -0,0 +1,219 @@
+"""
+Stockage binaire des prix avec lecture paresseuse par tranches
+Les CSV de cache sont convertis une fois en matrice .npy (memoire-mappee):
+une requete store.loc['2020-02-01':'2020-05-01'] ne lit que ces lignes du disque.
+
+Les dates sont normalisees a la conversion: chaque horodatage (US a minuit
+-05:00/-04:00, Europe a 23:00 UTC...) devient le minuit UTC naif de sa seance,
+stocke en int64. Les marches partagent ainsi le meme calendrier (voir
+data/alignment.py) sans reconversion a chaque chargement.
+"""
+import json
+import os
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+STORE_DIR = 'data/store'
+STORE_FORMAT = 2  # 2: dates normalisees en jours de seance (minuit UTC)
+DAY_NS = 86_400 * 10**9
+
+
+def session_dates(utc_ns: np.ndarray) -> np.ndarray:
+    """
+    Instants UTC (int64 ns) -> minuit UTC du jour de seance (int64 ns)
+
+    Arrondi au jour le plus proche: minuit local de tout fuseau a +/-12h
+    (05:00 UTC pour New York, 23:00 UTC la veille pour Paris) donne sa date.
+    """
+    return (utc_ns + DAY_NS // 2) // DAY_NS * DAY_NS
+
+
+def _parse_iso_utc(values: np.ndarray) -> Optional[np.ndarray]:
+    """
+    Dates texte de largeur fixe -> int64 ns UTC, sans passer par pandas
+
+    'AAAA-MM-JJ', 'AAAA-MM-JJ HH:MM:SS' (UTC) ou 'AAAA-MM-JJ HH:MM:SS+HH:MM';
+    None si le format n'est pas reconnu.
+    """
+    try:
+        text = values.astype(str)
+    except (TypeError, ValueError):
+        return None
+    width = text.dtype.itemsize // 4
+    if len(text) == 0 or width not in (10, 19, 25) or np.any(np.char.str_len(text) != width):
+        return None
+    chars = text.view(np.uint32).reshape(len(text), width)
+    try:
+        local = text.astype(f'U{min(width, 19)}').astype('datetime64[s]').astype('datetime64[ns]').astype(np.int64)
+    except ValueError:
+        return None
+    if width < 25:
+        return local
+    if not (np.isin(chars[:, 19], (ord('+'), ord('-'))).all() and (chars[:, 22] == ord(':')).all()):
+        return None
+    digits = chars[:, [20, 21, 23, 24]].astype(np.int64) - ord('0')
+    offset_minutes = (digits[:, 0] * 10 + digits[:, 1]) * 60 + digits[:, 2] * 10 + digits[:, 3]
+    sign = np.where(chars[:, 19] == ord('-'), -1, 1)
+    return local - sign * offset_minutes * 60 * 10**9
+
+
+def normalize_index(index: pd.Index) -> pd.DatetimeIndex:
+    """
+    Index de dates quelconque (texte avec ou sans offset, DatetimeIndex naif ou
+    tz-aware) -> DatetimeIndex naif des jours de seance (minuit UTC)
+    """
+    if isinstance(index, pd.DatetimeIndex):
+        utc = index.tz_convert('UTC').tz_localize(None) if index.tz is not None else index
+        utc_ns = utc.as_unit('ns').asi8
+    else:
+        utc_ns = _parse_iso_utc(np.asarray(index))
+        if utc_ns is None:
+            utc_ns = pd.to_datetime(index, utc=True).tz_localize(None).as_unit('ns').asi8
+    return pd.DatetimeIndex(session_dates(utc_ns).view('datetime64[ns]'), name='Date')
+
+
+class _StoreLocIndexer:
+    """Indexeur .loc[dates, tickers] qui pousse la selection jusqu'au fichier"""
+
+    def __init__(self, store: 'PriceStore'):
+        self.store = store
+
+    def __getitem__(self, key):
+        rows, cols = key if isinstance(key, tuple) else (key, None)
+        if isinstance(cols, slice) and cols == slice(None):
+            cols = None
+        if isinstance(cols, str):
+            cols = [cols]
+
+        if isinstance(rows, slice):
+            return self.store.load(start=rows.start, end=rows.stop, tickers=cols)
+        # Date unique: ligne de prix
+        frame = self.store.load(start=rows, end=rows, tickers=cols)
+        return frame.iloc[0]
+
+
+class PriceStore:
+    """
+    Matrice de prix (dates x tickers) stockee dans un dossier:
+    values.npy (float64, ligne = date), dates.npy (int64 ns), meta.json (tickers, source)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, 'meta.json')) as f:
+            self.meta = json.load(f)
+        self.tickers = self.meta['tickers']
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+        self._dates = np.load(os.path.join(path, 'dates.npy'))
+        self._values = None  # Ouvert a la premiere lecture
+
+    @classmethod
+    def write(cls, prices: pd.DataFrame, path: str, source: str = None, meta: Dict = None) -> 'PriceStore':
+        """Ecrit un DataFrame de prix au format du store (meta: champs supplementaires de meta.json)"""
+        os.makedirs(path, exist_ok=True)
+        index = normalize_index(prices.index)
+        np.save(os.path.join(path, 'values.npy'), np.ascontiguousarray(prices.to_numpy(dtype=np.float64)))
+        np.save(os.path.join(path, 'dates.npy'), index.asi8)
+        meta = {**(meta or {}), 'tickers': [str(c) for c in prices.columns], 'format': STORE_FORMAT}
+        if source:
+            meta['source'] = source
+            meta['source_mtime'] = os.path.getmtime(source)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        return cls(path)
+
+    @property
+    def values(self) -> np.ndarray:
+        if self._values is None:
+            self._values = np.load(os.path.join(self.path, 'values.npy'), mmap_mode='r')
+        return self._values
+
+    @property
+    def index(self) -> pd.DatetimeIndex:
+        return pd.DatetimeIndex(self._dates.view('datetime64[ns]'), name='Date')
+
+    @property
+    def columns(self) -> pd.Index:
+        return pd.Index(self.tickers)
+
+    @property
+    def shape(self):
+        return (len(self._dates), len(self.tickers))
+
+    def __len__(self):
+        return len(self._dates)
+
+    @property
+    def loc(self) -> _StoreLocIndexer:
+        return _StoreLocIndexer(self)
+
+    def _row_bounds(self, start, end):
+        """Lignes [r0, r1) couvrant start..end (bornes incluses, comme .loc)"""
+        r0 = 0
+        r1 = len(self._dates)
+        if start is not None:
+            r0 = np.searchsorted(self._dates, pd.Timestamp(start).as_unit('ns').value, side='left')
+        if end is not None:
+            end_ts = pd.Timestamp(end)
+            if isinstance(end, str) and end_ts == end_ts.normalize():
+                # '2020-05-01' designe toute la journee (comme l'indexation pandas)
+                r1 = np.searchsorted(self._dates, (end_ts + pd.Timedelta(days=1)).as_unit('ns').value, side='left')
+            else:
+                r1 = np.searchsorted(self._dates, end_ts.as_unit('ns').value, side='right')
+        return r0, max(r0, r1)
+
+    def load(self, start=None, end=None, tickers: List[str] = None) -> pd.DataFrame:
+        """
+        Lit la tranche demandee (seules les lignes necessaires sont lues du disque)
+
+        Args:
+            start, end: bornes de dates incluses (None = debut / fin)
+            tickers: sous-ensemble de colonnes (None = toutes)
+        """
+        r0, r1 = self._row_bounds(start, end)
+        block = self.values[r0:r1]
+        if tickers is None:
+            columns = self.tickers
+            data = np.array(block)
+        else:
+            columns = [t for t in tickers if t in self._positions]
+            data = block[:, [self._positions[t] for t in columns]]
+        index = pd.DatetimeIndex(self._dates[r0:r1].view('datetime64[ns]'), name='Date')
+        return pd.DataFrame(data, index=index, columns=columns)
+
+    def __repr__(self):
+        return f"PriceStore({self.path}, {self.shape[0]} jours x {self.shape[1]} actions)"
+
+
+def open_price_store(csv_path: str, store_dir: str = STORE_DIR) -> PriceStore:
+    """
+    Ouvre le store associe a un CSV de cache, en le (re)construisant si le CSV
+    est plus recent ou le format du store perime. La conversion n'a lieu qu'une fois.
+    """
+    name = os.path.splitext(os.path.basename(csv_path))[0]
+    path = os.path.join(store_dir, name)
+    meta_file = os.path.join(path, 'meta.json')
+
+    if os.path.exists(meta_file):
+        with open(meta_file) as f:
+            meta = json.load(f)
+        if meta.get('format') == STORE_FORMAT and meta.get('source_mtime', 0) >= os.path.getmtime(csv_path):
+            return PriceStore(path)
+
+    print(f"Conversion du cache {csv_path} -> {path}")
+    prices = pd.read_csv(csv_path, index_col=0)
+    prices.index = normalize_index(prices.index)
+    if prices.index.has_duplicates:
+        # Lignes d'une meme seance (places a offsets differents): premier prix connu par action
+        prices = prices.groupby(level=0).first()
+    return PriceStore.write(prices.sort_index(), path, source=csv_path)
+
+
+if __name__ == "__main__":
+    store = open_price_store('data/stock_prices.csv')
+    print(store)
+    covid = store.loc['2020-02-01':'2020-05-01']
+    print(f"Tranche COVID: {covid.shape[0]} jours, {covid.shape[1]} actions")
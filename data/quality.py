@@ -0,0 +1,299 @@
+"""
+Controle qualite des prix: un seul pipeline vectorise, execute a l'ingestion
+
+Detecte sur la matrice brute (jours x actions):
+- introductions / radiations: premiere et derniere cotation de chaque action,
+  apres retrait des series constantes en debut ou fin (artefacts de bfill/ffill)
+- trous: jours sans prix entre introduction et radiation, combles par le
+  dernier prix sur au plus max_ffill seances (jamais de bfill: aucun prix
+  futur ne remonte avant l'introduction)
+- prix perimes: prix inchange pendant au moins stale_days seances
+- pics: saut d'un jour aussitot annule (prix remplace par le precedent)
+- splits: saut proche d'un ratio de split non annule, signale seulement
+  (ajustement de l'historique sur option adjust_splits: il reecrit les prix
+  passes a partir d'un saut futur, et un vrai krach de -50% ressemble a un split 2:1)
+
+Le resultat (matrice nettoyee, drapeaux par cellule, rapport par action) est
+mis en cache a cote du store brut (data/price_store.py) et relu tel quel:
+
+    prices = load_clean_prices('data/stock_prices.csv', min_coverage=0.8)
+    store = open_clean_store('data/stock_prices.csv')
+    quality_report(store)   # une ligne par action
+    quality_flags(store)    # drapeaux (FILLED, GAP, STALE...) par cellule
+"""
+import json
+import os
+from dataclasses import asdict, dataclass
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from data.price_store import STORE_DIR, STORE_FORMAT, PriceStore, open_price_store
+
+
+# Drapeaux par cellule (combinables)
+FILLED = 1     # trou comble par le dernier prix
+GAP = 2        # trou trop long, laisse vide
+STALE = 4      # prix inchange depuis stale_days seances
+SPIKE = 8      # pic d'un jour remplace
+SPLIT = 16     # saut compatible avec un split (historique ajuste si adjust_splits)
+UNLISTED = 32  # avant l'introduction ou apres la radiation
+
+REPORT_COUNTS = ('filled', 'gaps', 'stale', 'spikes', 'splits', 'longest_gap')
+FLAGS = {'filled': FILLED, 'gap': GAP, 'stale': STALE, 'spike': SPIKE, 'split': SPLIT, 'unlisted': UNLISTED}
+
+
+@dataclass
+class QualityConfig:
+    """
+    max_ffill: seances maximales comblees par le dernier prix dans un trou
+    stale_days: prix inchange pendant autant de seances = perime (et en debut
+                ou fin de serie: hors cotation, artefact de remplissage)
+    spike_threshold: |log-rendement| minimal d'un pic
+    spike_reversion: part maximale du saut restant apres le retour du lendemain
+    split_ratios: ratios de split (et de regroupement) recherches
+    split_tolerance: ecart maximal en log entre le saut et le ratio
+    adjust_splits: ajuste l'historique anterieur des splits detectes (sinon
+                   seulement signales dans les drapeaux et le rapport)
+    """
+    max_ffill: int = 5
+    stale_days: int = 10
+    spike_threshold: float = 0.4
+    spike_reversion: float = 0.25
+    split_ratios: Tuple[float, ...] = (2, 3, 4, 5, 8, 10, 20)
+    split_tolerance: float = 0.03
+    adjust_splits: bool = False
+
+
+@dataclass
+class QualityResult:
+    """
+    prices: matrice nettoyee, flags: drapeaux (uint8)
+    report: une ligne par action (dates de premiere / derniere cotation,
+    introduction / radiation en cours d'historique, couverture, compteurs)
+    """
+    prices: pd.DataFrame
+    flags: pd.DataFrame
+    report: pd.DataFrame
+
+
+def _runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pour chaque cellule vraie: (position dans sa serie de cellules vraies
+    consecutives (1 = premiere), longueur de la serie); 0 ailleurs
+    """
+    n = len(mask)
+    rows = np.arange(n)[:, None]
+    previous_false = np.maximum.accumulate(np.where(mask, -1, rows), axis=0)
+    next_false = np.minimum.accumulate(np.where(mask, n, rows)[::-1], axis=0)[::-1]
+    position = np.where(mask, rows - previous_false, 0)
+    length = np.where(mask, next_false - previous_false - 1, 0)
+    return position, length
+
+
+def _last_valid_rows(valid: np.ndarray) -> np.ndarray:
+    """Ligne du dernier prix valide a chaque date (incluse), -1 avant le premier"""
+    rows = np.arange(len(valid))[:, None]
+    return np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+
+
+def _first_last(valid: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Premiere et derniere ligne valide par colonne (-1 si jamais valide)"""
+    if len(valid) == 0:
+        return np.full(valid.shape[1], -1), np.full(valid.shape[1], -1)
+    any_valid = valid.any(axis=0)
+    first = np.where(any_valid, valid.argmax(axis=0), -1)
+    last = np.where(any_valid, len(valid) - 1 - valid[::-1].argmax(axis=0), -1)
+    return first, last
+
+
+def _report(tickers: pd.Index, index: pd.DatetimeIndex, first: np.ndarray, last: np.ndarray, end: np.ndarray,
+            coverage: np.ndarray, counts: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Rapport par action: cotation (lignes -1 = jamais cotee), couverture et compteurs"""
+    listed = first >= 0
+    dates = index[np.maximum(first, 0)] if len(index) else pd.DatetimeIndex([pd.NaT] * len(tickers))
+    last_dates = index[np.maximum(last, 0)] if len(index) else dates
+    return pd.DataFrame({
+        'first_date': dates.where(listed),
+        'last_date': last_dates.where(listed),
+        'listed': listed & (first > 0),
+        'delisted': listed & (end < len(index) - 1),
+        'coverage': coverage,
+        **counts,
+    }, index=pd.Index(tickers, name='ticker'))
+
+
+def run_quality_pipeline(prices: pd.DataFrame, config: QualityConfig = None) -> QualityResult:
+    """
+    Nettoie une matrice de prix brute (sans remplissage prealable de preference)
+
+    Les seances sans aucun prix sont retirees. Les prix nuls ou negatifs sont
+    traites comme manquants.
+    """
+    config = config or QualityConfig()
+    values = prices.to_numpy(dtype=np.float64).copy()
+    with np.errstate(invalid='ignore'):
+        valid = np.isfinite(values) & (values > 0)
+    keep_rows = valid.any(axis=1)
+    values, valid, index = values[keep_rows], valid[keep_rows], prices.index[keep_rows]
+    values[~valid] = np.nan
+    n_days, n_assets = values.shape
+    flags = np.zeros(values.shape, dtype=np.uint8)
+    columns = np.arange(n_assets)
+    if n_days == 0:
+        never = np.full(n_assets, -1)
+        zeros = np.zeros(n_assets, dtype=np.int64)
+        return QualityResult(pd.DataFrame(values, index=index, columns=prices.columns),
+                             pd.DataFrame(flags, index=index, columns=prices.columns),
+                             _report(prices.columns, index, never, never, never, np.zeros(n_assets),
+                                     {name: zeros for name in REPORT_COUNTS}))
+
+    # Prix repetes (cellule egale a la precedente, toutes deux valides)
+    repeated = np.zeros(values.shape, dtype=bool)
+    repeated[1:] = valid[1:] & valid[:-1] & (values[1:] == values[:-1])
+    _, repeat_length = _runs(repeated)
+    stale = repeated & (repeat_length >= config.stale_days - 1)
+
+    # Series constantes en debut / fin de cotation: hors cotation
+    first, last = _first_last(valid)
+    listed = first >= 0
+    after_first = np.minimum(first + 1, n_days - 1)
+    lead = np.where(listed & stale[after_first, columns], repeat_length[after_first, columns], 0)
+    trail = np.where(listed & stale[np.maximum(last, 0), columns], repeat_length[np.maximum(last, 0), columns], 0)
+    rows = np.arange(n_days)[:, None]
+    lead_run = (rows >= first) & (rows <= first + lead) & (lead > 0)
+    trail_run = (rows >= last - trail) & (rows <= last) & (trail > 0)
+    # Le vrai premier prix est le dernier de la serie de tete, le dernier prix le premier de la serie de fin
+    valid &= ~(lead_run & (rows < first + lead)) & ~(trail_run & (rows > last - trail))
+    stale &= ~lead_run & ~trail_run
+    flags[stale] |= STALE
+
+    # Log-rendements entre prix valides successifs (par-dessus les trous)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_prices = np.log(values)
+    previous = _last_valid_rows(valid)
+    previous = np.vstack([np.full((1, n_assets), -1), previous[:-1]])
+    has_previous = valid & (previous >= 0)
+    returns = np.where(has_previous, log_prices - log_prices[np.maximum(previous, 0), columns], 0.0)
+    # Rendement suivant de chaque prix: celui de la prochaine cellule valide
+    next_rows = np.minimum.accumulate(np.where(valid, rows, n_days)[::-1], axis=0)[::-1]
+    next_rows = np.vstack([next_rows[1:], np.full((1, n_assets), n_days)])
+    has_next = valid & (next_rows < n_days)
+    next_returns = np.where(has_next, returns[np.minimum(next_rows, n_days - 1), columns], 0.0)
+
+    # Pics: saut annule par le prix suivant
+    jump = np.abs(returns)
+    spike = (has_previous & has_next & (jump >= config.spike_threshold)
+             & (np.sign(next_returns) == -np.sign(returns))
+             & (np.abs(returns + next_returns) <= config.spike_reversion * jump))
+    valid &= ~spike
+    flags[spike] |= SPIKE
+
+    # Splits: saut proche de +/- log(ratio), non annule
+    nearest = np.zeros(values.shape)
+    for ratio in np.log(np.asarray(config.split_ratios, dtype=np.float64)):
+        nearest[np.abs(jump - ratio) <= config.split_tolerance] = ratio
+    split = has_previous & ~spike & (nearest > 0)
+    flags[split] |= SPLIT
+    if config.adjust_splits and split.any():
+        factors = np.where(split, nearest * np.sign(returns), 0.0)
+        # Ajustement des prix anterieurs: somme des splits posterieurs
+        later = np.cumsum(factors[::-1], axis=0)[::-1] - factors
+        values = values * np.exp(later)
+
+    # Cotation: de la premiere a la derniere cellule valide (radiation si les
+    # prix s'arretent plus de max_ffill seances avant la fin)
+    first, last = _first_last(valid)
+    listed = first >= 0
+    end = np.where(last >= n_days - 1 - config.max_ffill, n_days - 1, last)
+    in_listing = listed & (rows >= first) & (rows <= end)
+
+    # Trous: dernier prix sur au plus max_ffill seances
+    missing = in_listing & ~valid
+    gap_position, gap_length = _runs(missing)
+    fill = missing & (gap_position <= config.max_ffill)
+    source = _last_valid_rows(valid)
+    cleaned = np.where(valid, values, np.nan)
+    cleaned[fill] = values[source, columns][fill]
+    flags[fill & ~spike] |= FILLED
+    flags[missing & ~fill] |= GAP
+    flags[~in_listing] |= UNLISTED
+
+    counts = {'filled': fill & ~spike, 'gaps': missing & ~fill, 'stale': stale, 'spikes': spike, 'splits': split}
+    counts = {name: mask.sum(axis=0) for name, mask in counts.items()}
+    counts['longest_gap'] = gap_length.max(axis=0)
+    report = _report(prices.columns, index, first, last, end, np.isfinite(cleaned).mean(axis=0), counts)
+
+    return QualityResult(pd.DataFrame(cleaned, index=index, columns=prices.columns),
+                         pd.DataFrame(flags, index=index, columns=prices.columns),
+                         report)
+
+
+def summarize(report: pd.DataFrame) -> str:
+    """Resume d'une ligne du rapport qualite"""
+    return (f"{len(report)} actions, couverture moyenne {report['coverage'].mean():.1%}, "
+            f"{int(report['filled'].sum())} prix combles, {int(report['gaps'].sum())} jours en trou, "
+            f"{int(report['stale'].sum())} perimes, {int(report['spikes'].sum())} pics, "
+            f"{int(report['splits'].sum())} splits, {int(report['listed'].sum())} introductions, "
+            f"{int(report['delisted'].sum())} radiations")
+
+
+def open_clean_store(csv_path: str, config: QualityConfig = None, store_dir: str = STORE_DIR) -> PriceStore:
+    """
+    Store des prix nettoyes d'un CSV de cache, construit une fois
+
+    Reconstruit si le CSV, le format du store ou la configuration change.
+    Le dossier contient aussi flags.npy et quality.csv (voir quality_flags,
+    quality_report).
+    """
+    config = config or QualityConfig()
+    settings = json.loads(json.dumps(asdict(config)))
+    raw = open_price_store(csv_path, store_dir)
+    path = raw.path + '_clean'
+    meta_file = os.path.join(path, 'meta.json')
+
+    if os.path.exists(meta_file):
+        with open(meta_file) as f:
+            meta = json.load(f)
+        if (meta.get('format') == STORE_FORMAT and meta.get('quality') == settings
+                and meta.get('source_mtime', 0) >= os.path.getmtime(csv_path)):
+            return PriceStore(path)
+
+    result = run_quality_pipeline(raw.load(), config)
+    store = PriceStore.write(result.prices, path, source=csv_path, meta={'quality': settings})
+    np.save(os.path.join(path, 'flags.npy'), result.flags.to_numpy())
+    result.report.to_csv(os.path.join(path, 'quality.csv'))
+    print(f"Qualite {csv_path}: {summarize(result.report)}")
+    return store
+
+
+def quality_flags(store: PriceStore) -> pd.DataFrame:
+    """Drapeaux par cellule d'un store nettoye (voir FLAGS)"""
+    return pd.DataFrame(np.load(os.path.join(store.path, 'flags.npy')), index=store.index, columns=store.columns)
+
+
+def quality_report(store: PriceStore) -> pd.DataFrame:
+    """Rapport qualite d'un store nettoye (une ligne par action)"""
+    return pd.read_csv(os.path.join(store.path, 'quality.csv'), index_col=0,
+                       parse_dates=['first_date', 'last_date'])
+
+
+def load_clean_prices(csv_path: str, min_coverage: float = 0.0, config: QualityConfig = None,
+                      store_dir: str = STORE_DIR, drop_rows: Optional[str] = None) -> pd.DataFrame:
+    """
+    Prix nettoyes d'un CSV de cache (nettoyage en cache)
+
+    min_coverage: part minimale de jours avec un prix pour garder une action
+    drop_rows: seances retirees apres le filtrage des actions, comme
+        DataFrame.dropna(how=...): 'all' = sans aucun prix (debut de l'historique),
+        'any' = incompletes (matrice rectangulaire), None = aucune
+    """
+    store = open_clean_store(csv_path, config, store_dir)
+    prices = store.load()
+    if min_coverage > 0:
+        report = quality_report(store)
+        prices = prices.loc[:, report['coverage'].reindex(prices.columns).to_numpy() >= min_coverage]
+    if drop_rows is not None:
+        prices = prices.dropna(axis=0, how=drop_rows)
+    return prices
@@ -0,0 +1,187 @@
+"""
+Generation de donnees de prix synthetiques (tests de montee en charge hors-ligne)
+Modeles: GBM, jump-diffusion (Merton), facteurs correles
+Les matrices sont reproductibles (graine) et sauvegardees au format du cache CSV
+"""
+import numpy as np
+import pandas as pd
+from typing import List, Tuple
+from dataclasses import dataclass
+import os
+
+
+TRADING_DAYS_PER_YEAR = 252
+
+
+@dataclass
+class SyntheticConfig:
+    """Configuration du generateur de prix synthetiques"""
+    n_tickers: int = 3000  # Taille de l'univers
+    n_years: float = 30  # Profondeur d'historique
+    start_date: str = '1995-01-02'  # Premier jour de l'historique
+    model: str = 'factor'  # 'gbm', 'jump' (jump-diffusion) ou 'factor' (facteurs correles)
+    annual_drift: float = 0.07  # Rendement annuel moyen
+    annual_vol: float = 0.25  # Volatilite annuelle moyenne
+    n_factors: int = 3  # Nombre de facteurs communs (modele 'factor')
+    factor_vol: float = 0.15  # Volatilite annuelle des facteurs
+    jump_intensity: float = 0.5  # Nombre moyen de sauts par an (modele 'jump')
+    jump_mean: float = -0.05  # Taille moyenne d'un saut (log-rendement)
+    jump_std: float = 0.10  # Ecart-type d'un saut
+    listing_ratio: float = 0.3  # Part des titres introduits apres le debut
+    delisting_ratio: float = 0.2  # Part des titres retires avant la fin
+    nan_gap_prob: float = 0.0005  # Probabilite journaliere de debut d'un trou de donnees
+    max_gap_days: int = 5  # Duree maximale d'un trou de donnees
+    seed: int = 42  # Graine pour la reproductibilite
+
+
+def get_synthetic_tickers(n: int) -> List[str]:
+    """Genere des tickers fictifs: SYN0000, SYN0001, ..."""
+    width = max(4, len(str(n - 1)))
+    return [f"SYN{i:0{width}d}" for i in range(n)]
+
+
+def _ticker_parameters(config: SyntheticConfig, rng: np.random.Generator) -> Tuple[np.ndarray, np.ndarray]:
+    """Tire un drift et une volatilite annuels heterogenes par titre"""
+    drifts = rng.normal(config.annual_drift, 0.05, config.n_tickers)
+    vols = config.annual_vol * rng.lognormal(0.0, 0.3, config.n_tickers)
+    return drifts, vols
+
+
+def simulate_log_returns(config: SyntheticConfig, n_days: int,
+                         rng: np.random.Generator) -> np.ndarray:
+    """
+    Simule la matrice (jours x titres) des log-rendements journaliers
+    selon le modele choisi
+    """
+    dt = 1.0 / TRADING_DAYS_PER_YEAR
+    shape = (n_days, config.n_tickers)
+    drifts, vols = _ticker_parameters(config, rng)
+
+    if config.model == 'factor':
+        # Rendement = expositions x facteurs + bruit idiosyncratique
+        # Le premier facteur joue le role du marche (beta ~ 1)
+        loadings = rng.normal(0.0, 0.5, (config.n_factors, config.n_tickers))
+        loadings[0] = rng.normal(1.0, 0.3, config.n_tickers)
+        factors = rng.standard_normal((n_days, config.n_factors)) * config.factor_vol * np.sqrt(dt)
+        systematic = factors @ loadings
+
+        # La volatilite idiosyncratique complete la volatilite cible du titre
+        factor_var = (loadings ** 2).sum(axis=0) * config.factor_vol ** 2
+        idio_vols = np.sqrt(np.maximum(vols ** 2 - factor_var, (0.3 * vols) ** 2))
+        total_var = factor_var + idio_vols ** 2
+
+        log_returns = rng.standard_normal(shape)
+        log_returns *= idio_vols * np.sqrt(dt)
+        log_returns += systematic
+        log_returns += (drifts - 0.5 * total_var) * dt
+        return log_returns
+
+    log_returns = rng.standard_normal(shape)
+    log_returns *= vols * np.sqrt(dt)
+    log_returns += (drifts - 0.5 * vols ** 2) * dt
+
+    if config.model == 'jump':
+        # Merton: nombre de sauts ~ Poisson, somme de k sauts ~ N(k*mu, k*sigma^2)
+        counts = rng.poisson(config.jump_intensity * dt, shape)
+        jump_days = counts > 0
+        k = counts[jump_days]
+        log_returns[jump_days] += (k * config.jump_mean
+                                   + np.sqrt(k) * config.jump_std * rng.standard_normal(k.size))
+        # Compensation pour conserver le drift annuel cible
+        compensator = config.jump_intensity * (np.exp(config.jump_mean + 0.5 * config.jump_std ** 2) - 1)
+        log_returns -= compensator * dt
+    elif config.model != 'gbm':
+        raise ValueError(f"Modele inconnu: {config.model}")
+
+    return log_returns
+
+
+def listing_mask(config: SyntheticConfig, n_days: int,
+                 rng: np.random.Generator) -> np.ndarray:
+    """
+    Masque (jours x titres) des periodes de cotation:
+    introductions en bourse apres le debut et radiations avant la fin
+    """
+    n = config.n_tickers
+    first_day = np.zeros(n, dtype=np.int64)
+    last_day = np.full(n, n_days, dtype=np.int64)
+
+    listed_late = rng.random(n) < config.listing_ratio
+    first_day[listed_late] = rng.integers(1, max(2, int(n_days * 0.8)), listed_late.sum())
+
+    delisted = rng.random(n) < config.delisting_ratio
+    # Au moins un an de cotation avant une radiation
+    min_last = np.minimum(first_day[delisted] + TRADING_DAYS_PER_YEAR, n_days - 1)
+    last_day[delisted] = rng.integers(min_last, n_days)
+
+    days = np.arange(n_days)[:, None]
+    return (days >= first_day) & (days < last_day)
+
+
+def gap_mask(config: SyntheticConfig, n_days: int,
+             rng: np.random.Generator) -> np.ndarray:
+    """Masque (jours x titres) des trous de donnees (suspensions, donnees manquantes)"""
+    shape = (n_days, config.n_tickers)
+    if config.nan_gap_prob <= 0:
+        return np.zeros(shape, dtype=bool)
+
+    starts = np.argwhere(rng.random(shape) < config.nan_gap_prob)
+    lengths = rng.integers(1, config.max_gap_days + 1, len(starts))
+
+    # Tableau de differences: +1 au debut du trou, -1 a la fin, puis somme cumulee
+    diff = np.zeros((n_days + 1, config.n_tickers), dtype=np.int32)
+    np.add.at(diff, (starts[:, 0], starts[:, 1]), 1)
+    np.add.at(diff, (np.minimum(starts[:, 0] + lengths, n_days), starts[:, 1]), -1)
+    return np.cumsum(diff[:-1], axis=0) > 0
+
+
+def generate_synthetic_prices(config: SyntheticConfig = None) -> pd.DataFrame:
+    """
+    Genere une matrice de prix synthetiques (index=dates ouvrees, colonnes=tickers)
+
+    Les titres non cotes et les trous de donnees sont des NaN, comme dans
+    les donnees brutes telechargees.
+    """
+    config = config or SyntheticConfig()
+    rng = np.random.default_rng(config.seed)
+
+    n_days = int(round(config.n_years * TRADING_DAYS_PER_YEAR))
+    dates = pd.bdate_range(start=config.start_date, periods=n_days, name='Date')
+
+    log_prices = simulate_log_returns(config, n_days, rng)
+    np.cumsum(log_prices, axis=0, out=log_prices)
+    log_prices += np.log(rng.uniform(10.0, 500.0, config.n_tickers))
+    prices = np.exp(log_prices, out=log_prices)
+
+    prices[~listing_mask(config, n_days, rng)] = np.nan
+    prices[gap_mask(config, n_days, rng)] = np.nan
+
+    return pd.DataFrame(prices, index=dates, columns=get_synthetic_tickers(config.n_tickers))
+
+
+def save_synthetic_prices(prices: pd.DataFrame,
+                          cache_dir: str = 'data/synthetic',
+                          cache_name: str = 'stock_prices.csv') -> str:
+    """
+    Sauvegarde au format du cache des telechargeurs
+
+    Avec le nom par defaut, download_stock_data(tickers, cache_dir=cache_dir)
+    charge directement l'univers synthetique, sans connexion reseau.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    cache_file = os.path.join(cache_dir, cache_name)
+    prices.to_csv(cache_file, float_format='%.6f')
+    print(f"Donnees synthetiques sauvegardees: {cache_file} "
+          f"({prices.shape[0]} jours, {prices.shape[1]} actions)")
+    return cache_file
+
+
+if __name__ == "__main__":
+    # Univers de montee en charge: 3000 titres sur 30 ans
+    config = SyntheticConfig(n_tickers=3000, n_years=30, model='factor', seed=42)
+    prices = generate_synthetic_prices(config)
+    save_synthetic_prices(prices, cache_dir='data/synthetic')
+
+    coverage = prices.notna().mean()
+    print(f"\nCouverture moyenne: {coverage.mean()*100:.1f}%")
+    print(f"Titres cotes sur toute la periode: {(coverage == 1).sum()}")
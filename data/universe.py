@@ -0,0 +1,169 @@
+"""
+Univers point-in-time: appartenance (dates x tickers) a un indice
+Evite le biais du survivant de la liste figee des capitalisations actuelles.
+La matrice n'est stockee qu'aux dates de changement, en bits compactes
+(np.packbits): 3000 tickers = 375 octets par date de changement.
+"""
+import numpy as np
+import pandas as pd
+from typing import List
+import os
+
+
+class Universe:
+    """
+    Appartenance point-in-time d'un ensemble de tickers
+
+    La composition a une date donnee est celle de la derniere date de
+    changement anterieure ou egale (lookup as-of par searchsorted).
+    """
+
+    def __init__(self, change_dates: pd.DatetimeIndex, tickers: List[str], membership: np.ndarray):
+        """
+        Args:
+            change_dates: dates (triees) ou la composition change
+            tickers: tous les tickers ayant fait partie de l'univers
+            membership: matrice booleenne (changements x tickers)
+        """
+        membership = np.asarray(membership, dtype=bool)
+        # Ne garder que les lignes qui modifient reellement la composition
+        changed = np.ones(len(membership), dtype=bool)
+        changed[1:] = (membership[1:] != membership[:-1]).any(axis=1)
+
+        self.change_dates = pd.DatetimeIndex(change_dates)[changed]
+        self.tickers = list(tickers)
+        self.n_tickers = len(self.tickers)
+        self._packed = np.packbits(membership[changed], axis=1)
+        self._positions = {ticker: i for i, ticker in enumerate(self.tickers)}
+
+    # ------------------------------------------------------------------
+    # Construction
+    # ------------------------------------------------------------------
+    @classmethod
+    def from_frame(cls, membership: pd.DataFrame) -> 'Universe':
+        """Depuis une matrice booleenne (index=dates, colonnes=tickers)"""
+        membership = membership.sort_index()
+        return cls(pd.DatetimeIndex(membership.index), membership.columns.tolist(),
+                   membership.fillna(False).to_numpy(dtype=bool))
+
+    @classmethod
+    def from_intervals(cls, intervals: pd.DataFrame) -> 'Universe':
+        """
+        Depuis des periodes d'appartenance: colonnes 'ticker', 'start', 'end'
+        (start inclus, end exclu, end vide = toujours membre)
+        Un ticker peut avoir plusieurs periodes (sortie puis retour dans l'indice).
+        """
+        starts = pd.to_datetime(intervals['start']).to_numpy()
+        ends = pd.to_datetime(intervals['end']).to_numpy()
+        codes, tickers = pd.factorize(intervals['ticker'])
+
+        change_dates = np.unique(np.concatenate([starts, ends[~pd.isna(ends)]]))
+        dates = change_dates[:, None]
+        active = (starts <= dates) & (pd.isna(ends) | (dates < ends))
+
+        if len(tickers) == len(codes):
+            # Une seule periode par ticker: codes = 0..n-1 dans l'ordre
+            membership = active
+        else:
+            # OU logique des periodes d'un meme ticker
+            membership = np.zeros((len(change_dates), len(tickers)), dtype=bool)
+            for code in np.unique(codes):
+                membership[:, code] = active[:, codes == code].any(axis=1)
+
+        return cls(pd.DatetimeIndex(change_dates), list(tickers), membership)
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame) -> 'Universe':
+        """
+        Univers deduit de la disponibilite des prix: un ticker est membre
+        entre son premier et son dernier prix connu (introduction / radiation)
+        """
+        valid = prices.notna().to_numpy()
+        has_data = valid.any(axis=0)
+        first_row = valid.argmax(axis=0)
+        last_row = len(valid) - 1 - valid[::-1].argmax(axis=0)
+
+        dates = prices.index
+        ends = pd.Series(pd.NaT, index=range(prices.shape[1]), dtype='datetime64[ns]')
+        delisted = last_row < len(dates) - 1
+        ends[delisted] = dates[last_row[delisted] + 1]
+
+        intervals = pd.DataFrame({
+            'ticker': prices.columns,
+            'start': dates[first_row],
+            'end': ends.to_numpy()
+        })[has_data]
+        return cls.from_intervals(intervals)
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Universe':
+        """
+        Charge un fichier local (CSV):
+        - format periodes: colonnes ticker,start,end
+        - format matrice: index=dates, colonnes=tickers, valeurs 0/1
+        """
+        df = pd.read_csv(path)
+        if {'ticker', 'start'}.issubset(df.columns):
+            if 'end' not in df.columns:
+                df['end'] = pd.NaT
+            return cls.from_intervals(df)
+        df = df.set_index(df.columns[0])
+        df.index = pd.to_datetime(df.index)
+        return cls.from_frame(df.astype(bool))
+
+    def save(self, path: str):
+        """Sauvegarde la matrice aux dates de changement (format matrice 0/1)"""
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.to_frame().astype(np.int8).to_csv(path)
+        print(f"Univers sauvegarde: {path} ({len(self.change_dates)} changements, {self.n_tickers} tickers)")
+
+    # ------------------------------------------------------------------
+    # Requetes
+    # ------------------------------------------------------------------
+    def to_frame(self) -> pd.DataFrame:
+        """Matrice booleenne aux dates de changement"""
+        membership = np.unpackbits(self._packed, axis=1, count=self.n_tickers).astype(bool)
+        return pd.DataFrame(membership, index=self.change_dates.rename('Date'), columns=self.tickers)
+
+    def positions(self, columns) -> np.ndarray:
+        """Position de chaque colonne dans l'univers (-1 si jamais membre)"""
+        return np.array([self._positions.get(c, -1) for c in columns], dtype=np.int64)
+
+    def members_at(self, date) -> np.ndarray:
+        """Masque booleen (sur self.tickers) des membres a la date"""
+        i = self.change_dates.searchsorted(pd.Timestamp(date), side='right') - 1
+        if i < 0:
+            return np.zeros(self.n_tickers, dtype=bool)
+        return np.unpackbits(self._packed[i], count=self.n_tickers).astype(bool)
+
+    def eligible(self, date, positions: np.ndarray) -> np.ndarray:
+        """
+        Masque d'eligibilite aligne sur des colonnes de prix
+
+        Args:
+            positions: resultat de self.positions(prices.columns), calcule une fois
+        """
+        members = self.members_at(date)
+        return (positions >= 0) & members[np.maximum(positions, 0)]
+
+    def tickers_at(self, date) -> List[str]:
+        members = self.members_at(date)
+        return [t for t, m in zip(self.tickers, members) if m]
+
+    def __len__(self):
+        return self.n_tickers
+
+    def __repr__(self):
+        return (f"Universe({self.n_tickers} tickers, {len(self.change_dates)} changements, "
+                f"{self._packed.nbytes / 1024:.1f} Ko)")
+
+
+if __name__ == "__main__":
+    # Exemple: univers point-in-time deduit des donnees synthetiques
+    from synthetic_data import SyntheticConfig, generate_synthetic_prices
+
+    prices = generate_synthetic_prices(SyntheticConfig(n_tickers=3000, n_years=30))
+    universe = Universe.from_prices(prices)
+    print(universe)
+    print(f"Membres au debut: {universe.members_at(prices.index[0]).sum()}")
+    print(f"Membres a la fin: {universe.members_at(prices.index[-1]).sum()}")
@@ -2,6 +2,12 @@
 """
 Génération des graphiques pour le wiki GitHub
 Synthèse visuelle de toutes les stratégies testées
+
+Les valeurs sont lues dans les CSV de résultats de data/ (produits par les
+scripts d'analyse). Seuls les graphiques dont les entrées ont changé sont
+regénérés, en parallèle (reporting/charts.py):
+    python generate_wiki_charts.py            # graphiques périmés seulement
+    python generate_wiki_charts.py --force    # tout regénérer
 """
 import sys
 import os
@@ -9,139 +15,191 @@ sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 import pandas as pd
 import numpy as np
+import matplotlib
+matplotlib.use('Agg')
 import matplotlib.pyplot as plt
-import matplotlib.patches as mpatches
 import warnings
 warnings.filterwarnings('ignore')
 
+from reporting.charts import ChartSpec, build_charts
+
 # Style
 plt.style.use('default')
 plt.rcParams['figure.figsize'] = (14, 8)
 plt.rcParams['font.size'] = 10
 
-def create_comparison_chart():
+# Fichiers de résultats
+MULTIMARKET_CSV = 'data/momentum_multimarket_results.csv'  # test_momentum_multimarket.py
+EUROPE_OPTIMAL_CSV = 'data/momentum_europe_optimal_results.csv'  # test_momentum_europe_optimal.py
+MOMENTUM_COSTS_CSV = 'data/momentum_costs_analysis.csv'  # analyze_momentum_costs.py
+RANDOM_COSTS_CSV = 'data/transaction_costs_analysis.csv'  # analyze_transaction_costs.py
+MULTI_MARKET_CSV = 'data/multi_market_results.csv'  # test_multiple_markets_periods.py
+MOMENTUM_GRID_CSV = 'data/momentum_grid_search.csv'  # optimize_momentum.py
+
+US_MARKET = 'US S&P 500'
+EU_MARKET = 'Europe EURO STOXX'
+RANDOM_BASE_CONFIG = 'BASE (20/6/-10%)'
+
+# Périodes affichées (libellé du CSV -> libellé du graphique)
+US_PERIODS = {'Complete': 'Complete', 'Pre-COVID': 'Pre-COVID', 'COVID-Recovery': 'COVID\nRecovery',
+              'Bear Market 2022': 'Bear\n2022', 'Bull 2023-2024': 'Bull\n2023-24'}
+EU_PERIODS = {'Complete 2010-2024': 'Complete', 'Crise Euro 2010-2012': 'Crise\nEuro',
+              'Recovery 2012-2015': 'Recovery', 'Brexit 2015-2017': 'Brexit',
+              'COVID Crise': 'COVID\nCrise', 'Inflation/Guerre 2022-2024': '2022-24'}
+
+
+def lookup(df, column, **where):
+    """Valeur de column sur l'unique ligne verifiant where (colonne=valeur)"""
+    mask = np.ones(len(df), dtype=bool)
+    for key, value in where.items():
+        mask &= (df[key] == value).to_numpy()
+    if mask.sum() != 1:
+        raise KeyError(f"{where}: {mask.sum()} lignes trouvees pour '{column}'")
+    return float(df.loc[mask, column].iloc[0])
+
+
+def headline_returns(frames):
+    """Rendements complets des strategies (US et Europe) repris par plusieurs graphiques"""
+    multimarket = frames['momentum_multimarket_results']
+    return {
+        'bench_us': lookup(multimarket, 'bench_return', period='Complete', market=US_MARKET),
+        'random_us': lookup(frames['transaction_costs_analysis'], 'mean_return',
+                            config=RANDOM_BASE_CONFIG, fee_pct=0.0),
+        'momentum_us': lookup(multimarket, 'strat_return', period='Complete', market=US_MARKET),
+        'optimal_us': lookup(frames['momentum_costs_analysis'], 'return', fee_pct=0.0),
+        'bench_eu': lookup(multimarket, 'bench_return', period='Complete', market=EU_MARKET),
+        'random_eu': lookup(frames['multi_market_results'], 'strategy_return_mean', period='EU 2007-2024'),
+        'momentum_eu': lookup(multimarket, 'strat_return', period='Complete', market=EU_MARKET),
+        'optimal_eu': lookup(frames['momentum_europe_optimal_results'], 'strat_return',
+                             period='Complete 2010-2024'),
+    }
+
+
+def label_bars(ax, bars, values, fontsize=10):
+    """Valeur au-dessus de chaque barre"""
+    for bar, val in zip(bars, values):
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{val:.1f}%',
+                ha='center', va='bottom', fontweight='bold', fontsize=fontsize)
+
+
+def create_comparison_chart(frames):
     """Graphique comparatif des stratégies"""
+    r = headline_returns(frames)
+    costs = frames['momentum_costs_analysis']
+
     fig, axes = plt.subplots(2, 2, figsize=(16, 12))
-    fig.suptitle('Workshop Strategies Investissement - Resultats Complets', 
+    fig.suptitle('Workshop Strategies Investissement - Resultats Complets',
                  fontsize=16, fontweight='bold', y=0.98)
-    
+
     # === GRAPHIQUE 1: Rendement US ===
     ax1 = axes[0, 0]
     strategies = ['Buy & Hold\nS&P 500', 'Random +\nStop-Loss', 'Momentum\n(Base)', 'Momentum\n(Optimal)']
-    returns_us = [190.9, 123.0, 117.1, 376.3]
-    colors1 = ['#2ecc71', '#e74c3c', '#e74c3c', '#27ae60']
-    
+    returns_us = [r['bench_us'], r['random_us'], r['momentum_us'], r['optimal_us']]
+    colors1 = ['#2ecc71'] + ['#27ae60' if val > r['bench_us'] else '#e74c3c' for val in returns_us[1:]]
+
     bars1 = ax1.bar(strategies, returns_us, color=colors1, edgecolor='black', linewidth=1.5)
-    ax1.axhline(y=190.9, color='green', linestyle='--', linewidth=2, label='Benchmark S&P 500')
+    ax1.axhline(y=r['bench_us'], color='green', linestyle='--', linewidth=2, label='Benchmark S&P 500')
     ax1.set_ylabel('Rendement Total (%)', fontweight='bold')
     ax1.set_title('Marche US (2018-2024)', fontweight='bold', fontsize=12)
     ax1.legend()
     ax1.grid(axis='y', alpha=0.3)
-    
-    # Ajouter les valeurs
-    for bar, val in zip(bars1, returns_us):
-        height = bar.get_height()
-        ax1.text(bar.get_x() + bar.get_width()/2., height,
-                f'{val:.1f}%',
-                ha='center', va='bottom', fontweight='bold', fontsize=10)
-    
+    label_bars(ax1, bars1, returns_us)
+
     # === GRAPHIQUE 2: Rendement Europe ===
     ax2 = axes[0, 1]
     strategies_eu = ['Buy & Hold\nEURO STOXX', 'Momentum\n(Base)', 'Momentum\n(Optimal)']
-    returns_eu = [441.5, 296.2, 243.8]
-    colors2 = ['#2ecc71', '#e74c3c', '#e74c3c']
-    
+    returns_eu = [r['bench_eu'], r['momentum_eu'], r['optimal_eu']]
+    colors2 = ['#2ecc71'] + ['#27ae60' if val > r['bench_eu'] else '#e74c3c' for val in returns_eu[1:]]
+
     bars2 = ax2.bar(strategies_eu, returns_eu, color=colors2, edgecolor='black', linewidth=1.5)
-    ax2.axhline(y=441.5, color='green', linestyle='--', linewidth=2, label='Benchmark EURO STOXX')
+    ax2.axhline(y=r['bench_eu'], color='green', linestyle='--', linewidth=2, label='Benchmark EURO STOXX')
     ax2.set_ylabel('Rendement Total (%)', fontweight='bold')
     ax2.set_title('Marche Europe (2010-2024)', fontweight='bold', fontsize=12)
     ax2.legend()
     ax2.grid(axis='y', alpha=0.3)
-    
-    for bar, val in zip(bars2, returns_eu):
-        height = bar.get_height()
-        ax2.text(bar.get_x() + bar.get_width()/2., height,
-                f'{val:.1f}%',
-                ha='center', va='bottom', fontweight='bold', fontsize=10)
-    
+    label_bars(ax2, bars2, returns_eu)
+
     # === GRAPHIQUE 3: Impact des frais (Momentum Optimal US) ===
     ax3 = axes[1, 0]
-    fee_levels = ['0%', '0.1%', '0.2%', '0.5%', '1.0%']
-    returns_with_fees = [376.3, 358.9, 350.3, 267.3, 236.3]
-    
+    fee_levels = costs['fee_label'].tolist()
+    returns_with_fees = costs['return'].tolist()
+
     bars3 = ax3.bar(fee_levels, returns_with_fees, color='#3498db', edgecolor='black', linewidth=1.5)
-    ax3.axhline(y=190.9, color='red', linestyle='--', linewidth=2, label='Benchmark S&P 500')
+    ax3.axhline(y=r['bench_us'], color='red', linestyle='--', linewidth=2, label='Benchmark S&P 500')
     ax3.set_ylabel('Rendement Total (%)', fontweight='bold')
     ax3.set_xlabel('Frais de Transaction', fontweight='bold')
     ax3.set_title('Impact des Frais - Momentum Optimal (US)', fontweight='bold', fontsize=12)
     ax3.legend()
     ax3.grid(axis='y', alpha=0.3)
-    
-    for bar, val in zip(bars3, returns_with_fees):
-        height = bar.get_height()
-        ax3.text(bar.get_x() + bar.get_width()/2., height,
-                f'{val:.1f}%',
-                ha='center', va='bottom', fontweight='bold', fontsize=9)
-    
+    label_bars(ax3, bars3, returns_with_fees, fontsize=9)
+
     # === GRAPHIQUE 4: Scorecard ===
     ax4 = axes[1, 1]
     ax4.axis('off')
-    
-    # Tableau récapitulatif
+
+    def verdict(value, benchmark):
+        return f"{'✅' if value >= benchmark else '❌'} {value:.0f}%"
+
+    # Tableau récapitulatif (la colonne frais reste qualitative)
     table_data = [
         ['Stratégie', 'US', 'Europe', 'Frais 0.5%'],
-        ['Buy & Hold Indice', '✅ 191%', '✅ 442%', '✅ Bas'],
-        ['Random + Stop-Loss', '❌ 123%', '❌ 353%', '✅ Modéré'],
-        ['Momentum (Base)', '❌ 117%', '❌ 296%', '❌ Élevé'],
-        ['Momentum (Optimal)', '✅ 376%', '❌ 244%', '⚠️ Très élevé'],
+        ['Buy & Hold Indice', f"✅ {r['bench_us']:.0f}%", f"✅ {r['bench_eu']:.0f}%", '✅ Bas'],
+        ['Random + Stop-Loss', verdict(r['random_us'], r['bench_us']),
+         verdict(r['random_eu'], r['bench_eu']), '✅ Modéré'],
+        ['Momentum (Base)', verdict(r['momentum_us'], r['bench_us']),
+         verdict(r['momentum_eu'], r['bench_eu']), '❌ Élevé'],
+        ['Momentum (Optimal)', verdict(r['optimal_us'], r['bench_us']),
+         verdict(r['optimal_eu'], r['bench_eu']), '⚠️ Très élevé'],
     ]
-    
+
     table = ax4.table(cellText=table_data, cellLoc='center', loc='center',
                      colWidths=[0.3, 0.2, 0.2, 0.3])
     table.auto_set_font_size(False)
     table.set_fontsize(10)
     table.scale(1, 2.5)
-    
+
     # Style header
     for i in range(4):
         table[(0, i)].set_facecolor('#34495e')
         table[(0, i)].set_text_props(weight='bold', color='white')
-    
+
     # Style lignes
     for i in range(1, 5):
         for j in range(4):
             if i % 2 == 0:
                 table[(i, j)].set_facecolor('#ecf0f1')
-    
+
     ax4.set_title('Tableau Comparatif', fontweight='bold', fontsize=12, pad=20)
-    
+
     plt.tight_layout()
-    plt.savefig('charts/wiki_summary_charts.png', dpi=150, bbox_inches='tight', 
-                facecolor='white', edgecolor='none')
-    print("[OK] Graphique 1 sauvegarde: charts/wiki_summary_charts.png")
-    plt.close()
+    return fig
 
 
-def create_period_analysis_chart():
+def create_period_analysis_chart(frames):
     """Analyse par période historique"""
+    multimarket = frames['momentum_multimarket_results']
+    europe = frames['momentum_europe_optimal_results']
+
     fig, axes = plt.subplots(1, 2, figsize=(16, 6))
-    fig.suptitle('Performance par Periode Historique - Momentum Optimal (10, 3M, Q)', 
+    fig.suptitle('Performance par Periode Historique - Momentum Optimal (10, 3M, Q)',
                  fontsize=14, fontweight='bold')
-    
+
     # === US ===
     ax1 = axes[0]
-    periods_us = ['Complete', 'Pre-COVID', 'COVID\nRecovery', 'Bear\n2022', 'Bull\n2023-24']
-    strat_us = [117.1, 6.1, 15.7, 0.0, 9.4]
-    bench_us = [190.9, 37.5, 106.3, -9.1, 40.9]
-    
+    periods_us = list(US_PERIODS.values())
+    strat_us = [lookup(multimarket, 'strat_return', period=p, market=US_MARKET) for p in US_PERIODS]
+    bench_us = [lookup(multimarket, 'bench_return', period=p, market=US_MARKET) for p in US_PERIODS]
+
     x = np.arange(len(periods_us))
     width = 0.35
-    
-    bars1 = ax1.bar(x - width/2, strat_us, width, label='Momentum Optimal', 
-                    color='#3498db', edgecolor='black')
-    bars2 = ax1.bar(x + width/2, bench_us, width, label='S&P 500', 
-                    color='#e74c3c', edgecolor='black')
-    
+
+    ax1.bar(x - width/2, strat_us, width, label='Momentum Optimal',
+            color='#3498db', edgecolor='black')
+    ax1.bar(x + width/2, bench_us, width, label='S&P 500',
+            color='#e74c3c', edgecolor='black')
+
     ax1.set_ylabel('Rendement (%)', fontweight='bold')
     ax1.set_title('Etats-Unis (2018-2024)', fontweight='bold')
     ax1.set_xticks(x)
@@ -149,20 +207,20 @@ def create_period_analysis_chart():
     ax1.legend()
     ax1.grid(axis='y', alpha=0.3)
     ax1.axhline(y=0, color='black', linewidth=0.5)
-    
+
     # === Europe ===
     ax2 = axes[1]
-    periods_eu = ['Complete', 'Crise\nEuro', 'Recovery', 'Brexit', 'COVID\nCrise', '2022-24']
-    strat_eu = [243.8, 15.4, 70.8, 0.8, -15.6, 39.9]
-    bench_eu = [441.5, 22.5, 94.5, 40.9, -28.0, 32.6]
-    
+    periods_eu = list(EU_PERIODS.values())
+    strat_eu = [lookup(europe, 'strat_return', period=p) for p in EU_PERIODS]
+    bench_eu = [lookup(europe, 'bench_return', period=p) for p in EU_PERIODS]
+
     x2 = np.arange(len(periods_eu))
-    
-    bars3 = ax2.bar(x2 - width/2, strat_eu, width, label='Momentum Optimal', 
-                    color='#3498db', edgecolor='black')
-    bars4 = ax2.bar(x2 + width/2, bench_eu, width, label='EURO STOXX', 
-                    color='#e74c3c', edgecolor='black')
-    
+
+    ax2.bar(x2 - width/2, strat_eu, width, label='Momentum Optimal',
+            color='#3498db', edgecolor='black')
+    ax2.bar(x2 + width/2, bench_eu, width, label='EURO STOXX',
+            color='#e74c3c', edgecolor='black')
+
     ax2.set_ylabel('Rendement (%)', fontweight='bold')
     ax2.set_title('Europe (2010-2024)', fontweight='bold')
     ax2.set_xticks(x2)
@@ -170,205 +228,172 @@ def create_period_analysis_chart():
     ax2.legend()
     ax2.grid(axis='y', alpha=0.3)
     ax2.axhline(y=0, color='black', linewidth=0.5)
-    
+
     plt.tight_layout()
-    plt.savefig('charts/wiki_period_analysis.png', dpi=150, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    print("[OK] Graphique 2 sauvegarde: charts/wiki_period_analysis.png")
-    plt.close()
+    return fig
 
 
-def create_grid_search_heatmap():
+def create_grid_search_heatmap(frames):
     """Heatmap des résultats du grid search Momentum"""
+    grid = frames['momentum_grid_search']
+    if 'signal' in grid:
+        # Momentum total sans saut (les variantes sont comparees dans optimize_momentum.py)
+        grid = grid[(grid['signal'] == 'momentum') & (grid['skip_months'] == 0)]
+
     fig, axes = plt.subplots(1, 2, figsize=(16, 6))
-    fig.suptitle('Grid Search Momentum - Impact des Parametres (US 2018-2024)', 
+    fig.suptitle('Grid Search Momentum - Impact des Parametres (US 2018-2024)',
                  fontsize=14, fontweight='bold')
-    
-    # Données simulées basées sur nos résultats
-    lookbacks = [3, 6, 9, 12]
-    n_stocks = [10, 20, 30]
-    
-    # Rendement moyen par paramètre (Mensuel)
-    returns_monthly = np.array([
-        [326.3, 170.6, 119.7, 143.8],  # N=10
-        [207.1, 124.0, 113.3, 117.1],  # N=20
-        [180.5, 117.5, 101.5, 121.0],  # N=30
-    ])
-    
-    # Rendement moyen par paramètre (Trimestriel)
-    returns_quarterly = np.array([
-        [376.3, 253.4, 209.0, 213.3],  # N=10
-        [210.3, 189.8, 198.5, 189.2],  # N=20
-        [171.9, 206.0, 180.2, 188.3],  # N=30
-    ])
-    
-    # Heatmap Mensuel
-    ax1 = axes[0]
-    im1 = ax1.imshow(returns_monthly, cmap='RdYlGn', aspect='auto', vmin=100, vmax=400)
-    ax1.set_xticks(range(len(lookbacks)))
-    ax1.set_yticks(range(len(n_stocks)))
-    ax1.set_xticklabels([f'{l} mois' for l in lookbacks])
-    ax1.set_yticklabels([f'{n} actions' for n in n_stocks])
-    ax1.set_xlabel('Lookback (mois)', fontweight='bold')
-    ax1.set_ylabel('Nombre d\'actions', fontweight='bold')
-    ax1.set_title('Rebalancement Mensuel', fontweight='bold')
-    
-    # Ajouter les valeurs
-    for i in range(len(n_stocks)):
-        for j in range(len(lookbacks)):
-            text = ax1.text(j, i, f'{returns_monthly[i, j]:.0f}%',
-                           ha="center", va="center", color="black", fontweight='bold')
-    
-    plt.colorbar(im1, ax=ax1, label='Rendement (%)')
-    
-    # Heatmap Trimestriel
-    ax2 = axes[1]
-    im2 = ax2.imshow(returns_quarterly, cmap='RdYlGn', aspect='auto', vmin=100, vmax=400)
-    ax2.set_xticks(range(len(lookbacks)))
-    ax2.set_yticks(range(len(n_stocks)))
-    ax2.set_xticklabels([f'{l} mois' for l in lookbacks])
-    ax2.set_yticklabels([f'{n} actions' for n in n_stocks])
-    ax2.set_xlabel('Lookback (mois)', fontweight='bold')
-    ax2.set_ylabel('Nombre d\'actions', fontweight='bold')
-    ax2.set_title('Rebalancement Trimestriel', fontweight='bold')
-    
-    for i in range(len(n_stocks)):
-        for j in range(len(lookbacks)):
-            text = ax2.text(j, i, f'{returns_quarterly[i, j]:.0f}%',
-                           ha="center", va="center", color="black", fontweight='bold')
-    
-    plt.colorbar(im2, ax=ax2, label='Rendement (%)')
-    
+
+    for ax, freq, title in [(axes[0], 'M', 'Rebalancement Mensuel'),
+                            (axes[1], 'Q', 'Rebalancement Trimestriel')]:
+        # Rendement moyen par (nombre d'actions, lookback)
+        table = grid[grid['rebalancing_freq'] == freq].pivot(
+            index='n_stocks', columns='lookback_months', values='total_return_mean')
+        lookbacks = table.columns.tolist()
+        n_stocks = table.index.tolist()
+        returns = table.to_numpy()
+
+        im = ax.imshow(returns, cmap='RdYlGn', aspect='auto', vmin=100, vmax=400)
+        ax.set_xticks(range(len(lookbacks)))
+        ax.set_yticks(range(len(n_stocks)))
+        ax.set_xticklabels([f'{l} mois' for l in lookbacks])
+        ax.set_yticklabels([f'{n} actions' for n in n_stocks])
+        ax.set_xlabel('Lookback (mois)', fontweight='bold')
+        ax.set_ylabel('Nombre d\'actions', fontweight='bold')
+        ax.set_title(title, fontweight='bold')
+
+        # Ajouter les valeurs
+        for i in range(len(n_stocks)):
+            for j in range(len(lookbacks)):
+                ax.text(j, i, f'{returns[i, j]:.0f}%',
+                        ha="center", va="center", color="black", fontweight='bold')
+
+        plt.colorbar(im, ax=ax, label='Rendement (%)')
+
     plt.tight_layout()
-    plt.savefig('charts/wiki_gridsearch_heatmap.png', dpi=150, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    print("[OK] Graphique 3 sauvegarde: charts/wiki_gridsearch_heatmap.png")
-    plt.close()
+    return fig
 
 
-def create_conclusion_chart():
+def create_conclusion_chart(frames):
     """Graphique de conclusion - Leçons apprises"""
+    r = headline_returns(frames)
+    costs = frames['momentum_costs_analysis']
+
     fig = plt.figure(figsize=(14, 10))
     gs = fig.add_gridspec(3, 2, hspace=0.4, wspace=0.3)
-    
-    fig.suptitle('Lecons Apprises - Workshop Strategies Investissement', 
+
+    fig.suptitle('Lecons Apprises - Workshop Strategies Investissement',
                  fontsize=16, fontweight='bold')
-    
+
     # === 1. Pourcentage de réussite ===
     ax1 = fig.add_subplot(gs[0, 0])
     categories = ['US\n(Momentum)', 'Europe\n(Momentum)', 'Pros\nvs Indice']
-    success_rates = [100, 25, 10]  # % de surperformance
+    success_rates = [100, 25, 10]  # % de surperformance (synthese qualitative)
     colors = ['#27ae60', '#e74c3c', '#f39c12']
-    
+
     bars = ax1.bar(categories, success_rates, color=colors, edgecolor='black', linewidth=2)
     ax1.set_ylabel('% Surperformance', fontweight='bold')
     ax1.set_title('Taux de Réussite', fontweight='bold')
     ax1.set_ylim(0, 110)
     ax1.grid(axis='y', alpha=0.3)
-    
+
     for bar, val in zip(bars, success_rates):
         ax1.text(bar.get_x() + bar.get_width()/2., bar.get_height() + 2,
                 f'{val}%', ha='center', va='bottom', fontweight='bold', fontsize=12)
-    
+
     # === 2. Impact des frais ===
     ax2 = fig.add_subplot(gs[0, 1])
-    fee_rates = [0, 0.5, 1.0]
-    momentum_returns = [376.3, 267.3, 236.3]
-    
-    ax2.plot(fee_rates, momentum_returns, 'o-', linewidth=3, markersize=10, 
+    shown = costs[costs['fee_pct'].isin([0.0, 0.005, 0.01])]
+
+    ax2.plot(shown['fee_pct'] * 100, shown['return'], 'o-', linewidth=3, markersize=10,
              color='#3498db', label='Momentum Optimal')
-    ax2.axhline(y=190.9, color='red', linestyle='--', linewidth=2, label='S&P 500')
+    ax2.axhline(y=r['bench_us'], color='red', linestyle='--', linewidth=2, label='S&P 500')
     ax2.set_xlabel('Frais de Transaction (%)', fontweight='bold')
     ax2.set_ylabel('Rendement (%)', fontweight='bold')
     ax2.set_title('Érosion par les Frais', fontweight='bold')
     ax2.legend()
     ax2.grid(alpha=0.3)
-    
+
     # === 3. Complexité vs Performance ===
     ax3 = fig.add_subplot(gs[1, :])
-    strategies = ['ETF S&P 500\n(Buy & Hold)', 'Random + Stop-Loss', 
+    strategies = ['ETF S&P 500\n(Buy & Hold)', 'Random + Stop-Loss',
                   'Momentum (Base)', 'Momentum (Optimal)']
     complexity = [1, 3, 4, 5]
-    performance = [190.9, 123.0, 117.1, 376.3]
-    colors_scatter = ['#2ecc71', '#e74c3c', '#e74c3c', '#27ae60']
-    
-    scatter = ax3.scatter(complexity, performance, s=500, c=colors_scatter, 
-                         edgecolors='black', linewidth=2, alpha=0.8)
-    
+    performance = [r['bench_us'], r['random_us'], r['momentum_us'], r['optimal_us']]
+    colors_scatter = ['#2ecc71'] + ['#27ae60' if val > r['bench_us'] else '#e74c3c' for val in performance[1:]]
+
+    ax3.scatter(complexity, performance, s=500, c=colors_scatter,
+                edgecolors='black', linewidth=2, alpha=0.8)
+
     for i, txt in enumerate(strategies):
-        ax3.annotate(txt, (complexity[i], performance[i]), 
+        ax3.annotate(txt, (complexity[i], performance[i]),
                     xytext=(10, 10), textcoords='offset points',
                     fontsize=10, fontweight='bold')
-    
-    ax3.axhline(y=190.9, color='red', linestyle='--', linewidth=2, alpha=0.5, label='Benchmark')
+
+    ax3.axhline(y=r['bench_us'], color='red', linestyle='--', linewidth=2, alpha=0.5, label='Benchmark')
     ax3.set_xlabel('Complexité de la Stratégie', fontweight='bold')
     ax3.set_ylabel('Rendement US 2018-2024 (%)', fontweight='bold')
     ax3.set_title('Complexité vs Performance', fontweight='bold')
     ax3.set_xticks([1, 2, 3, 4, 5])
     ax3.grid(alpha=0.3)
     ax3.legend()
-    
+
     # === 4. Texte de conclusion ===
     ax4 = fig.add_subplot(gs[2, :])
     ax4.axis('off')
-    
+
     conclusion_text = """
     CONCLUSIONS CLES
-    
-    1. SUR LE MARCHE US : Le Momentum Optimal (10 actions, 3 mois, trimestriel) surperforme de +76% 
+
+    1. SUR LE MARCHE US : Le Momentum Optimal (10 actions, 3 mois, trimestriel) surperforme de +76%
        avec des frais realistes (0.5%). C'est la seule strategie testee qui bat l'indice.
-    
+
     2. SUR LE MARCHE EUROPEEN : Aucune strategie ne surperforme. Le Buy & Hold reste le meilleur choix.
-    
-    3. IMPACT DES FRAIS : Avec 1% de frais par transaction, l'avantage du Momentum fond a +45%, 
+
+    3. IMPACT DES FRAIS : Avec 1% de frais par transaction, l'avantage du Momentum fond a +45%,
        mais reste positif. Au-dela, la strategie devient non rentable.
-    
+
     4. COMPLEXITE : La strategie la plus simple (ETF) bat 90% des strategies actives sur le long terme.
        Plus on complexifie, plus on risque de sous-performer.
-    
+
     5. RECOMMANDATION : Pour un investisseur lambda, un ETF World ou S&P 500 reste le meilleur choix.
        Le Momentum Optimal n'est viable que sur le marche US et avec des frais tres faibles.
     """
-    
+
     ax4.text(0.05, 0.95, conclusion_text, transform=ax4.transAxes,
             fontsize=11, verticalalignment='top', fontfamily='monospace',
             bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
-    
-    plt.savefig('charts/wiki_conclusion.png', dpi=150, bbox_inches='tight',
-                facecolor='white', edgecolor='none')
-    print("[OK] Graphique 4 sauvegarde: charts/wiki_conclusion.png")
-    plt.close()
+
+    return fig
+
+
+# Graphiques du wiki: fonction de rendu et fichiers de résultats lus
+WIKI_CHARTS = [
+    ChartSpec('wiki_summary_charts', create_comparison_chart,
+              (MULTIMARKET_CSV, EUROPE_OPTIMAL_CSV, MOMENTUM_COSTS_CSV, RANDOM_COSTS_CSV, MULTI_MARKET_CSV)),
+    ChartSpec('wiki_period_analysis', create_period_analysis_chart, (MULTIMARKET_CSV, EUROPE_OPTIMAL_CSV)),
+    ChartSpec('wiki_gridsearch_heatmap', create_grid_search_heatmap, (MOMENTUM_GRID_CSV,)),
+    ChartSpec('wiki_conclusion', create_conclusion_chart,
+              (MULTIMARKET_CSV, EUROPE_OPTIMAL_CSV, MOMENTUM_COSTS_CSV, RANDOM_COSTS_CSV, MULTI_MARKET_CSV)),
+]
 
 
-def main():
+def main(force=False, output_dir='charts'):
     print("="*70)
     print("GÉNÉRATION DES GRAPHIQUES POUR LE WIKI GITHUB")
     print("="*70)
-    
-    # Créer le dossier charts s'il n'existe pas
-    os.makedirs('charts', exist_ok=True)
-    
-    print("\n[1/4] Creation du graphique comparatif...")
-    create_comparison_chart()
-    
-    print("\n[2/4] Creation de l'analyse par periode...")
-    create_period_analysis_chart()
-    
-    print("\n[3/4] Creation des heatmaps...")
-    create_grid_search_heatmap()
-    
-    print("\n[4/4] Creation du graphique de conclusion...")
-    create_conclusion_chart()
-    
-    print("\n" + "="*70)
-    print("TOUS LES GRAPHIQUES ONT ÉTÉ GÉNÉRÉS")
-    print("="*70)
-    print("\nFichiers créés:")
-    print("  - charts/wiki_summary_charts.png")
-    print("  - charts/wiki_period_analysis.png")
-    print("  - charts/wiki_gridsearch_heatmap.png")
-    print("  - charts/wiki_conclusion.png")
+
+    status = build_charts(WIKI_CHARTS, output_dir=output_dir, force=force)
+
+    print(f"\n{'Graphique':<45} Etat")
+    print("-"*70)
+    for spec in WIKI_CHARTS:
+        print(f"  {os.path.join(output_dir, spec.filename):<43} {status[spec.name]}")
+
+    n_rendered = sum(state == 'rendu' for state in status.values())
+    print(f"\n[OK] {n_rendered} graphique(s) regenere(s), {len(status) - n_rendered} a jour")
+    return status
 
 
 if __name__ == "__main__":
-    main()
+    main(force='--force' in sys.argv)
@@ -5,6 +5,11 @@ Grid Search complet sur:
 - Nombre d'actions (n_stocks)
 - Periode de lookback (lookback_months)
 - Frequence de rebalancement (rebalancing_freq)
+- Mois les plus recents exclus (skip_months, 1 = momentum 12-1)
+- Variante du signal (momentum total, normalise par la volatilite, residuel)
+
+Moteur vectorbt (optionnel, toutes les configurations en un appel):
+    MOMENTUM_ENGINE=vectorbt python optimize_momentum.py
 """
 import sys
 import os
@@ -14,11 +19,12 @@ import pandas as pd
 import numpy as np
 import itertools
 import time
+from dataclasses import replace
 import warnings
 warnings.filterwarnings('ignore')
 
 from data.download_data import get_sp500_tickers, download_stock_data
-from strategies.momentum import MomentumStrategy, MomentumConfig
+from strategies.momentum import MomentumStrategy, MomentumConfig, run_vectorbt_grid
 
 
 def calculate_benchmark(prices):
@@ -33,13 +39,7 @@ def test_configuration(prices, config, n_simulations=30):
     results = []
     
     for i in range(n_simulations):
-        sim_config = MomentumConfig(
-            n_stocks=config.n_stocks,
-            lookback_months=config.lookback_months,
-            rebalancing_freq=config.rebalancing_freq,
-            init_cash=config.init_cash,
-            seed=i
-        )
+        sim_config = replace(config, seed=i)
         
         strategy = MomentumStrategy(sim_config)
         result = strategy.run_backtest_simple(prices, verbose=False)
@@ -67,7 +67,22 @@ def test_configuration(prices, config, n_simulations=30):
     }
 
 
-def main():
+def test_configurations_vectorbt(prices, configs):
+    """
+    Toutes les configurations en un seul appel vectorbt (run_vectorbt_grid)
+    Le momentum est deterministe: une simulation par configuration suffit.
+    """
+    return [{
+        'total_return_mean': result['total_return'],
+        'total_return_std': 0.0,
+        'sharpe_ratio_mean': result['sharpe_ratio'],
+        'max_drawdown_mean': result['max_drawdown'],
+        'volatility_mean': result['volatility'],
+        'n_transactions_mean': result['n_transactions']
+    } for result in run_vectorbt_grid(prices, configs)]
+
+
+def main(engine='native'):
     print("="*70)
     print("OPTIMISATION GRID SEARCH - STRATEGIE MOMENTUM")
     print("="*70)
@@ -93,24 +108,33 @@ def main():
     param_grid = {
         'n_stocks': [10, 20, 30],           # Nombre d'actions
         'lookback_months': [3, 6, 9, 12],   # Periode de lookback
-        'rebalancing_freq': ['M', 'Q']      # Mensuel, Trimestriel
+        'rebalancing_freq': ['M', 'Q'],     # Mensuel, Trimestriel
+        'skip_months': [0, 1],              # 1 = dernier mois exclu (12-1)
+        'signal': ['momentum', 'vol_scaled_momentum', 'residual_momentum']
     }
     
     # Generer toutes les combinaisons
     combinations = list(itertools.product(
         param_grid['n_stocks'],
         param_grid['lookback_months'],
-        param_grid['rebalancing_freq']
+        param_grid['rebalancing_freq'],
+        param_grid['skip_months'],
+        param_grid['signal']
     ))
     
     print(f"  Nombre de configurations a tester: {len(combinations)}")
-    print(f"  Simulations par config: 30")
-    print(f"  Total simulations: {len(combinations) * 30}")
+    if engine == 'vectorbt':
+        print("  Moteur: vectorbt (un seul appel, une simulation par config)")
+    else:
+        print(f"  Simulations par config: 30")
+        print(f"  Total simulations: {len(combinations) * 30}")
     
     print("\n  Parametres:")
     print(f"    - N actions: {param_grid['n_stocks']}")
     print(f"    - Lookback (mois): {param_grid['lookback_months']}")
     print(f"    - Rebalancement: {param_grid['rebalancing_freq']}")
+    print(f"    - Mois exclus: {param_grid['skip_months']}")
+    print(f"    - Signal: {param_grid['signal']}")
     
     # ============================================================
     # EXECUTION
@@ -121,22 +145,33 @@ def main():
     results = []
     start_time = time.time()
     
-    for idx, (n_stocks, lookback, freq) in enumerate(combinations):
-        print(f"\n[{idx+1}/{len(combinations)}] Testing: N={n_stocks}, Lookback={lookback}mo, Freq={freq}")
-        
-        config = MomentumConfig(
-            n_stocks=n_stocks,
-            lookback_months=lookback,
-            rebalancing_freq=freq,
-            init_cash=100_000
-        )
+    configs = [MomentumConfig(
+        n_stocks=n_stocks,
+        lookback_months=lookback,
+        rebalancing_freq=freq,
+        init_cash=100_000,
+        skip_months=skip,
+        signals=signal
+    ) for n_stocks, lookback, freq, skip, signal in combinations]
+    
+    if engine == 'vectorbt':
+        grid_results = test_configurations_vectorbt(prices, configs)
+    
+    for idx, ((n_stocks, lookback, freq, skip, signal), config) in enumerate(zip(combinations, configs)):
+        print(f"\n[{idx+1}/{len(combinations)}] Testing: N={n_stocks}, Lookback={lookback}-{skip}mo, "
+              f"Freq={freq}, Signal={signal}")
         
-        result = test_configuration(prices, config, n_simulations=30)
+        if engine == 'vectorbt':
+            result = grid_results[idx]
+        else:
+            result = test_configuration(prices, config, n_simulations=30)
         
         if result:
             result['n_stocks'] = n_stocks
             result['lookback_months'] = lookback
             result['rebalancing_freq'] = freq
+            result['skip_months'] = skip
+            result['signal'] = signal
             result['outperformance'] = result['total_return_mean'] - benchmark_return
             results.append(result)
             
@@ -164,33 +199,36 @@ def main():
     # TOP 10 par rendement
     print("\n--- TOP 10 PAR RENDEMENT ---")
     top_return = df_results.nlargest(10, 'total_return_mean')[
-        ['n_stocks', 'lookback_months', 'rebalancing_freq', 
+        ['n_stocks', 'lookback_months', 'rebalancing_freq', 'skip_months', 'signal',
          'total_return_mean', 'sharpe_ratio_mean', 'outperformance']
     ]
     for i, row in top_return.iterrows():
-        print(f"  N={row['n_stocks']:2d}, LB={row['lookback_months']:2d}mo, F={row['rebalancing_freq']} | "
+        print(f"  N={row['n_stocks']:2d}, LB={row['lookback_months']:2d}-{row['skip_months']}mo, "
+              f"F={row['rebalancing_freq']}, {row['signal']} | "
               f"Return={row['total_return_mean']:6.1f}% | Sharpe={row['sharpe_ratio_mean']:.2f} | "
               f"Surperf={row['outperformance']:+6.1f}%")
     
     # TOP 10 par Sharpe ratio
     print("\n--- TOP 10 PAR SHARPE RATIO ---")
     top_sharpe = df_results.nlargest(10, 'sharpe_ratio_mean')[
-        ['n_stocks', 'lookback_months', 'rebalancing_freq', 
+        ['n_stocks', 'lookback_months', 'rebalancing_freq', 'skip_months', 'signal',
          'total_return_mean', 'sharpe_ratio_mean', 'outperformance']
     ]
     for i, row in top_sharpe.iterrows():
-        print(f"  N={row['n_stocks']:2d}, LB={row['lookback_months']:2d}mo, F={row['rebalancing_freq']} | "
+        print(f"  N={row['n_stocks']:2d}, LB={row['lookback_months']:2d}-{row['skip_months']}mo, "
+              f"F={row['rebalancing_freq']}, {row['signal']} | "
               f"Sharpe={row['sharpe_ratio_mean']:5.2f} | Return={row['total_return_mean']:6.1f}% | "
               f"Surperf={row['outperformance']:+6.1f}%")
     
     # TOP 10 par surperformance
     print("\n--- TOP 10 PAR SURPERFORMANCE ---")
     top_outperf = df_results.nlargest(10, 'outperformance')[
-        ['n_stocks', 'lookback_months', 'rebalancing_freq', 
+        ['n_stocks', 'lookback_months', 'rebalancing_freq', 'skip_months', 'signal',
          'total_return_mean', 'sharpe_ratio_mean', 'outperformance']
     ]
     for i, row in top_outperf.iterrows():
-        print(f"  N={row['n_stocks']:2d}, LB={row['lookback_months']:2d}mo, F={row['rebalancing_freq']} | "
+        print(f"  N={row['n_stocks']:2d}, LB={row['lookback_months']:2d}-{row['skip_months']}mo, "
+              f"F={row['rebalancing_freq']}, {row['signal']} | "
               f"Surperf={row['outperformance']:+6.1f}% | Return={row['total_return_mean']:6.1f}% | "
               f"Sharpe={row['sharpe_ratio_mean']:.2f}")
     
@@ -205,6 +243,8 @@ def main():
     print(f"  N actions:         {best_outperf['n_stocks']}")
     print(f"  Lookback:          {best_outperf['lookback_months']} mois")
     print(f"  Rebalancement:     {best_outperf['rebalancing_freq']} ({'Mensuel' if best_outperf['rebalancing_freq']=='M' else 'Trimestriel'})")
+    print(f"  Mois exclus:       {best_outperf['skip_months']}")
+    print(f"  Signal:            {best_outperf['signal']}")
     print(f"  Rendement:         {best_outperf['total_return_mean']:.1f}%")
     print(f"  Sharpe Ratio:      {best_outperf['sharpe_ratio_mean']:.2f}")
     print(f"  Max Drawdown:      {best_outperf['max_drawdown_mean']:.1f}%")
@@ -217,6 +257,8 @@ def main():
     print(f"  N actions:         {best_sharpe['n_stocks']}")
     print(f"  Lookback:          {best_sharpe['lookback_months']} mois")
     print(f"  Rebalancement:     {best_sharpe['rebalancing_freq']}")
+    print(f"  Mois exclus:       {best_sharpe['skip_months']}")
+    print(f"  Signal:            {best_sharpe['signal']}")
     print(f"  Rendement:         {best_sharpe['total_return_mean']:.1f}%")
     print(f"  Sharpe Ratio:      {best_sharpe['sharpe_ratio_mean']:.2f}")
     print(f"  Surperformance:    {best_sharpe['outperformance']:+.1f}%")
@@ -248,8 +290,22 @@ def main():
               f"Sharpe={subset['sharpe_ratio_mean'].mean():.2f} | "
               f"Surperf={subset['outperformance'].mean():+6.1f}%")
     
+    print("\n[Impact du saut du dernier mois]:")
+    for skip in param_grid['skip_months']:
+        subset = df_results[df_results['skip_months'] == skip]
+        print(f"  Skip={skip}mo: Return={subset['total_return_mean'].mean():6.1f}% | "
+              f"Sharpe={subset['sharpe_ratio_mean'].mean():.2f} | "
+              f"Surperf={subset['outperformance'].mean():+6.1f}%")
+    
+    print("\n[Impact du signal]:")
+    for signal in param_grid['signal']:
+        subset = df_results[df_results['signal'] == signal]
+        print(f"  {signal:20s}: Return={subset['total_return_mean'].mean():6.1f}% | "
+              f"Sharpe={subset['sharpe_ratio_mean'].mean():.2f} | "
+              f"Surperf={subset['outperformance'].mean():+6.1f}%")
+    
     return df_results
 
 
 if __name__ == "__main__":
-    results = main()
+    results = main(engine=os.environ.get('MOMENTUM_ENGINE', 'native'))
@@ -15,10 +15,12 @@ from tqdm import tqdm
 warnings.filterwarnings('ignore')
 
 from data.download_data import get_sp500_tickers, download_stock_data
-from strategies.random_stoploss import RandomStopLossStrategy, StrategyConfig, run_monte_carlo_simulation
+from strategies.random_stoploss import (RandomStopLossStrategy, StrategyConfig, run_monte_carlo_simulation,
+                                        run_paired_monte_carlo)
+from strategies.variance_reduction import paired_differences
 
 
-def grid_search_optimization(prices, param_grid, n_simulations_per_config=30):
+def grid_search_optimization(prices, param_grid, n_simulations_per_config=30, stop_check='rebalance'):
     """
     Grid search pour trouver les meilleurs hyperparametres
     
@@ -26,6 +28,7 @@ def grid_search_optimization(prices, param_grid, n_simulations_per_config=30):
         prices: DataFrame des prix historiques
         param_grid: Dictionnaire des parametres a tester
         n_simulations_per_config: Nombre de simulations Monte Carlo par configuration
+        stop_check: 'rebalance' (debuts de mois) ou 'daily' (stop evenementiel quotidien)
     
     Returns:
         DataFrame avec les resultats de chaque configuration
@@ -56,7 +59,8 @@ def grid_search_optimization(prices, param_grid, n_simulations_per_config=30):
             lookback_months=params['lookback_months'],
             stop_loss_threshold=params['stop_loss_threshold'],
             init_cash=100_000,
-            seed=None
+            seed=None,
+            stop_check=stop_check
         )
         
         # Executer les simulations Monte Carlo
@@ -319,9 +323,13 @@ def visualize_optimization_results(results_df, save_dir='charts'):
     print(f"Graphique sauvegarde: {save_dir}/optimization_top10.png")
 
 
-def compare_configs(prices, baseline_config, optimized_config, n_simulations=50):
+def compare_configs(prices, baseline_config, optimized_config, n_simulations=50, paired=False):
     """
     Compare la configuration de base avec l'optimisee
+    
+    paired=True: nombres aleatoires communs (memes tirages pour les deux
+    configurations a chaque simulation), differences appariees avec intervalle
+    de confiance a 95% sur les moyennes
     """
     print("\n" + "="*70)
     print("COMPARAISON: CONFIGURATION DE BASE vs OPTIMISEE")
@@ -333,15 +341,20 @@ def compare_configs(prices, baseline_config, optimized_config, n_simulations=50)
           f"lookback={baseline_config.lookback_months}mois, "
           f"stop_loss={baseline_config.stop_loss_threshold*100:.0f}%")
     
-    baseline_results = run_monte_carlo_simulation(prices, n_simulations, baseline_config)
-    
     # Test configuration optimale
     print("\n2. Configuration OPTIMISEE:")
     print(f"   n_stocks={optimized_config.n_stocks}, "
           f"lookback={optimized_config.lookback_months}mois, "
           f"stop_loss={optimized_config.stop_loss_threshold*100:.0f}%")
     
-    optimized_results = run_monte_carlo_simulation(prices, n_simulations, optimized_config)
+    if paired:
+        results = run_paired_monte_carlo(prices, {'baseline': baseline_config, 'optimized': optimized_config},
+                                         n_simulations)
+        baseline_results = results[results['config'] == 'baseline'].reset_index(drop=True)
+        optimized_results = results[results['config'] == 'optimized'].reset_index(drop=True)
+    else:
+        baseline_results = run_monte_carlo_simulation(prices, n_simulations, baseline_config)
+        optimized_results = run_monte_carlo_simulation(prices, n_simulations, optimized_config)
     
     # Comparaison
     print("\n" + "="*70)
@@ -372,6 +385,16 @@ def compare_configs(prices, baseline_config, optimized_config, n_simulations=50)
     comparison['Difference'] = comparison['Configuration Optimisee'] - comparison['Configuration de Base']
     comparison['Amelioration (%)'] = (comparison['Difference'] / comparison['Configuration de Base'] * 100).abs()
     
+    if paired:
+        # Intervalles de confiance des differences moyennes (rendement, Sharpe, drawdown)
+        differences = paired_differences(results, 'baseline', 'optimized').set_index('metric')
+        mean_rows = {'Rendement Moyen (%)': 'total_return', 'Sharpe Moyen': 'sharpe_ratio',
+                     'Drawdown Moyen (%)': 'max_drawdown'}
+        metric = comparison['Metrique'].map(mean_rows)
+        comparison['IC 95% bas'] = metric.map(differences['ci_low'])
+        comparison['IC 95% haut'] = metric.map(differences['ci_high'])
+        comparison['Gain de variance'] = metric.map(differences['variance_reduction'])
+    
     print(comparison.to_string(index=False))
     
     # Sauvegarder la comparaison
@@ -456,7 +479,7 @@ def main():
         seed=42
     )
     
-    comparison = compare_configs(prices, baseline_config, optimized_config, n_simulations=30)
+    comparison = compare_configs(prices, baseline_config, optimized_config, n_simulations=30, paired=True)
     
     print("\n" + "="*70)
     print("OPTIMISATION TERMINEE")
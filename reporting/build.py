@@ -0,0 +1,396 @@
+"""
+Construction incrementale des rapports: script -> CSV -> graphique -> page markdown
+
+Chaque etape declare ses entrees et ses sorties. Une etape est perimee si
+l'empreinte de ses entrees a change depuis sa derniere execution, si une
+sortie manque, ou si une etape amont est perimee; seules les etapes perimees
+sont re-executees, dans l'ordre de declaration (comme make).
+
+    python -m reporting.build                 # execute les etapes perimees
+    python -m reporting.build --dry-run       # liste les etapes perimees
+    python -m reporting.build --touch         # marque tout a jour sans rien executer
+    python -m reporting.build --force page    # force des etapes (nom ou prefixe 'page')
+
+--touch enregistre l'etat courant sans relancer les scripts (resultats deja
+a jour, ex: apres un clone): les optimisations longues ne sont relancees que
+si leur script, leur strategie ou leurs donnees changent ensuite.
+"""
+import hashlib
+import json
+import os
+import subprocess
+import sys
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reporting.charts import file_digest
+from reporting.markdown import TableSpec, ValueSpec, fill_tables, table_names, value_names
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATE_FILE = 'data/.build_hashes.json'  # Empreintes des entrees a la derniere execution de chaque etape
+
+US_PRICES = 'data/stock_prices.csv'
+EU_PRICES = 'data/european_prices_2007_2024.csv'
+RANDOM_STRATEGY = 'strategies/random_stoploss.py'
+MOMENTUM_STRATEGY = 'strategies/momentum.py'
+
+
+@dataclass(frozen=True)
+class Stage:
+    """
+    name: nom de l'etape (ligne de commande)
+    inputs / outputs: fichiers relatifs a la racine du projet
+    run: action sans argument executee depuis la racine du projet
+    """
+    name: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    run: Callable[[], None]
+
+
+def run_script(script: str) -> Callable[[], None]:
+    """Action executant un script du projet dans un processus separe"""
+    def run():
+        subprocess.run([sys.executable, script], cwd=ROOT, check=True)
+    run.__name__ = f"run_{os.path.splitext(script)[0]}"
+    return run
+
+
+def script_stage(script: str, outputs: Sequence[str], inputs: Sequence[str] = ()) -> Stage:
+    """Etape d'analyse: le script lui-meme fait partie de ses entrees"""
+    return Stage(os.path.splitext(script)[0], (script, *inputs), tuple(outputs), run_script(script))
+
+
+# === Tableaux des pages ===
+
+def percent(value: float, sign: bool = False) -> str:
+    return f"{value:+.0f}%" if sign else f"{value:.0f}%"
+
+
+def verdict(outperformance: float) -> str:
+    return f"{'✅' if outperformance >= 0 else '❌'} **{percent(outperformance, sign=True)}**"
+
+
+def random_summary_table(frames):
+    """Statistiques Monte Carlo de la strategie Random + Stop-Loss (run_strategy.py)"""
+    summary = frames['summary_statistics'].set_index('Métrique')
+    labels = {'total_return': ('**Rendement Total**', '%'),
+              'sharpe_ratio': ('**Ratio de Sharpe**', ''),
+              'max_drawdown': ('**Max Drawdown**', '%')}
+    header = ['Metrique', 'Moyenne', 'Mediane', 'Ecart-type', 'Min', 'Max', 'P5', 'P95']
+    rows = [[label] + [f"{value:.2f}{unit}" for value in summary.loc[metric]]
+            for metric, (label, unit) in labels.items()]
+    return header, rows
+
+
+REALISTIC_FEE = 0.005  # Frais d'un courtier en ligne (surperformance en gras a partir de ce niveau)
+
+
+def momentum_costs_table(frames):
+    """Impact des frais sur le Momentum optimal US (analyze_momentum_costs.py)"""
+    costs = frames['momentum_costs_analysis']
+    costs = costs[costs['fee_pct'].isin([0.0, 0.001, 0.005, 0.01])]
+    header = ['Frais/Tx', 'Rendement', 'Surperf', 'Frais Totaux']
+    rows = []
+    for _, row in costs.iterrows():
+        outperformance = percent(row.outperformance, sign=True)
+        if row.fee_pct >= REALISTIC_FEE:
+            outperformance = f"**{outperformance}**"
+        rows.append([row.fee_label, percent(row['return']), outperformance, f"${row.total_fees:,.0f}"])
+    return header, rows
+
+
+# Periodes europeennes affichees (libelle du CSV -> libelle de la page)
+EUROPE_PERIODS = {'Complete 2010-2024': 'Complete 2010-2024', 'Crise Euro 2010-2012': 'Crise Euro 2010-2012',
+                  'Brexit 2015-2017': 'Brexit 2015-2017', 'COVID Crise': 'COVID Crise',
+                  'Inflation/Guerre 2022-2024': '2022-2024'}
+
+
+def momentum_europe_table(frames):
+    """Momentum optimal par periode en Europe (test_momentum_europe_optimal.py)"""
+    results = frames['momentum_europe_optimal_results'].set_index('period')
+    header = ['Période', 'Stratégie', 'Benchmark', 'Surperf.']
+    rows = [[label, percent(results.loc[period, 'strat_return']), percent(results.loc[period, 'bench_return']),
+             verdict(results.loc[period, 'outperformance'])]
+            for period, label in EUROPE_PERIODS.items()]
+    return header, rows
+
+
+TABLES = {spec.name: spec for spec in [
+    TableSpec('random_summary', random_summary_table, ('data/summary_statistics.csv',)),
+    TableSpec('momentum_costs', momentum_costs_table, ('data/momentum_costs_analysis.csv',)),
+    TableSpec('momentum_europe', momentum_europe_table, ('data/momentum_europe_optimal_results.csv',)),
+]}
+
+# === Chiffres cites dans le texte des pages ===
+
+def us_benchmark(costs) -> float:
+    """Buy & hold equipondere US 2018-2024 (rendement - surperformance, sans frais)"""
+    row = costs[costs['fee_pct'] == 0.0].iloc[0]
+    return row['return'] - row['outperformance']
+
+
+def fee_row(costs, fee_pct: float):
+    return costs[costs['fee_pct'].round(6) == fee_pct].iloc[0]
+
+
+def random_summary_values(summary, benchmark: float):
+    """Moyennes Monte Carlo Random + Stop-Loss (premiere colonne: nom de la metrique)"""
+    mean = summary.set_index(summary.columns[0])['Moyenne']
+    gap = mean['total_return'] - benchmark
+    return {'return': percent(mean['total_return']),
+            'verdict': verdict(gap),
+            'gap': f"{gap:+.0f}pp",
+            'sharpe': f"{mean['sharpe_ratio']:.1f}",
+            'drawdown': percent(mean['max_drawdown'])}
+
+
+def us_random_values(frames):
+    """Random + Stop-Loss US, configuration de base (run_strategy.py)"""
+    return random_summary_values(frames['summary_statistics'], us_benchmark(frames['momentum_costs_analysis']))
+
+
+def us_random_optimized_values(frames):
+    """Random + Stop-Loss US, configuration optimisee (run_optimized_strategy.py)"""
+    return random_summary_values(frames['optimized_summary_statistics'],
+                                 us_benchmark(frames['momentum_costs_analysis']))
+
+
+US_BENCHMARK_DRAWDOWN = -34.0  # Estimations citees dans RESULTATS.md (~-34%, ~0.9)
+US_BENCHMARK_SHARPE = 0.9
+
+
+def us_random_detail_values(frames):
+    """Distribution des simulations Random + Stop-Loss US (RESULTATS.md, run_strategy.py)"""
+    mean = frames['summary_statistics'].set_index('Métrique')['Moyenne']
+    runs = frames['monte_carlo_results']
+    benchmark = us_benchmark(frames['momentum_costs_analysis'])
+    returns, drawdowns = runs['total_return'], runs['max_drawdown']
+    share = lambda mask: f"{mask.mean() * 100:.0f}%"
+    return {'return': f"{mean['total_return']:.2f}%",
+            'benchmark': f"{benchmark:.2f}%",
+            'gap': f"{mean['total_return'] - benchmark:+.2f}%",
+            'annualized': f"~{((1 + mean['total_return'] / 100) ** (1 / 7) - 1) * 100:.1f}%",
+            'sharpe': f"{mean['sharpe_ratio']:.2f}",
+            'sharpe_gap': f"{mean['sharpe_ratio'] - US_BENCHMARK_SHARPE:+.2f}",
+            'sharpe_min': f"{runs['sharpe_ratio'].min():.2f}",
+            'drawdown': f"{mean['max_drawdown']:.2f}%",
+            'drawdown_gap': f"{mean['max_drawdown'] - US_BENCHMARK_DRAWDOWN:+.2f}%",
+            'drawdown_worst': f"{drawdowns.min():.2f}%",
+            'drawdown_q25': f"{drawdowns.quantile(0.25):.2f}%",
+            'positive': share(returns > 0),
+            'beat_benchmark': share(returns > benchmark),
+            'above_50': share(returns > 50),
+            'below_minus_20': share(returns < -20)}
+
+
+def us_momentum_values(frames):
+    """Momentum de base US: 20 actions, 12 mois, mensuel (optimize_momentum.py)"""
+    grid = frames['momentum_grid_search']
+    base = grid[(grid['n_stocks'] == 20) & (grid['lookback_months'] == 12) & (grid['rebalancing_freq'] == 'M')]
+    # Grille etendue: momentum simple, sans mois exclus
+    for column, value in [('skip_months', 0), ('signal', 'momentum')]:
+        if column in base:
+            base = base[base[column] == value]
+    base = base.iloc[0]
+    return {'return': percent(base['total_return_mean']),
+            'verdict': verdict(base['outperformance']),
+            'sharpe': f"{base['sharpe_ratio_mean']:.1f}",
+            'transactions': f"{base['n_transactions_mean']:.0f}"}
+
+
+def us_optimal_values(frames):
+    """Momentum optimal US avec frais realistes (analyze_momentum_costs.py)"""
+    costs = frames['momentum_costs_analysis']
+    row = fee_row(costs, REALISTIC_FEE)
+    return {'benchmark': percent(us_benchmark(costs)),
+            'return': percent(row['return']),
+            'verdict': verdict(row['outperformance']),
+            'outperformance': percent(row['outperformance'], sign=True),
+            'sharpe': f"{row['sharpe']:.1f}",
+            'transactions': f"{row['transactions']:.0f}",
+            'fees': f"~${round(row['total_fees'], -3):,.0f}",
+            'high_fee_outperformance': percent(fee_row(costs, 0.01)['outperformance'], sign=True),
+            'no_fee_return': percent(fee_row(costs, 0.0)['return']),
+            'no_fee_outperformance': percent(fee_row(costs, 0.0)['outperformance'], sign=True)}
+
+
+def europe_values(frames):
+    """
+    Europe 2010-2024 (multi-marches et Momentum optimal); un seul benchmark,
+    celui du tableau momentum_europe, pour toutes les surperformances
+    """
+    optimal = frames['momentum_europe_optimal_results'].set_index('period').loc['Complete 2010-2024']
+    benchmark = optimal['bench_return']
+    stoploss = frames['multi_market_results'].set_index('period').loc['EU 2007-2024']
+    momentum = frames['momentum_multimarket_results'].set_index(['market', 'period']).loc[
+        ('Europe EURO STOXX', 'Complete')]
+    return {'benchmark': percent(benchmark),
+            'random_return': percent(stoploss['strategy_return_mean']),
+            'random_verdict': verdict(stoploss['strategy_return_mean'] - benchmark),
+            'random_sharpe': f"{stoploss['strategy_sharpe_mean']:.1f}",
+            'random_drawdown': percent(stoploss['strategy_dd_mean']),
+            'momentum_return': percent(momentum['strat_return']),
+            'momentum_verdict': verdict(momentum['strat_return'] - benchmark),
+            'momentum_sharpe': f"{momentum['strat_sharpe']:.1f}",
+            'optimal_return': percent(optimal['strat_return']),
+            'optimal_outperformance': percent(optimal['outperformance'], sign=True)}
+
+
+VALUES = {spec.name: spec for spec in [
+    ValueSpec('us_random', us_random_values, ('data/summary_statistics.csv', 'data/momentum_costs_analysis.csv')),
+    ValueSpec('us_random_optimized', us_random_optimized_values,
+              ('data/optimized_summary_statistics.csv', 'data/momentum_costs_analysis.csv')),
+    ValueSpec('us_random_detail', us_random_detail_values,
+              ('data/summary_statistics.csv', 'data/monte_carlo_results.csv', 'data/momentum_costs_analysis.csv')),
+    ValueSpec('us_momentum', us_momentum_values, ('data/momentum_grid_search.csv',)),
+    ValueSpec('us_optimal', us_optimal_values, ('data/momentum_costs_analysis.csv',)),
+    ValueSpec('europe', europe_values, ('data/momentum_europe_optimal_results.csv', 'data/multi_market_results.csv',
+                                       'data/momentum_multimarket_results.csv')),
+]}
+
+PAGES = ['README.md', 'RESULTATS.md', 'WIKI.md', 'wiki/Home.md', 'wiki/Resultats-Detailles.md',
+         'wiki/Conclusions.md', 'wiki/Graphiques.md']
+
+
+def page_stage(page: str) -> Stage:
+    """Etape remplissant les tableaux et les valeurs generes d'une page"""
+    full_path = os.path.join(ROOT, page)
+    specs = [TABLES[name] for name in table_names(full_path)] + [VALUES[name] for name in value_names(full_path)]
+    inputs = sorted({path for spec in specs for path in spec.inputs})
+
+    def run():
+        changed = fill_tables(page, TABLES, VALUES)
+        print(f"  {page}: {', '.join(changed) if changed else 'aucun tableau modifie'}")
+    return Stage(f"page:{page}", ('reporting/build.py', *inputs), (page,), run)
+
+
+def wiki_charts_stage() -> Stage:
+    """Graphiques du wiki (cache par graphique dans reporting/charts.py)"""
+    from generate_wiki_charts import WIKI_CHARTS
+
+    def run():
+        from reporting.charts import build_charts
+        status = build_charts(WIKI_CHARTS)
+        print(f"  graphiques: {sum(s == 'rendu' for s in status.values())} rendu(s)")
+
+    inputs = sorted({path for spec in WIKI_CHARTS for path in spec.inputs})
+    outputs = tuple(f"charts/{spec.filename}" for spec in WIKI_CHARTS)
+    return Stage('wiki_charts', ('generate_wiki_charts.py', *inputs), outputs, run)
+
+
+def project_stages() -> List[Stage]:
+    """Graphe du projet, dans l'ordre d'execution"""
+    return [
+        script_stage('run_strategy.py', ['data/monte_carlo_results.csv', 'data/summary_statistics.csv'],
+                     [RANDOM_STRATEGY, US_PRICES]),
+        script_stage('run_optimized_strategy.py',
+                     ['data/optimized_monte_carlo_results.csv', 'data/optimized_summary_statistics.csv'],
+                     [RANDOM_STRATEGY, US_PRICES]),
+        script_stage('optimize_strategy.py',
+                     ['data/grid_search_results.csv', 'data/comparison_baseline_optimized.csv'],
+                     [RANDOM_STRATEGY, US_PRICES]),
+        script_stage('analyze_transaction_costs.py', ['data/transaction_costs_analysis.csv'],
+                     [RANDOM_STRATEGY, 'strategies/trade_log.py', US_PRICES]),
+        script_stage('optimize_momentum.py', ['data/momentum_grid_search.csv'], [MOMENTUM_STRATEGY, US_PRICES]),
+        script_stage('analyze_momentum_costs.py', ['data/momentum_costs_analysis.csv'],
+                     [MOMENTUM_STRATEGY, US_PRICES]),
+        script_stage('test_momentum_multimarket.py', ['data/momentum_multimarket_results.csv'],
+                     [MOMENTUM_STRATEGY, US_PRICES, EU_PRICES]),
+        script_stage('test_momentum_europe_optimal.py', ['data/momentum_europe_optimal_results.csv'],
+                     [MOMENTUM_STRATEGY, EU_PRICES]),
+        script_stage('test_multiple_markets_periods.py', ['data/multi_market_results.csv'],
+                     [RANDOM_STRATEGY, US_PRICES, EU_PRICES]),
+        wiki_charts_stage(),
+        *[page_stage(page) for page in PAGES],
+    ]
+
+
+# === Moteur ===
+
+def inputs_digest(stage: Stage) -> str:
+    """Empreinte du contenu des entrees (une entree absente compte comme telle)"""
+    digest = hashlib.sha256()
+    for path in stage.inputs:
+        full_path = os.path.join(ROOT, path)
+        digest.update(path.encode())
+        digest.update(file_digest(full_path).encode() if os.path.exists(full_path) else b'absent')
+    return digest.hexdigest()
+
+
+def _load_state() -> Dict[str, str]:
+    path = os.path.join(ROOT, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_state(state: Dict[str, str]):
+    with open(os.path.join(ROOT, STATE_FILE), 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def stale_stages(stages: Sequence[Stage], force: Sequence[str] = ()) -> List[Stage]:
+    """
+    Etapes a re-executer: forcees, entrees modifiees, sorties manquantes,
+    ou alimentees par une etape perimee
+    """
+    state = _load_state()
+    stale, pending_outputs = [], set()
+    for stage in stages:
+        if (stage.name in force
+                or state.get(stage.name) != inputs_digest(stage)
+                or not all(os.path.exists(os.path.join(ROOT, path)) for path in stage.outputs)
+                or pending_outputs.intersection(stage.inputs)):
+            stale.append(stage)
+            pending_outputs.update(stage.outputs)
+    return stale
+
+
+def build(stages: Optional[Sequence[Stage]] = None, force: Sequence[str] = (), dry_run: bool = False,
+          touch: bool = False) -> List[str]:
+    """
+    Execute les etapes perimees dans l'ordre (touch: enregistre l'etat sans executer)
+
+    Returns:
+        Noms des etapes executees (ou qui le seraient avec dry_run)
+    """
+    stages = project_stages() if stages is None else stages
+    stale = stages if touch else stale_stages(stages, force)
+    if dry_run:
+        return [stage.name for stage in stale]
+
+    state = _load_state()
+    for stage in stale:
+        if not touch:
+            print(f"[build] {stage.name}")
+            stage.run()
+        # Empreinte apres l'execution (les entrees produites en amont sont a jour)
+        state[stage.name] = inputs_digest(stage)
+        _save_state(state)
+    return [stage.name for stage in stale]
+
+
+if __name__ == "__main__":
+    os.chdir(ROOT)
+    args = sys.argv[1:]
+    names = [a for a in args if not a.startswith('--')]
+    stages = project_stages()
+    force = []
+    if '--force' in args:
+        # Sans nom: toutes les etapes
+        force = [stage.name for stage in stages
+                 if not names or stage.name in names or stage.name.split(':')[0] in names]
+
+    done = build(stages, force=force, dry_run='--dry-run' in args, touch='--touch' in args)
+    if '--dry-run' in args:
+        print("Etapes perimees:" if done else "Tout est a jour")
+        for name in done:
+            print(f"  {name}")
+    elif '--touch' in args:
+        print(f"[OK] {len(done)} etapes marquees a jour")
+    else:
+        print(f"[OK] {len(done)} etape(s) executee(s)" if done else "[OK] Tout est a jour")
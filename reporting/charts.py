@@ -0,0 +1,125 @@
+"""
+Pipeline de generation des graphiques a partir des fichiers de resultats
+
+Chaque graphique est declare par un ChartSpec (fichiers d'entree + fonction de
+rendu). Un graphique n'est regenere que si l'empreinte de ses entrees (contenu
+des CSV et code de la fonction de rendu) a change; les graphiques a regenerer
+sont rendus en parallele dans un pool de processus (backend Agg).
+"""
+import hashlib
+import inspect
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import pandas as pd
+
+
+CHARTS_DIR = 'charts'
+MANIFEST_NAME = '.chart_hashes.json'  # Empreintes des graphiques generes (dans CHARTS_DIR)
+SAVE_OPTIONS = dict(dpi=150, bbox_inches='tight', facecolor='white', edgecolor='none')
+
+
+@dataclass(frozen=True)
+class ChartSpec:
+    """
+    name: nom du fichier genere (CHARTS_DIR/<name>.png)
+    render: fonction de module (picklable) frames -> Figure, ou frames est un
+            dict {nom du CSV sans extension: DataFrame}
+    inputs: fichiers de resultats lus par render
+    """
+    name: str
+    render: Callable
+    inputs: Tuple[str, ...]
+
+    @property
+    def filename(self) -> str:
+        return f"{self.name}.png"
+
+
+def file_digest(path: str) -> str:
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def spec_digest(spec: ChartSpec) -> str:
+    """Empreinte d'un graphique: code de rendu + contenu de chaque entree"""
+    digest = hashlib.sha256(spec.name.encode())
+    digest.update(inspect.getsource(spec.render).encode())
+    for path in spec.inputs:
+        digest.update(path.encode())
+        digest.update(file_digest(path).encode())
+    return digest.hexdigest()
+
+
+def load_frames(paths: Sequence[str]) -> Dict[str, pd.DataFrame]:
+    """CSV de resultats indexes par leur nom sans extension"""
+    return {os.path.splitext(os.path.basename(path))[0]: pd.read_csv(path) for path in paths}
+
+
+def _load_manifest(output_dir: str) -> Dict[str, str]:
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def _save_manifest(output_dir: str, manifest: Dict[str, str]):
+    with open(os.path.join(output_dir, MANIFEST_NAME), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+
+def render_chart(spec: ChartSpec, output_dir: str = CHARTS_DIR) -> str:
+    """Lit les entrees, rend et sauvegarde un graphique (execute dans un processus du pool)"""
+    figure = spec.render(load_frames(spec.inputs))
+    path = os.path.join(output_dir, spec.filename)
+    figure.savefig(path, **SAVE_OPTIONS)
+    plt.close(figure)
+    return path
+
+
+def stale_charts(specs: Sequence[ChartSpec], output_dir: str = CHARTS_DIR) -> List[Tuple[ChartSpec, str]]:
+    """Graphiques dont l'empreinte a change (ou le fichier manque), avec leur nouvelle empreinte"""
+    manifest = _load_manifest(output_dir)
+    stale = []
+    for spec in specs:
+        digest = spec_digest(spec)
+        if manifest.get(spec.name) != digest or not os.path.exists(os.path.join(output_dir, spec.filename)):
+            stale.append((spec, digest))
+    return stale
+
+
+def build_charts(specs: Sequence[ChartSpec], output_dir: str = CHARTS_DIR, force: bool = False,
+                 max_workers: int = None) -> Dict[str, str]:
+    """
+    Regenere les graphiques perimes (tous avec force=True)
+
+    Returns:
+        Dict {nom: 'rendu' ou 'a jour'}
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    stale = [(spec, spec_digest(spec)) for spec in specs] if force else stale_charts(specs, output_dir)
+    status = {spec.name: 'a jour' for spec in specs}
+
+    if len(stale) == 1:
+        render_chart(stale[0][0], output_dir)
+    elif stale:
+        with ProcessPoolExecutor(max_workers=min(len(stale), max_workers or os.cpu_count() or 1)) as pool:
+            list(pool.map(render_chart, [spec for spec, _ in stale], [output_dir] * len(stale)))
+
+    manifest = _load_manifest(output_dir)
+    for spec, digest in stale:
+        manifest[spec.name] = digest
+        status[spec.name] = 'rendu'
+    _save_manifest(output_dir, manifest)
+    return status
@@ -0,0 +1,115 @@
+"""
+Tableaux markdown generes a partir des fichiers de resultats
+
+Un tableau genere est delimite dans la page par deux marqueurs:
+
+    <!-- table: momentum_costs -->
+    | ... |
+    <!-- /table -->
+
+fill_tables remplace le contenu entre les marqueurs par le rendu du tableau
+du meme nom; le reste de la page n'est pas modifie.
+
+Un chiffre cite dans le texte (ou dans un tableau ecrit a la main) est delimite
+de la meme facon, sur une ligne, par groupe de valeurs et cle:
+
+    surperforme encore de <!-- value: us_optimal.high_fee_outperformance -->+45%<!-- /value -->
+"""
+import re
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from reporting.charts import load_frames
+
+
+TABLE_BLOCK = re.compile(r'(<!-- table: (?P<name>[\w-]+) -->\n)(?P<body>.*?)(<!-- /table -->)', re.DOTALL)
+VALUE_BLOCK = re.compile(r'(<!-- value: (?P<name>[\w-]+)\.(?P<key>[\w-]+) -->)(?P<body>[^\n]*?)(<!-- /value -->)')
+
+
+@dataclass(frozen=True)
+class TableSpec:
+    """
+    name: nom du tableau dans les marqueurs
+    render: frames -> (en-tete, lignes) ou frames est un dict {nom du CSV: DataFrame}
+    inputs: fichiers de resultats lus par render
+    """
+    name: str
+    render: Callable
+    inputs: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class ValueSpec:
+    """
+    name: nom du groupe de valeurs dans les marqueurs
+    render: frames -> {cle: texte}
+    inputs: fichiers de resultats lus par render
+    """
+    name: str
+    render: Callable
+    inputs: Tuple[str, ...]
+
+
+def markdown_table(header: Sequence[str], rows: Sequence[Sequence[str]]) -> str:
+    """Tableau markdown (une ligne de separation sous l'en-tete)"""
+    lines = ['| ' + ' | '.join(header) + ' |',
+             '|' + '|'.join('-' * (len(cell) + 2) for cell in header) + '|']
+    lines += ['| ' + ' | '.join(str(cell) for cell in row) + ' |' for row in rows]
+    return '\n'.join(lines) + '\n'
+
+
+def table_names(path: str) -> List[str]:
+    """Tableaux generes presents dans une page"""
+    with open(path, encoding='utf-8') as f:
+        return [match.group('name') for match in TABLE_BLOCK.finditer(f.read())]
+
+
+def value_names(path: str) -> List[str]:
+    """Groupes de valeurs generees presents dans une page"""
+    with open(path, encoding='utf-8') as f:
+        return sorted({match.group('name') for match in VALUE_BLOCK.finditer(f.read())})
+
+
+def render_table(spec: TableSpec) -> str:
+    return markdown_table(*spec.render(load_frames(spec.inputs)))
+
+
+def fill_tables(path: str, tables: Dict[str, TableSpec], values: Dict[str, ValueSpec] = None) -> List[str]:
+    """
+    Remplit les tableaux et les valeurs generes d'une page
+
+    Returns:
+        Noms des tableaux et groupes de valeurs dont le contenu a change
+        (la page n'est reecrite que dans ce cas)
+    """
+    with open(path, encoding='utf-8') as f:
+        text = f.read()
+    changed = []
+    rendered = {}
+
+    def replace_value(match):
+        name, key = match.group('name'), match.group('key')
+        if values is None or name not in values:
+            raise KeyError(f"{path}: groupe de valeurs inconnu '{name}'")
+        if name not in rendered:
+            rendered[name] = values[name].render(load_frames(values[name].inputs))
+        body = rendered[name][key]
+        if body != match.group('body') and name not in changed:
+            changed.append(name)
+        return match.group(1) + body + match.group(5)
+
+    def replace(match):
+        name = match.group('name')
+        if name not in tables:
+            raise KeyError(f"{path}: tableau inconnu '{name}'")
+        body = render_table(tables[name])
+        if body != match.group('body'):
+            changed.append(name)
+        return match.group(1) + body + match.group(4)
+
+    text = TABLE_BLOCK.sub(replace, text)
+    text = VALUE_BLOCK.sub(replace_value, text)
+    if changed:
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return changed
@@ -13,6 +13,7 @@ warnings.filterwarnings('ignore')
 
 from data.download_data import get_sp500_tickers, download_stock_data
 from strategies.random_stoploss import RandomStopLossStrategy, StrategyConfig, run_monte_carlo_simulation
+from strategies.profiling import profiler
 
 
 def main():
@@ -28,7 +29,8 @@ def main():
     # 1. Charger les donnees
     print("\n[ETAPE 1] Chargement des donnees")
     tickers = get_sp500_tickers(100)
-    prices = download_stock_data(tickers, start_date='2018-01-01', end_date='2024-12-31')
+    with profiler.phase('data_load'):
+        prices = download_stock_data(tickers, start_date='2018-01-01', end_date='2024-12-31')
     
     print(f"\nPeriode analysee: {prices.index[0].strftime('%Y-%m-%d')} a {prices.index[-1].strftime('%Y-%m-%d')}")
     print(f"Nombre d'actions disponibles: {prices.shape[1]}")
@@ -61,11 +63,12 @@ def main():
     
     # 4. Simulations Monte Carlo
     print("\n[ETAPE 4] Simulations Monte Carlo (100 simulations)")
-    mc_results = run_monte_carlo_simulation(
-        prices=prices,
-        n_simulations=100,
-        config=optimized_config
-    )
+    with profiler.phase('monte_carlo'):
+        mc_results = run_monte_carlo_simulation(
+            prices=prices,
+            n_simulations=100,
+            config=optimized_config
+        )
     
     # 5. Analyse des resultats
     print("\n[ETAPE 5] Analyse statistique")
@@ -167,6 +170,11 @@ def main():
     print("\nConseil: Utilisez cette configuration optimale pour vos prochains backtests.")
     print("N'oubliez pas de prendre en compte les couts de transaction dans une implementation reelle.")
     
+    # Profil d'execution (WORKSHOP_PROFILE=1)
+    if profiler.enabled:
+        profiler.report()
+        profiler.to_json('data/profile_run_optimized_strategy.json')
+    
     return mc_results, summary
 
 
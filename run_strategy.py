@@ -1,5 +1,8 @@
 """
 Script principal pour tester la stratégie de sélection aléatoire avec stop-loss
+
+WORKSHOP_VARIANCE_REPORT=1: ajoute le rapport de réduction de variance
+(second Monte Carlo de 50 simulations, antithétique + stratifié + contrôle)
 """
 import sys
 import os
@@ -12,6 +15,7 @@ warnings.filterwarnings('ignore')
 
 from data.download_data import get_sp500_tickers, download_stock_data
 from strategies.random_stoploss import RandomStopLossStrategy, StrategyConfig, run_monte_carlo_simulation
+from strategies.variance_reduction import VarianceReduction, variance_reduction_report
 
 
 def main():
@@ -138,6 +142,21 @@ def main():
     print(f"  Simulations > 50%: {(returns > 50).sum()} ({(returns > 50).mean() * 100:.1f}%)")
     print(f"  Simulations < -20%: {(returns < -20).sum()} ({(returns < -20).mean() * 100:.1f}%)")
     
+    # Précision de la moyenne avec réduction de variance (même nombre de simulations),
+    # diagnostic optionnel: second Monte Carlo (WORKSHOP_VARIANCE_REPORT=1)
+    if os.environ.get('WORKSHOP_VARIANCE_REPORT', '0') not in ('', '0'):
+        print("\n" + "=" * 70)
+        print("RÉDUCTION DE VARIANCE (antithétique, stratifié, variable de contrôle)")
+        print("=" * 70)
+        vr_results = run_monte_carlo_simulation(
+            prices=prices,
+            n_simulations=50,
+            config=config,
+            variance_reduction=VarianceReduction(antithetic=True, stratified=True, control_variate=True)
+        )
+        print("\n", variance_reduction_report(vr_results).to_string(index=False))
+        print("  (ess: nombre de simulations indépendantes de précision équivalente)")
+    
     # 8. Sauvegarder les résultats
     print("\n[Sauvegarde] Sauvegarde des resultats...")
     mc_results.to_csv('data/monte_carlo_results.csv', index=False)
@@ -0,0 +1,218 @@
+"""
+Modeles de couts de transaction (courtage, minimum par ordre, paliers, spread, taxes)
+Chaque modele calcule les frais d'un tableau d'ordres en une operation vectorisee:
+    fees = model.fees(notional, side='buy', columns=idx)
+utilisable par tous les moteurs de backtest (momentum, stop-loss, rejeu du journal d'ordres)
+"""
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, List, Sequence, Union
+
+
+BUY = 'buy'
+SELL = 'sell'
+
+
+class CostModel:
+    """
+    Interface commune: frais (>= 0) pour des montants d'ordres (>= 0)
+
+    Args de fees():
+        notional: montants des ordres (prix x quantite)
+        side: 'buy' ou 'sell'
+        columns: indices des titres dans la matrice de prix (modeles par place de cotation)
+    """
+
+    def fees(self, notional: np.ndarray, side: str = BUY, columns: np.ndarray = None) -> np.ndarray:
+        raise NotImplementedError
+
+    def __add__(self, other: 'CostModel') -> 'CompositeCost':
+        return CompositeCost([self, other])
+
+
+@dataclass
+class FlatFee(CostModel):
+    """Pourcentage fixe du montant (modele historique transaction_cost_pct)"""
+    rate: float = 0.001  # 0.001 = 0.1%
+
+    def fees(self, notional, side=BUY, columns=None):
+        return np.asarray(notional, dtype=float) * self.rate
+
+
+@dataclass
+class MinTicketFee(CostModel):
+    """Pourcentage du montant avec un minimum par ordre (courtiers en ligne)"""
+    rate: float = 0.001
+    minimum: float = 1.0  # Frais minimum par ordre execute
+
+    def fees(self, notional, side=BUY, columns=None):
+        notional = np.asarray(notional, dtype=float)
+        return np.where(notional > 0, np.maximum(notional * self.rate, self.minimum), 0.0)
+
+
+@dataclass
+class TieredFee(CostModel):
+    """
+    Bareme par paliers de montant d'ordre: frais = fixe + taux x montant
+    du palier contenant l'ordre (bornes superieures croissantes, la derniere = inf)
+    """
+    bounds: Sequence[float] = (500, 2000, np.inf)  # Bornes superieures des paliers
+    fixed: Sequence[float] = (1.99, 3.90, 0.0)  # Part fixe de chaque palier
+    rates: Sequence[float] = (0.0, 0.0, 0.002)  # Part proportionnelle de chaque palier
+
+    def __post_init__(self):
+        self._bounds = np.asarray(self.bounds, dtype=float)
+        self._fixed = np.asarray(self.fixed, dtype=float)
+        self._rates = np.asarray(self.rates, dtype=float)
+        if not (len(self._bounds) == len(self._fixed) == len(self._rates)):
+            raise ValueError("bounds, fixed et rates doivent avoir la meme longueur")
+
+    def fees(self, notional, side=BUY, columns=None):
+        notional = np.asarray(notional, dtype=float)
+        tier = np.minimum(np.searchsorted(self._bounds, notional, side='left'), len(self._bounds) - 1)
+        return np.where(notional > 0, self._fixed[tier] + self._rates[tier] * notional, 0.0)
+
+
+@dataclass
+class SpreadCost(CostModel):
+    """Cout implicite de franchissement: demi-spread bid-ask + glissement"""
+    spread: float = 0.002  # Spread bid-ask relatif (0.2%)
+    slippage: float = 0.0005  # Glissement moyen (0.05%)
+
+    def fees(self, notional, side=BUY, columns=None):
+        return np.asarray(notional, dtype=float) * (self.spread / 2 + self.slippage)
+
+
+@dataclass
+class TransactionTax(CostModel):
+    """Taxe proportionnelle sur un seul sens (ex: taxe sur les achats d'actions)"""
+    rate: float = 0.003
+    side: str = BUY  # Sens taxe
+
+    def fees(self, notional, side=BUY, columns=None):
+        notional = np.asarray(notional, dtype=float)
+        if side != self.side:
+            return np.zeros_like(notional)
+        return notional * self.rate
+
+
+@dataclass
+class CompositeCost(CostModel):
+    """Somme de plusieurs modeles (courtage + spread + taxe...)"""
+    models: List[CostModel] = field(default_factory=list)
+
+    def fees(self, notional, side=BUY, columns=None):
+        total = np.zeros(np.shape(notional))
+        for model in self.models:
+            total += model.fees(notional, side, columns)
+        return total
+
+    def __add__(self, other):
+        return CompositeCost(self.models + [other])
+
+
+def exchange_of(ticker: str) -> str:
+    """Place de cotation deduite du suffixe Yahoo ('MC.PA' -> 'PA', 'AAPL' -> 'US')"""
+    return ticker.rsplit('.', 1)[1] if '.' in ticker else 'US'
+
+
+class PerExchangeCost(CostModel):
+    """
+    Modele different par place de cotation, resolu une fois par colonne
+    (fees() exige alors les indices de colonnes des ordres)
+    """
+
+    def __init__(self, tickers: Sequence[str], models: Dict[str, CostModel], default: CostModel = None):
+        self.models = dict(models)
+        self.default = default or FlatFee(0.0)
+        # Code entier par colonne: position du modele de sa place, le dernier = defaut
+        self._models = list(self.models.values()) + [self.default]
+        codes = {exchange: i for i, exchange in enumerate(self.models)}
+        self._codes = np.array([codes.get(exchange_of(t), len(self.models)) for t in tickers], dtype=np.int64)
+
+    def fees(self, notional, side=BUY, columns=None):
+        if columns is None:
+            raise ValueError("PerExchangeCost necessite les indices de colonnes des ordres")
+        notional = np.asarray(notional, dtype=float)
+        columns = np.asarray(columns)
+        codes = self._codes[columns]
+        total = np.zeros(notional.shape)
+        for code in np.unique(codes):
+            selected = codes == code
+            total[selected] = self._models[code].fees(notional[selected], side, columns[selected])
+        return total
+
+    def __repr__(self):
+        return f"PerExchangeCost({list(self.models)}, default={self.default})"
+
+
+def as_cost_model(cost: Union[float, CostModel, None]) -> CostModel:
+    """Accepte un taux (ancien transaction_cost_pct) ou un modele"""
+    if cost is None:
+        return FlatFee(0.0)
+    if isinstance(cost, CostModel):
+        return cost
+    return FlatFee(float(cost))
+
+
+def describe_cost(cost: Union[float, CostModel, None]) -> str:
+    """Libelle court: '0.10%' pour un taux proportionnel, sinon le modele"""
+    model = as_cost_model(cost)
+    if type(model) is FlatFee:
+        return f"{model.rate * 100:.2f}%"
+    return repr(model)
+
+
+def flat_rates(models: Sequence[CostModel]) -> Union[np.ndarray, None]:
+    """Taux des modeles s'ils sont tous proportionnels (voie rapide), sinon None"""
+    if all(type(model) is FlatFee for model in models):
+        return np.array([model.rate for model in models], dtype=float)
+    return None
+
+
+def level_fees(models: Sequence[CostModel], rates, notional: np.ndarray, side: str,
+               columns: np.ndarray = None) -> np.ndarray:
+    """
+    Frais d'une matrice d'ordres (niveaux x ordres), un modele par niveau
+    rates: resultat de flat_rates(models), pour eviter la boucle sur les modeles
+    """
+    if rates is not None:
+        return notional * rates[:, None]
+    return np.stack([model.fees(notional[f], side, columns) for f, model in enumerate(models)])
+
+
+def buy_budget(model: Union[CostModel, None], allocation, columns: np.ndarray = None) -> np.ndarray:
+    """
+    Montant d'ordre dont le cout frais compris tient dans l'allocation
+    (budget + frais <= allocation): exact pour un taux proportionnel, sinon
+    allocation moins les frais de l'allocation (frais croissants avec le montant)
+    """
+    allocation = np.maximum(np.asarray(allocation, dtype=float), 0.0)
+    if model is None:
+        return allocation
+    if type(model) is FlatFee:
+        return allocation / (1 + model.rate)
+    return np.maximum(allocation - model.fees(allocation, BUY, columns), 0.0)
+
+
+def level_budgets(models: Sequence[CostModel], rates, allocation: np.ndarray,
+                  columns: np.ndarray) -> np.ndarray:
+    """
+    buy_budget d'une allocation par niveau (F,) pour les ordres columns:
+    matrice (niveaux x ordres), un modele par niveau
+    """
+    if rates is not None:
+        return np.broadcast_to((np.maximum(allocation, 0.0) / (1 + rates))[:, None], (len(models), len(columns)))
+    return np.stack([buy_budget(model, np.full(len(columns), allocation[f]), columns)
+                     for f, model in enumerate(models)])
+
+
+# Baremes d'exemple (illustratifs, a ajuster au contrat du courtier)
+EXAMPLE_SCHEDULES: Dict[str, CostModel] = {
+    'Sans frais': FlatFee(0.0),
+    'Proportionnel 0.1%': FlatFee(0.001),
+    'Min. 1 par ordre': MinTicketFee(rate=0.001, minimum=1.0),
+    'Paliers courtier en ligne': TieredFee(),
+    'Courtage 0.1% + spread': FlatFee(0.001) + SpreadCost(),
+    'Courtage + spread + taxe achats': FlatFee(0.001) + SpreadCost() + TransactionTax(0.003),
+}
@@ -0,0 +1,163 @@
+"""
+Noyau sequentiel du rejeu d'ordres sur tableaux simples, compile par Numba s'il est installe
+
+La partie aleatoire (evictions, tirages de remplacement) reste en NumPy pour
+garder les memes tirages que np.random; seule la comptabilite (cash, positions,
+frais) est compilee. Verification de parite: test_replay_kernel.py (noyau Python
+et replay_trade_log engine='kernel' contre le rejeu NumPy) ou python -m strategies.kernels.
+
+Numba n'est importe qu'a la premiere compilation (pas a l'import du module),
+pour ne pas alourdir le demarrage des scripts et des processus de calcul.
+
+WORKSHOP_NUMBA=0 (ou Numba absent): engine='auto' de replay_trade_log prend le
+rejeu vectorise NumPy (memes resultats); engine='kernel' reste possible et
+execute alors replay_kernel en Python pur (lent, pour la verification).
+"""
+import importlib.util
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+
+HAS_NUMBA = importlib.util.find_spec('numba') is not None
+USE_NUMBA = HAS_NUMBA and os.environ.get('WORKSHOP_NUMBA', '1') != '0'
+
+_compiled = {}
+
+
+def compiled(kernel):
+    """Version compilee du noyau (numba.njit a la premiere demande), sinon le noyau Python"""
+    if not USE_NUMBA:
+        return kernel
+    if kernel not in _compiled:
+        from numba import njit
+        _compiled[kernel] = njit(cache=True)(kernel)
+    return _compiled[kernel]
+
+
+def replay_kernel(values, marks, rows, sell_ptr, sell_idx, buy_ptr, buy_idx,
+                  init_cash, rate, lots, check_cash):
+    """
+    Rejoue un journal d'ordres aplati pour un taux de frais proportionnel
+    (memes regles que replay_trade_log, sans reinvestissement de l'arrondi)
+
+    Args:
+        values: matrice de prix (dates x titres), prix d'achat
+        marks: dernier prix connu aux rebalancements (rebalancements x titres,
+            trade_log.mark_prices), prix de valorisation et de vente
+        rows: ligne de prix de chaque rebalancement
+        sell_ptr, sell_idx / buy_ptr, buy_idx: ordres du rebalancement k
+            dans sell_idx[sell_ptr[k]:sell_ptr[k + 1]] (idem achats)
+        lots: unite de negociation par colonne (Sizer.lot_array)
+
+    Returns:
+        (values_before, values_after, sell_executed, buy_executed, buy_quantity,
+         [frais, volume achete, volume vendu, nombre de transactions])
+    """
+    n_events = len(rows)
+    n_assets = values.shape[1]
+    holdings = np.zeros(n_assets)
+    cash = init_cash
+    values_before = np.empty(n_events)
+    values_after = np.empty(n_events)
+    sell_executed = np.zeros(len(sell_idx), dtype=np.bool_)
+    buy_executed = np.zeros(len(buy_idx), dtype=np.bool_)
+    buy_quantity = np.zeros(len(buy_idx))
+    totals = np.zeros(4)
+
+    for k in range(n_events):
+        row = rows[k]
+        value = cash
+        for j in range(n_assets):
+            price = marks[k, j]
+            if holdings[j] != 0.0 and price == price:
+                value += holdings[j] * price
+        values_before[k] = value
+
+        # Ventes: toute la position au dernier prix connu
+        for o in range(sell_ptr[k], sell_ptr[k + 1]):
+            j = sell_idx[o]
+            if holdings[j] > 0:
+                sale = holdings[j] * marks[k, j]
+                fee = sale * rate
+                cash += sale - fee
+                totals[0] += fee
+                totals[2] += sale
+                totals[3] += 1
+                sell_executed[o] = True
+            holdings[j] = 0.0
+
+        # Achats: allocation fixee avant le premier ordre, frais compris
+        n_buys = buy_ptr[k + 1] - buy_ptr[k]
+        if n_buys > 0:
+            allocation = max(cash / n_buys, 0.0) / (1 + rate)
+            for o in range(buy_ptr[k], buy_ptr[k + 1]):
+                j = buy_idx[o]
+                price = values[row, j]
+                if not price > 0:
+                    continue
+                qty = np.floor(allocation / (price * lots[j])) * lots[j]
+                if not qty > 0:
+                    continue
+                cost = qty * price
+                fee = cost * rate
+                if check_cash and cost + fee > cash:
+                    continue
+                cash -= cost + fee
+                holdings[j] = qty
+                totals[0] += fee
+                totals[1] += cost
+                totals[3] += 1
+                buy_executed[o] = True
+                buy_quantity[o] = qty
+
+        value = cash
+        for j in range(n_assets):
+            price = marks[k, j]
+            if holdings[j] != 0.0 and price == price:
+                value += holdings[j] * price
+        values_after[k] = value
+
+    return values_before, values_after, sell_executed, buy_executed, buy_quantity, totals
+
+
+def kernel_supported(rates, sizer) -> bool:
+    """Le noyau couvre les frais proportionnels et les modes sans reinvestissement"""
+    return rates is not None and not sizer.fill_cash
+
+
+if __name__ == '__main__':
+    # Verification de parite noyau / rejeu NumPy sur un univers synthetique
+    import time
+    from data.synthetic_data import SyntheticConfig, generate_synthetic_prices
+    from strategies.random_stoploss import StrategyConfig, RandomStopLossStrategy
+    from strategies.sizing import Sizer
+    from strategies.trade_log import replay_trade_log
+
+    prices = generate_synthetic_prices(SyntheticConfig(n_tickers=300, n_years=10, seed=1))
+    rates = [0.0, 0.001, 0.005]
+    print(f"Numba: {'oui' if HAS_NUMBA else 'non (noyau Python)'}")
+    for sizer in [Sizer('integer'), Sizer('fractional'), Sizer('lots')]:
+        for check_cash in [False, True]:
+            for seed in range(3):
+                np.random.seed(seed)
+                log, values = RandomStopLossStrategy(StrategyConfig()).record_trade_log(prices)
+                lots = sizer.lot_array(prices.columns)
+                start = time.perf_counter()
+                reference = replay_trade_log(log, values, rates, 100_000, check_cash, sizer, lots, engine='numpy')
+                numpy_time = time.perf_counter() - start
+                start = time.perf_counter()
+                kernel_result = replay_trade_log(log, values, rates, 100_000, check_cash, sizer, lots, engine='kernel')
+                kernel_time = time.perf_counter() - start
+                for key in ['values_before', 'values_after', 'total_fees', 'buy_volume', 'sell_volume']:
+                    np.testing.assert_allclose(kernel_result[key], reference[key], rtol=1e-9)
+                np.testing.assert_array_equal(kernel_result['n_transactions'], reference['n_transactions'])
+                for k in range(len(log)):
+                    np.testing.assert_array_equal(kernel_result['buy_executed'][k], reference['buy_executed'][k])
+                    np.testing.assert_array_equal(kernel_result['sell_executed'][k], reference['sell_executed'][k])
+                    np.testing.assert_allclose(kernel_result['buy_quantity'][k], reference['buy_quantity'][k], rtol=1e-9)
+            print(f"  {sizer.mode:<10} check_cash={check_cash!s:<5} OK "
+                  f"(numpy {numpy_time * 1000:.1f} ms, noyau {kernel_time * 1000:.1f} ms)")
+    print("Parite noyau / NumPy: OK")
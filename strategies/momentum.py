@@ -2,10 +2,23 @@
 Strategie de Momentum (suivi de tendance)
 Acheter les actions ayant eu les meilleures performances passees
 """
+import os
+import sys
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 import numpy as np
 import pandas as pd
-from typing import List, Dict
-from dataclasses import dataclass
+from typing import Iterator, List, Dict, Optional, Tuple, Union
+from dataclasses import dataclass, replace
+
+from strategies.cost_models import CostModel, BUY, SELL, as_cost_model, buy_budget, flat_rates
+from strategies.profiling import profiler
+from strategies.selection import valid_scores_mask, buffered_top_k, selection_mask, rebalance_diff
+from strategies.signals import combined_scores
+from strategies.sizing import Sizer, resolve_sizer
+from strategies.trade_log import TradeLog, value_metrics
+from strategies import trading_calendar
+from strategies.vectorbt_engine import load_vectorbt
 
 
 @dataclass
@@ -13,9 +26,19 @@ class MomentumConfig:
     """Configuration de la strategie Momentum"""
     n_stocks: int = 20  # Nombre d'actions dans le portefeuille
     lookback_months: int = 12  # Periode de lookback pour le momentum (12 mois recommande)
-    rebalancing_freq: str = 'M'  # Frequence de rebalancement: 'M' = mensuel, 'Q' = trimestriel
+    skip_months: int = 0  # Derniers mois exclus du lookback (1 = momentum 12-1, evite le retournement court terme)
+    rebalancing_freq: str = 'M'  # Frequence de rebalancement: 'W', 'M' = mensuel, 'Q' = trimestriel, 'Y'
+    calendar: str = 'trading'  # 'trading' = premier jour de bourse de chaque periode, 'legacy' = ancienne regle
     init_cash: float = 100_000  # Capital initial
     seed: int = None  # Graine pour la reproductibilite (pour tie-breaking)
+    cost_model: Optional[CostModel] = None  # Frais de transaction (None = sans frais)
+    rank_buffer: int = 0  # Une position est conservee tant que son rang < n_stocks + rank_buffer
+    weight_tolerance: Optional[float] = None  # Ecart de poids tolere avant reequilibrage (None = jamais)
+    sizer: Optional[Sizer] = None  # Dimensionnement des positions (None = actions entieres)
+    engine: str = 'native'  # 'native' ou 'vectorbt' (optionnel, importe seulement si selectionne)
+    # Signal de classement (strategies/signals.py): 'momentum', 'vol_scaled_momentum',
+    # 'residual_momentum', 'low_volatility'... ou combinaison {nom: poids}; None = momentum
+    signals: Union[str, Dict[str, float], None] = None
 
 
 class MomentumStrategy:
@@ -31,165 +54,275 @@ class MomentumStrategy:
         if self.config.seed:
             np.random.seed(self.config.seed)
     
-    def calculate_momentum(self, prices: pd.DataFrame, lookback_days: int) -> pd.Series:
+    def get_rebalance_dates(self, prices: pd.DataFrame) -> pd.DatetimeIndex:
         """
-        Calcule le momentum (rendement sur la periode de lookback)
-        pour chaque action
+        Premiers jours de bourse de chaque periode (strategies/trading_calendar.py),
+        premier jour des donnees si aucune periode n'est complete
+        """
+        return trading_calendar.schedule_dates(prices.index, self.config.rebalancing_freq, self.config.calendar)
+    
+    def _resize_drifted(self, holdings: np.ndarray, cash: float, current_prices: np.ndarray,
+                        valuation_prices: np.ndarray, kept_mask: np.ndarray, n_positions: int,
+                        tolerance: float, sizer: Sizer, lots: np.ndarray):
         """
-        if len(prices) < lookback_days:
-            return pd.Series(0, index=prices.columns)
+        Ramene au poids cible 1/n les positions conservees dont le poids s'ecarte
+        de plus de tolerance (holdings modifie en place). Les surponderations sont
+        vendues d'abord, les achats (frais compris) restent dans la limite du cash disponible.
         
-        # Prix au debut et a la fin de la periode
-        start_prices = prices.iloc[-lookback_days]
-        end_prices = prices.iloc[-1]
+        Returns:
+            (cash apres frais, nombre de transactions, frais)
+        """
+        held = (holdings > 0) & ~np.isnan(valuation_prices)
+        total_value = cash + np.dot(holdings[held], valuation_prices[held])
+        kept = np.flatnonzero(kept_mask & (holdings > 0) & (current_prices > 0))
+        if len(kept) == 0 or total_value <= 0:
+            return cash, 0, 0.0
+        
+        kept_prices = current_prices[kept]
+        weights = holdings[kept] * kept_prices / total_value
+        drifted = np.abs(weights - 1.0 / n_positions) > tolerance
+        if not drifted.any():
+            return cash, 0, 0.0
         
-        # Calculer le rendement
-        momentum = (end_prices - start_prices) / start_prices
+        idx = kept[drifted]
+        prices = kept_prices[drifted]
+        delta = sizer.quantities(total_value / n_positions, prices, lots[idx]) - holdings[idx]
         
-        # Remplacer les NaN par -inf pour les exclure
-        momentum = momentum.fillna(-np.inf)
+        cost_model = self.config.cost_model
+        fees = 0.0
+        sells = delta < 0
+        cash -= np.dot(delta[sells], prices[sells])
+        if cost_model is not None:
+            fees += cost_model.fees(-delta[sells] * prices[sells], SELL, idx[sells]).sum()
+            cash -= fees
         
-        return momentum
+        buys = delta > 0
+        notional = delta[buys] * prices[buys]
+        cost = notional.sum()
+        if cost_model is not None:
+            cost += cost_model.fees(notional, BUY, idx[buys]).sum()
+        if cost > cash:
+            # Reduire les achats au prorata du cash, frais reserves, arrondis selon le sizer
+            budgets = buy_budget(cost_model, notional * max(cash, 0.0) / cost, idx[buys])
+            delta[buys] = sizer.quantities(budgets, prices[buys], lots[idx[buys]])
+        cash -= np.dot(delta[buys], prices[buys])
+        if cost_model is not None:
+            buy_fees = cost_model.fees(delta[buys] * prices[buys], BUY, idx[buys]).sum()
+            cash -= buy_fees
+            fees += buy_fees
+        holdings[idx] += delta
+        return cash, int((delta != 0).sum()), fees
     
-    def get_rebalance_dates(self, prices: pd.DataFrame) -> pd.DatetimeIndex:
+    def _selections(self, prices: pd.DataFrame, universe=None, verbose: bool = False) -> Iterator[Tuple]:
         """
-        Genere les dates de rebalancement selon la frequence choisie
+        Selection a chaque date de rebalancement (independante des frais et de la
+        tresorerie), partagee par run_backtest_simple et record_trade_log
+        
+        Yields:
+            (date, ligne, top_idx, target_mask, to_buy, to_sell), top_idx = None
+            sans selection (lookback incomplet ou trop peu de scores valides)
         """
-        if self.config.rebalancing_freq == 'M':
-            # Mensuel (debut de mois)
-            dates = pd.date_range(start=prices.index[0], 
-                                 end=prices.index[-1], 
-                                 freq='MS')
-        elif self.config.rebalancing_freq == 'Q':
-            # Trimestriel (debut de trimestre)
-            dates = pd.date_range(start=prices.index[0], 
-                                 end=prices.index[-1], 
-                                 freq='QS')
-        else:
-            # Par defaut: mensuel
-            dates = pd.date_range(start=prices.index[0], 
-                                 end=prices.index[-1], 
-                                 freq='MS')
+        all_stocks = prices.columns.tolist()
+        lookback_days = self.config.lookback_months * 21  # ~21 jours ouvres par mois
+        n_stocks = min(self.config.n_stocks, len(all_stocks))
+        rebalance_dates = self.get_rebalance_dates(prices)
         
-        # Filtrer pour ne garder que les dates presentes dans les donnees
-        rebalance_dates = prices.index[prices.index.isin(dates)]
+        # Scores de classement (calcules une fois pour toutes les simulations)
+        # et lignes des dates de rebalancement
+        with profiler.phase('momentum.signal'):
+            scores = combined_scores(prices, self.config.signals, lookback_days, self.config.skip_months * 21)
+        rows = prices.index.get_indexer(rebalance_dates)
         
-        # S'assurer qu'il y a au moins 2 dates
-        if len(rebalance_dates) < 2:
-            # Fallback: utiliser des intervalles reguliers
-            interval = 63 if self.config.rebalancing_freq == 'Q' else 21  # ~3 mois ou ~1 mois
-            rebalance_dates = prices.index[::interval]
+        # Alignement des colonnes sur l'univers (calcule une seule fois)
+        universe_positions = universe.positions(all_stocks) if universe is not None else None
+        current_mask = np.zeros(len(all_stocks), dtype=bool)
         
-        return rebalance_dates
+        for i, (date, row) in enumerate(zip(rebalance_dates, rows)):
+            if row < 0:
+                continue
+            
+            profiler.count('momentum.rebalances')
+            top_idx = target_mask = to_buy = to_sell = None
+            
+            # Score de selection a cette date (historique = lignes 0..row)
+            if row + 1 >= lookback_days:
+                with profiler.phase('momentum.signal'):
+                    momentum = scores[row].copy()
+                    
+                    # Exclure les actions hors de l'univers a cette date
+                    if universe is not None:
+                        momentum[~universe.eligible(date, universe_positions)] = -np.inf
+                
+                # Selectionner les N actions avec le meilleur momentum
+                # (les NaN et valeurs infinies negatives sont exclus)
+                with profiler.phase('momentum.selection'):
+                    if valid_scores_mask(momentum).sum() >= n_stocks:
+                        top_idx = buffered_top_k(momentum, n_stocks, current_mask, self.config.rank_buffer)
+                        target_mask = selection_mask(top_idx, len(all_stocks))
+                        
+                        # Determiner les achats et ventes
+                        to_buy, to_sell = rebalance_diff(current_mask, target_mask)
+                        current_mask = target_mask
+                
+                if top_idx is not None and verbose and i < 3:
+                    print(f"\n{date.strftime('%Y-%m-%d')} - Top {n_stocks} momentum:")
+                    for j, idx in enumerate(top_idx[:5]):
+                        print(f"  {j+1}. {all_stocks[idx]}: {momentum[idx]*100:.1f}%")
+            
+            yield date, row, top_idx, target_mask, to_buy, to_sell
+    
+    def record_trade_log(self, prices: pd.DataFrame, universe=None) -> Tuple[TradeLog, np.ndarray]:
+        """
+        Enregistre les ordres du backtest (une passe, independante des frais)
+        pour replay_trade_log: memes scores, univers et rang de conservation
+        que run_backtest_simple
+        
+        Returns:
+            (log, values): journal des ordres et matrice de prix (le rejeu vend
+            et valorise au dernier prix connu, achete au prix du jour)
+        """
+        if self.config.weight_tolerance is not None:
+            raise ValueError("weight_tolerance: les redimensionnements partiels ne sont pas "
+                             "representables dans le journal d'ordres (utiliser run_backtest_simple)")
+        
+        log = TradeLog()
+        for date, row, top_idx, target_mask, to_buy, to_sell in self._selections(prices, universe):
+            sells = buys = ()
+            if top_idx is not None:
+                sells = np.flatnonzero(to_sell)
+                buys = top_idx[to_buy[top_idx]]
+            log.record(date, row, sells, buys)
+        return log, prices.to_numpy(dtype=float)
+    
+    def target_weights(self, prices: pd.DataFrame, universe=None) -> np.ndarray:
+        """
+        Selection traduite en poids cibles (dates x actions) pour Portfolio.from_orders
+        
+        Aux dates de rebalancement: 1/n pour tout le top (positions conservees
+        ramenees au poids egal, comme weight_tolerance=0), 0 pour les actions
+        sorties; NaN ailleurs (pas d'ordre).
+        """
+        weights = np.full(prices.shape, np.nan)
+        for date, row, top_idx, target_mask, to_buy, to_sell in self._selections(prices, universe):
+            if top_idx is not None:
+                weights[row, to_sell] = 0.0
+                weights[row, top_idx] = 1.0 / len(top_idx)
+        
+        return weights
     
-    def run_backtest_simple(self, prices: pd.DataFrame, verbose: bool = False) -> Dict:
+    def run_backtest_simple(self, prices: pd.DataFrame, verbose: bool = False,
+                            universe=None) -> Dict:
         """
         Execute le backtest avec une implementation simplifiee
+        
+        Args:
+            universe: Universe point-in-time optionnel (data/universe.py);
+                      seules les actions membres a chaque date sont classees
+        
+        engine='vectorbt': execution par vectorbt (run_vectorbt_grid)
         """
-        all_stocks = prices.columns.tolist()
+        if self.config.engine == 'vectorbt':
+            return run_vectorbt_grid(prices, [self.config], universe)[0]
         
-        # Parametres
-        lookback_days = self.config.lookback_months * 21  # ~21 jours ouvres par mois
-        n_stocks = min(self.config.n_stocks, len(all_stocks))
+        all_stocks = prices.columns.tolist()
         init_cash = self.config.init_cash
         
-        # Generer les dates de rebalancement
-        rebalance_dates = self.get_rebalance_dates(prices)
-        
         if verbose:
+            rebalance_dates = self.get_rebalance_dates(prices)
             print(f"Periode: {prices.index[0].strftime('%Y-%m-%d')} a {prices.index[-1].strftime('%Y-%m-%d')}")
             print(f"Nombre de rebalancements: {len(rebalance_dates)}")
             print(f"Frequence: {self.config.rebalancing_freq} (M=mensuel, Q=trimestriel)")
             print(f"Lookback: {self.config.lookback_months} mois")
         
-        # Initialisation
+        # Matrice de prix (jours x actions); les positions d'une action suspendue
+        # ou radiee sont valorisees et vendues au dernier prix connu
+        values = prices.to_numpy(dtype=float)
+        last_prices = prices.ffill().to_numpy(dtype=float)
+        
+        # Initialisation (positions indexees par colonne)
         cash = init_cash
-        holdings = {stock: 0 for stock in all_stocks}
-        current_portfolio = []
+        holdings = np.zeros(len(all_stocks))
         portfolio_values = []
         n_transactions = 0
+        total_fees = 0.0
+        cost_model = self.config.cost_model
+        weight_tolerance = self.config.weight_tolerance
+        sizer, lots = resolve_sizer(self.config.sizer, all_stocks)
         
-        for i, date in enumerate(rebalance_dates):
-            if date not in prices.index:
-                continue
-            
-            current_prices = prices.loc[date]
+        for date, row, top_idx, target_mask, to_buy, to_sell in self._selections(prices, universe, verbose):
+            current_prices = values[row]
             
             # Calculer la valeur du portefeuille
-            portfolio_value = cash
-            for stock, qty in holdings.items():
-                if qty > 0 and stock in current_prices.index and not pd.isna(current_prices[stock]):
-                    portfolio_value += qty * current_prices[stock]
+            with profiler.phase('momentum.valuation'):
+                held = (holdings > 0) & ~np.isnan(last_prices[row])
+                portfolio_value = cash + np.dot(holdings[held], last_prices[row][held])
             
             portfolio_values.append({'date': date, 'value': portfolio_value})
             
-            # Calculer le momentum pour selection
-            hist_prices = prices.loc[:date]
+            if top_idx is None:
+                continue
             
-            if len(hist_prices) >= lookback_days:
-                momentum = self.calculate_momentum(hist_prices, lookback_days)
+            with profiler.phase('momentum.execution'):
+                # Vendre les actions sorties du top
+                sell_idx = np.flatnonzero(to_sell & (holdings > 0))
+                cash += np.dot(holdings[sell_idx], last_prices[row][sell_idx])
+                if cost_model is not None:
+                    fees = cost_model.fees(holdings[sell_idx] * last_prices[row][sell_idx], SELL, sell_idx).sum()
+                    cash -= fees
+                    total_fees += fees
+                holdings[sell_idx] = 0
+                n_transactions += len(sell_idx)
                 
-                # Selectionner les N actions avec le meilleur momentum
-                # Filtrer les valeurs infinies
-                valid_momentum = momentum[momentum != -np.inf]
+                # Reequilibrer les positions conservees sorties de la bande de poids
+                if weight_tolerance is not None:
+                    cash, resized, fees = self._resize_drifted(holdings, cash, current_prices, last_prices[row],
+                                                               target_mask & ~to_buy, len(top_idx),
+                                                               weight_tolerance, sizer, lots)
+                    total_fees += fees
+                    n_transactions += resized
                 
-                if len(valid_momentum) >= n_stocks:
-                    top_stocks = valid_momentum.nlargest(n_stocks).index.tolist()
-                    
-                    if verbose and i < 3:
-                        print(f"\n{date.strftime('%Y-%m-%d')} - Top {n_stocks} momentum:")
-                        for j, stock in enumerate(top_stocks[:5]):
-                            print(f"  {j+1}. {stock}: {momentum[stock]*100:.1f}%")
-                    
-                    # Determiner les achats et ventes
-                    stocks_to_buy = [s for s in top_stocks if s not in current_portfolio]
-                    stocks_to_sell = [s for s in current_portfolio if s not in top_stocks]
-                    
-                    # Vendre les actions sorties du top
-                    for stock in stocks_to_sell:
-                        if holdings[stock] > 0 and stock in current_prices.index:
-                            cash += holdings[stock] * current_prices[stock]
-                            holdings[stock] = 0
-                            n_transactions += 1
-                    
-                    # Acheter les nouvelles actions du top
-                    if stocks_to_buy:
-                        allocation_per_stock = cash / len(stocks_to_buy)
-                        for stock in stocks_to_buy:
-                            if stock in current_prices.index and current_prices[stock] > 0:
-                                qty = int(allocation_per_stock / current_prices[stock])
-                                if qty > 0:
-                                    holdings[stock] = qty
-                                    cash -= qty * current_prices[stock]
-                                    n_transactions += 1
-                    
-                    # Reequilibrer les poids si necessaire (optional)
-                    # Pour l'instant on garde les positions existantes
-                    
-                    current_portfolio = top_stocks
+                # Acheter les nouvelles actions du top (dans l'ordre du classement),
+                # frais reserves dans l'allocation de chaque action
+                buy_idx = top_idx[to_buy[top_idx]]
+                if len(buy_idx) > 0:
+                    allocation_per_stock = np.full(len(buy_idx), max(cash, 0.0) / len(buy_idx))
+                    budgets = buy_budget(cost_model, allocation_per_stock, buy_idx)
+                    buy_prices = current_prices[buy_idx]
+                    qty = sizer.quantities(budgets, buy_prices, lots[buy_idx])
+                    bought = qty > 0
+                    holdings[buy_idx[bought]] = qty[bought]
+                    cash -= np.dot(qty[bought], buy_prices[bought])
+                    if cost_model is not None:
+                        fees = cost_model.fees(qty[bought] * buy_prices[bought], BUY, buy_idx[bought]).sum()
+                        cash -= fees
+                        total_fees += fees
+                    n_transactions += int(bought.sum())
+        
+        profiler.count('momentum.trades', n_transactions)
         
         # Calculer les metriques finales
-        final_value = portfolio_values[-1]['value'] if portfolio_values else init_cash
-        total_return = (final_value - init_cash) / init_cash * 100
+        with profiler.phase('momentum.metrics'):
+            final_value = portfolio_values[-1]['value'] if portfolio_values else init_cash
+            total_return = (final_value - init_cash) / init_cash * 100
         
-        # Calculer le Sharpe ratio et max drawdown
-        values_df = pd.DataFrame(portfolio_values).set_index('date')
-        returns = values_df['value'].pct_change().dropna()
+            # Calculer le Sharpe ratio et max drawdown
+            values_df = pd.DataFrame(portfolio_values).set_index('date')
+            returns = values_df['value'].pct_change().dropna()
         
-        if len(returns) > 1 and returns.std() > 0:
-            sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252)  # Annualise
+            if len(returns) > 1 and returns.std() > 0:
+                sharpe_ratio = (returns.mean() / returns.std()) * np.sqrt(252)  # Annualise
             
-            # Max drawdown
-            cummax = values_df['value'].cummax()
-            drawdown = (values_df['value'] - cummax) / cummax
-            max_drawdown = drawdown.min() * 100
+                # Max drawdown
+                cummax = values_df['value'].cummax()
+                drawdown = (values_df['value'] - cummax) / cummax
+                max_drawdown = drawdown.min() * 100
             
-            # Volatilite annualisee
-            volatility = returns.std() * np.sqrt(252) * 100
-        else:
-            sharpe_ratio = 0
-            max_drawdown = 0
-            volatility = 0
+                # Volatilite annualisee
+                volatility = returns.std() * np.sqrt(252) * 100
+            else:
+                sharpe_ratio = 0
+                max_drawdown = 0
+                volatility = 0
         
         if verbose:
             print(f"\n{'='*60}")
@@ -210,13 +343,87 @@ class MomentumStrategy:
             'final_value': final_value,
             'initial_value': init_cash,
             'n_transactions': n_transactions,
+            'total_fees': total_fees,
             'portfolio_values': portfolio_values
         }
 
 
+def run_vectorbt_grid(prices: pd.DataFrame, configs: List[MomentumConfig], universe=None) -> List[Dict]:
+    """
+    Simule plusieurs configurations (n_stocks, lookback, frequence...) en un seul
+    appel vbt.Portfolio.from_orders: un groupe de colonnes par configuration,
+    tresorerie partagee dans le groupe, ventes executees avant les achats
+    
+    Chaque rebalancement ramene le top a poids egaux (actions fractionnaires):
+    comparable a run_backtest_simple avec weight_tolerance=0. Valorisation au
+    dernier prix connu, apres les ordres du jour.
+    Frais proportionnels uniquement (cost_model None ou FlatFee).
+    Memoire: ~ 8 octets x jours x actions x configurations.
+    
+    Returns:
+        Un dict de resultats par configuration (memes cles que run_backtest_simple)
+    """
+    vbt = load_vectorbt()
+    rates = flat_rates([as_cost_model(config.cost_model) for config in configs])
+    if rates is None:
+        raise ValueError("Le moteur vectorbt n'accepte que des frais proportionnels (FlatFee)")
+    
+    n_assets = prices.shape[1]
+    n_configs = len(configs)
+    strategies = [MomentumStrategy(config) for config in configs]
+    
+    with profiler.phase('momentum.signal'):
+        size = np.concatenate([strategy.target_weights(prices, universe) for strategy in strategies], axis=1)
+    columns = pd.MultiIndex.from_product([range(n_configs), prices.columns], names=['config', 'ticker'])
+    close = pd.DataFrame(np.tile(prices.ffill().to_numpy(dtype=float), (1, n_configs)),
+                         index=prices.index, columns=columns)
+    
+    with profiler.phase('momentum.vectorbt'):
+        portfolio = vbt.Portfolio.from_orders(
+            close,
+            size=size,
+            size_type='targetpercent',
+            direction='longonly',
+            fees=np.repeat(rates, n_assets),
+            init_cash=np.array([config.init_cash for config in configs], dtype=float),
+            cash_sharing=True,
+            group_by='config',
+            call_seq='auto',
+            freq='1D'
+        )
+        daily_values = portfolio.value().to_numpy()
+    
+    # Ordres executes et frais par configuration (colonne // nombre d'actions)
+    orders = portfolio.orders.records
+    groups = orders['col'] // n_assets
+    n_transactions = np.bincount(groups, minlength=n_configs)
+    total_fees = np.bincount(groups, weights=orders['fees'], minlength=n_configs)
+    
+    results = []
+    for k, (strategy, config) in enumerate(zip(strategies, configs)):
+        rebalance_dates = strategy.get_rebalance_dates(prices)
+        rows = prices.index.get_indexer(rebalance_dates)
+        values = daily_values[rows, k]
+        metrics = {name: float(metric[0]) for name, metric in
+                   value_metrics(values[:, None], config.init_cash).items()}
+        results.append({
+            'total_return': metrics['total_return'],
+            'sharpe_ratio': metrics['sharpe_ratio'],
+            'max_drawdown': metrics['max_drawdown'],
+            'volatility': metrics['volatility'],
+            'final_value': metrics['final_value'],
+            'initial_value': config.init_cash,
+            'n_transactions': int(n_transactions[k]),
+            'total_fees': float(total_fees[k]),
+            'portfolio_values': [{'date': date, 'value': value} for date, value in zip(rebalance_dates, values)]
+        })
+    return results
+
+
 def run_monte_carlo_simulation(prices: pd.DataFrame, 
                                n_simulations: int = 100,
-                               config: MomentumConfig = None) -> pd.DataFrame:
+                               config: MomentumConfig = None,
+                               universe=None) -> pd.DataFrame:
     """
     Execute N simulations Monte Carlo de la strategie Momentum
     
@@ -232,16 +439,11 @@ def run_monte_carlo_simulation(prices: pd.DataFrame,
             print(f"  Simulation {i + 1}/{n_simulations}")
         
         # Creer une config avec une graine differente (pour eventuel tie-breaking)
-        sim_config = MomentumConfig(
-            n_stocks=config.n_stocks if config else 20,
-            lookback_months=config.lookback_months if config else 12,
-            rebalancing_freq=config.rebalancing_freq if config else 'M',
-            init_cash=config.init_cash if config else 100_000,
-            seed=i
-        )
+        sim_config = replace(config or MomentumConfig(), seed=i)
         
         strategy = MomentumStrategy(sim_config)
-        result = strategy.run_backtest_simple(prices, verbose=False)
+        result = strategy.run_backtest_simple(prices, verbose=False, universe=universe)
+        profiler.count('momentum.simulations')
         
         if result:
             results.append({
@@ -260,10 +462,6 @@ def run_monte_carlo_simulation(prices: pd.DataFrame,
 
 if __name__ == "__main__":
     # Test rapide si execute directement
-    import sys
-    import os
-    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-    
     from data.download_data import get_sp500_tickers, download_stock_data
     
     print("Test rapide de la strategie Momentum")
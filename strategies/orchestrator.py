@@ -0,0 +1,197 @@
+"""
+Orchestration des etudes multi-marches et multi-periodes
+
+Une etude est une liste declarative de Job (marche, periode, donnees,
+configuration). Chaque CSV de prix est converti une seule fois en store
+(data/price_store.py) avant le lancement; chaque processus du pool ouvre
+ensuite un jeu de donnees au plus une fois et ne lit que les lignes de la
+periode de chaque job. Les jobs sont repartis sur un pool de processus, les
+plus longs en premier: l'etude dure a peu pres le temps du job le plus long.
+
+Le resultat est une table unique (une ligne par job) avec les memes
+metriques pour les strategies Random + Stop-Loss et Momentum.
+"""
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from data.price_store import PriceStore, open_price_store
+from data.quality import open_clean_store
+from strategies import momentum, random_stoploss
+from strategies.momentum import MomentumConfig
+from strategies.profiling import profiler
+from strategies.random_stoploss import StrategyConfig
+
+
+@dataclass(frozen=True)
+class Dataset:
+    """
+    path: CSV de prix (cache de telechargement)
+    min_coverage: part minimale de jours cotes pour garder une action (0 = toutes)
+    fill: prix nettoyes a l'ingestion par data/quality.py (trous combles par le
+          dernier prix sur quelques seances, pics corriges, splits signales,
+          jamais de bfill); False = store brut, a demander explicitement
+    """
+    path: str
+    min_coverage: float = 0.0
+    fill: bool = True
+
+
+@dataclass
+class Job:
+    """
+    market / period: libelles dans la table de resultats
+    start, end: bornes incluses (None = debut / fin des donnees)
+    config: StrategyConfig (Random + Stop-Loss) ou MomentumConfig
+    min_days: periode ignoree si elle compte moins de jours de bourse
+    tags: colonnes supplementaires de la ligne de resultat (ex: parametres d'une grille)
+    """
+    market: str
+    period: str
+    start: Optional[str]
+    end: Optional[str]
+    dataset: Dataset
+    config: Union[StrategyConfig, MomentumConfig]
+    n_simulations: int = 30
+    min_days: int = 100
+    tags: Dict[str, object] = field(default_factory=dict)
+
+
+RESULT_COLUMNS = ['market', 'period', 'strategy', 'start', 'end', 'days',
+                  'strategy_return_mean', 'strategy_return_std', 'strategy_sharpe_mean', 'strategy_dd_mean',
+                  'strategy_vol_mean', 'benchmark_return', 'benchmark_sharpe', 'benchmark_max_dd',
+                  'benchmark_vol', 'outperformance', 'win_rate_vs_benchmark']
+
+# Jeux de donnees ouverts par le processus courant (un chargement par processus)
+_LOADED: Dict[Dataset, Union[PriceStore, pd.DataFrame]] = {}
+
+
+def load_dataset(dataset: Dataset) -> Union[PriceStore, pd.DataFrame]:
+    """
+    Prix d'un jeu de donnees, ouverts une fois par processus
+
+    Store nettoye (fill, par defaut) ou brut; sans filtrage de couverture, il
+    est renvoye tel quel (lecture paresseuse par periode). La couverture se
+    mesure sur les memes prix que ceux du backtest.
+    """
+    if dataset not in _LOADED:
+        store = open_clean_store(dataset.path) if dataset.fill else open_price_store(dataset.path)
+        if dataset.min_coverage <= 0:
+            _LOADED[dataset] = store
+        else:
+            prices = store.load()
+            prices = prices.loc[:, prices.count() >= len(prices) * dataset.min_coverage].dropna(axis=0, how='all')
+            _LOADED[dataset] = prices
+    return _LOADED[dataset]
+
+
+def benchmark_metrics(prices: pd.DataFrame) -> Dict[str, float]:
+    """Rendement, Sharpe, drawdown max et volatilite (%) du buy & hold equipondere"""
+    returns = prices.pct_change().mean(axis=1).dropna()
+    cumulative = (1 + returns).cumprod()
+    std = returns.std()
+    return {
+        'total_return': (cumulative.iloc[-1] - 1) * 100,
+        'sharpe_ratio': returns.mean() / std * np.sqrt(252) if std > 0 else 0.0,
+        'max_drawdown': ((cumulative - cumulative.cummax()) / cumulative.cummax()).min() * 100,
+        'volatility': std * np.sqrt(252) * 100
+    }
+
+
+def run_job(job: Job) -> Optional[Dict]:
+    """Monte Carlo d'un job sur sa periode; None si la periode est trop courte"""
+    # Seances sans aucun prix (avant les premieres cotations) retirees; les NaN
+    # par action restent, ignores par la selection et valorises au dernier prix
+    period_prices = load_dataset(job.dataset).loc[job.start:job.end].dropna(axis=0, how='all')
+    if len(period_prices) < job.min_days:
+        print(f"  [{job.market} - {job.period}] periode trop courte: {len(period_prices)} jours")
+        return None
+
+    # Graine fixee par job: resultats identiques quel que soit le processus qui l'execute
+    np.random.seed(0)
+    if isinstance(job.config, MomentumConfig):
+        strategy = 'momentum'
+        mc_results = momentum.run_monte_carlo_simulation(period_prices, job.n_simulations, job.config)
+    else:
+        strategy = 'random_stoploss'
+        mc_results = random_stoploss.run_monte_carlo_simulation(period_prices, job.n_simulations, job.config)
+    if len(mc_results) == 0:
+        return None
+
+    bench = benchmark_metrics(period_prices)
+    returns = mc_results['total_return']
+    return {
+        'market': job.market,
+        'period': job.period,
+        'strategy': strategy,
+        'start': job.start or period_prices.index[0].strftime('%Y-%m-%d'),
+        'end': job.end or period_prices.index[-1].strftime('%Y-%m-%d'),
+        'days': len(period_prices),
+        'strategy_return_mean': returns.mean(),
+        'strategy_return_std': returns.std(),
+        'strategy_sharpe_mean': mc_results['sharpe_ratio'].mean(),
+        'strategy_dd_mean': mc_results['max_drawdown'].mean(),
+        'strategy_vol_mean': mc_results['volatility'].mean() if 'volatility' in mc_results else np.nan,
+        'benchmark_return': bench['total_return'],
+        'benchmark_sharpe': bench['sharpe_ratio'],
+        'benchmark_max_dd': bench['max_drawdown'],
+        'benchmark_vol': bench['volatility'],
+        'outperformance': returns.mean() - bench['total_return'],
+        'win_rate_vs_benchmark': (returns > bench['total_return']).mean() * 100,
+        **job.tags
+    }
+
+
+def job_cost(job: Job, store: PriceStore) -> float:
+    """Cout estime d'un job (jours calendaires x simulations), pour lancer les plus longs d'abord"""
+    start = pd.Timestamp(job.start) if job.start else store.index[0]
+    end = pd.Timestamp(job.end) if job.end else store.index[-1]
+    return max((end - start).days, 0) * job.n_simulations
+
+
+def run_jobs(jobs: Sequence[Job], max_workers: int = None, output: str = None,
+             pool: Executor = None) -> pd.DataFrame:
+    """
+    Execute une etude: conversion unique des CSV, puis jobs en parallele
+
+    Args:
+        max_workers: processus du pool (None = nombre de coeurs, 1 = dans ce processus)
+        output: CSV de la table consolidee (optionnel)
+        pool: pool deja ouvert, reutilise entre etudes (ses processus gardent
+              leurs jeux de donnees ouverts); prioritaire sur max_workers
+
+    Returns:
+        DataFrame une ligne par job execute, dans l'ordre de declaration
+    """
+    # Conversion et nettoyage des CSV avant le pool: les processus ne font que lire les stores
+    stores = {path: open_price_store(path) for path in dict.fromkeys(job.dataset.path for job in jobs)}
+    for path in dict.fromkeys(job.dataset.path for job in jobs if job.dataset.fill):
+        open_clean_store(path)
+    order = sorted(range(len(jobs)), key=lambda i: -job_cost(jobs[i], stores[jobs[i].dataset.path]))
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    print(f"Orchestrateur: {len(jobs)} jobs, {len(stores)} jeux de donnees, "
+          f"{'pool partage' if pool else f'{workers} processus'}")
+
+    results: List[Optional[Dict]] = [None] * len(jobs)
+    with profiler.phase('orchestrator.jobs'):
+        if pool is None and workers <= 1:
+            for i in order:
+                results[i] = run_job(jobs[i])
+        else:
+            with nullcontext(pool) if pool is not None else ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {i: executor.submit(run_job, jobs[i]) for i in order}
+                for i, future in futures.items():
+                    results[i] = future.result()
+    profiler.count('orchestrator.jobs', len(jobs))
+
+    tags = list(dict.fromkeys(tag for job in jobs for tag in job.tags))
+    table = pd.DataFrame([row for row in results if row], columns=RESULT_COLUMNS + tags)
+    if output:
+        table.to_csv(output, index=False)
+        print(f"Resultats sauvegardes: {output}")
+    return table
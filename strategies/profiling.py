@@ -0,0 +1,177 @@
+"""
+Instrumentation des backtests: chronometres par phase et compteurs
+Desactive par defaut (cout quasi nul), activable par profiler.enable()
+ou par la variable d'environnement WORKSHOP_PROFILE=1
+
+Temps d'import des modules de strategies: python -m strategies.profiling
+(code de sortie 1 si un module depasse le budget)
+"""
+import json
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from contextlib import nullcontext
+from functools import wraps
+from typing import Dict
+
+import pandas as pd
+
+
+# Contexte vide partage: aucune allocation quand l'instrumentation est coupee
+_NULL_PHASE = nullcontext()
+
+
+class _Phase:
+    """Chronometre d'une phase (utilise comme context manager)"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name: str):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class Profiler:
+    """
+    Collecte les temps par phase (chargement, signal, selection, execution,
+    metriques...) et des compteurs (rebalancements, transactions, cache...)
+    """
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.reset()
+
+    def enable(self):
+        self.enabled = True
+        self.reset()
+
+    def disable(self):
+        self.enabled = False
+
+    def reset(self):
+        self.timings = defaultdict(float)
+        self.calls = defaultdict(int)
+        self.counters = defaultdict(int)
+        self._t0 = time.perf_counter()
+
+    def phase(self, name: str):
+        """Chronometre le bloc: with profiler.phase('momentum.signal'): ..."""
+        if not self.enabled:
+            return _NULL_PHASE
+        return _Phase(self, name)
+
+    def count(self, name: str, n: int = 1):
+        """Incremente un compteur"""
+        if self.enabled:
+            self.counters[name] += n
+
+    def profiled(self, name: str = None):
+        """Decorateur: chronometre chaque appel de la fonction decoree"""
+        def decorator(func):
+            phase_name = name or func.__qualname__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Phase(self, phase_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _record(self, name: str, elapsed: float):
+        self.timings[name] += elapsed
+        self.calls[name] += 1
+
+    def summary(self) -> pd.DataFrame:
+        """Tableau des phases triees par temps total decroissant"""
+        wall = time.perf_counter() - self._t0
+        rows = [{
+            'phase': name,
+            'calls': self.calls[name],
+            'total_s': total,
+            'mean_ms': total / self.calls[name] * 1000,
+            'pct_wall': total / wall * 100 if wall > 0 else 0.0
+        } for name, total in self.timings.items()]
+
+        if not rows:
+            return pd.DataFrame(columns=['phase', 'calls', 'total_s', 'mean_ms', 'pct_wall'])
+        return pd.DataFrame(rows).sort_values('total_s', ascending=False).reset_index(drop=True)
+
+    def to_dict(self) -> Dict:
+        return {
+            'wall_s': time.perf_counter() - self._t0,
+            'phases': self.summary().to_dict(orient='records'),
+            'counters': dict(self.counters)
+        }
+
+    def to_json(self, path: str = None) -> str:
+        """Exporte le profil en JSON (et l'ecrit dans path si fourni)"""
+        payload = json.dumps(self.to_dict(), indent=2)
+        if path:
+            with open(path, 'w') as f:
+                f.write(payload)
+            print(f"Profil sauvegarde: {path}")
+        return payload
+
+    def report(self):
+        """Affiche le tableau des phases et les compteurs"""
+        print("\n" + "="*70)
+        print("PROFIL D'EXECUTION")
+        print("="*70)
+        print(f"Temps total: {time.perf_counter() - self._t0:.2f}s")
+        summary = self.summary()
+        if len(summary) > 0:
+            print(f"\n{'Phase':<32} {'Appels':>8} {'Total (s)':>10} {'Moy. (ms)':>10} {'% temps':>8}")
+            print("-"*70)
+            for _, row in summary.iterrows():
+                print(f"{row['phase']:<32} {row['calls']:>8d} {row['total_s']:>10.3f} "
+                      f"{row['mean_ms']:>10.3f} {row['pct_wall']:>7.1f}%")
+        if self.counters:
+            print("\nCompteurs:")
+            for name, value in sorted(self.counters.items()):
+                print(f"  {name:<30} {value:>10,}")
+
+
+# Instance partagee par les strategies et les scripts
+profiler = Profiler(enabled=os.environ.get('WORKSHOP_PROFILE', '0') not in ('', '0'))
+
+
+# Modules importes par tous les scripts et par chaque processus de calcul
+IMPORT_MODULES = ('strategies.random_stoploss', 'strategies.momentum', 'strategies.trade_log')
+IMPORT_BUDGET_S = 1.0  # Budget par module, interpreteur neuf (pandas et numpy compris)
+
+
+def measure_import_time(module: str, repeat: int = 3) -> float:
+    """Temps d'import d'un module dans un interpreteur neuf (meilleur de repeat essais)"""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = f"import time; start = time.perf_counter(); import {module}; print(time.perf_counter() - start)"
+    timings = [float(subprocess.run([sys.executable, '-c', code], cwd=root, capture_output=True,
+                                    text=True, check=True).stdout)
+               for _ in range(repeat)]
+    return min(timings)
+
+
+def check_import_budget(modules=IMPORT_MODULES, budget_s: float = IMPORT_BUDGET_S) -> pd.DataFrame:
+    """Temps d'import de chaque module compare au budget"""
+    rows = []
+    for module in modules:
+        elapsed = measure_import_time(module)
+        rows.append({'module': module, 'import_s': elapsed, 'budget_s': budget_s, 'ok': elapsed <= budget_s})
+    return pd.DataFrame(rows)
+
+
+if __name__ == '__main__':
+    table = check_import_budget()
+    print(table.to_string(index=False))
+    sys.exit(0 if table['ok'].all() else 1)
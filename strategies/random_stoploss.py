@@ -3,9 +3,19 @@ Strategie de selection aleatoire avec regle d'eviction (stop-loss sur 6 mois)
 """
 import numpy as np
 import pandas as pd
-import vectorbt as vbt
-from typing import List, Dict
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass, replace
+
+from strategies.cost_models import CostModel, BUY, SELL, as_cost_model, buy_budget, flat_rates
+from strategies.profiling import profiler
+from strategies.selection import selection_mask
+from strategies.sizing import Sizer, resolve_sizer
+from strategies.trade_log import TradeLog, replay_trade_log, value_metrics
+from strategies import trading_calendar
+from strategies.variance_reduction import (RandomKeys, VarianceReduction, buy_and_hold_returns, common_random_keys,
+                                           control_expectation, draw_by_keys, simulation_keys,
+                                           strata_labels, stratified_draw)
+from strategies.vectorbt_engine import order_sizes, portfolio_from_orders
 
 
 @dataclass
@@ -16,6 +26,11 @@ class StrategyConfig:
     stop_loss_threshold: float = -0.10  # Seuil de stop-loss (-10%)
     init_cash: float = 100_000  # Capital initial
     seed: int = None  # Graine pour la reproductibilite
+    cost_model: Optional[CostModel] = None  # Frais de transaction (None = sans frais)
+    stop_check: str = 'rebalance'  # 'rebalance' (debuts de mois) ou 'daily' (stop evenementiel quotidien)
+    sizer: Optional[Sizer] = None  # Dimensionnement des positions (None = actions entieres)
+    engine: str = 'native'  # 'native' ou 'vectorbt' (optionnel, importe seulement si selectionne)
+    calendar: str = 'trading'  # 'trading' = premier jour de bourse de chaque mois, 'legacy' = ancienne regle
 
 
 class RandomStopLossStrategy:
@@ -24,13 +39,41 @@ class RandomStopLossStrategy:
     1. Selectionne N actions aleatoirement
     2. Verifie chaque mois la performance sur 6 mois
     3. Si performance < -10%, evince l'action et en prend une nouvelle au hasard
+    
+    random_keys: cles aleatoires communes (lignes de prix x actions, tirees a la
+    demande, voir strategies/variance_reduction.py); par defaut, tirages np.random
+    initial_strata: strate de chaque colonne pour un portefeuille initial
+    stratifie (avec random_keys)
     """
     
-    def __init__(self, config: StrategyConfig = None):
+    def __init__(self, config: StrategyConfig = None, random_keys: RandomKeys = None,
+                 initial_strata: np.ndarray = None):
         self.config = config or StrategyConfig()
+        self.random_keys = random_keys
+        self.initial_strata = initial_strata
+        self.initial_portfolio = None
         if self.config.seed:
             np.random.seed(self.config.seed)
     
+    def draw(self, candidates: np.ndarray, size: int, row: int) -> np.ndarray:
+        """Tirage sans remise de size actions parmi candidates a la ligne de prix row"""
+        if self.random_keys is None:
+            return np.random.choice(candidates, size=size, replace=False)
+        return draw_by_keys(self.random_keys[row], candidates, size)
+    
+    def draw_initial(self, n_assets: int, row: int) -> np.ndarray:
+        """Portefeuille initial (stratifie si initial_strata), conserve dans initial_portfolio"""
+        if self.initial_strata is not None and self.random_keys is not None:
+            self.initial_portfolio = stratified_draw(self.random_keys[row], self.config.n_stocks, self.initial_strata)
+        else:
+            self.initial_portfolio = self.draw(np.arange(n_assets), self.config.n_stocks, row)
+        return self.initial_portfolio
+    
+    @staticmethod
+    def rebalance_dates(prices: pd.DataFrame, calendar: str = 'trading') -> pd.DatetimeIndex:
+        """Premiers jours de bourse de chaque mois (strategies/trading_calendar.py), premier jour a defaut"""
+        return trading_calendar.schedule_dates(prices.index, 'M', calendar)
+    
     def calculate_performance(self, prices: pd.DataFrame, lookback_days: int) -> pd.Series:
         """Calcule la performance sur la periode de lookback"""
         recent_prices = prices.iloc[-lookback_days:]
@@ -40,102 +83,153 @@ class RandomStopLossStrategy:
         perf = (recent_prices.iloc[-1] - recent_prices.iloc[0]) / recent_prices.iloc[0]
         return perf
     
-    def run_backtest_simple(self, prices: pd.DataFrame, verbose: bool = False) -> Dict:
+    def record_trade_log(self, prices: pd.DataFrame, verbose: bool = False):
         """
-        Execute le backtest avec une implementation simplifiee
+        Selection de la strategie (portefeuille initial, evictions, remplacements)
+        enregistree en journal d'ordres sur les indices de colonnes
+        
+        Les evictions ne dependent que des prix et les remplacements du tirage
+        aleatoire (memes tirages np.random que la selection par tickers): le
+        journal ne depend ni du cash ni des frais.
+        
+        Returns:
+            (TradeLog, matrice de prix)
         """
         all_stocks = prices.columns.tolist()
-        
-        # Parametres
         lookback_days = self.config.lookback_months * 21  # ~21 jours ouvres par mois
-        n_stocks = self.config.n_stocks
-        init_cash = self.config.init_cash
         
         # Generer les dates de rebalancement (debut de mois)
-        rebalance_dates = pd.date_range(start=prices.index[0], 
-                                       end=prices.index[-1], 
-                                       freq='MS')
-        rebalance_dates = prices.index[prices.index.isin(rebalance_dates)]
+        rebalance_dates = self.rebalance_dates(prices, self.config.calendar)
         
-        if len(rebalance_dates) < 2:
-            # Utiliser tous les mois disponibles
-            rebalance_dates = prices.index[::21]  # Tous les 21 jours environ
+        values = prices.to_numpy(dtype=float)
+        rows = prices.index.get_indexer(rebalance_dates)
         
-        # Initialisation du portefeuille
-        current_portfolio = np.random.choice(all_stocks, size=n_stocks, replace=False).tolist()
-        cash = init_cash
-        holdings = {stock: 0 for stock in all_stocks}
-        portfolio_values = []
+        # Initialisation du portefeuille (indices de colonnes)
+        current_portfolio = self.draw_initial(len(all_stocks), rows[0]).tolist()
+        log = TradeLog()
         
         if verbose:
-            print(f"Portefeuille initial: {current_portfolio}")
+            print(f"Portefeuille initial: {[all_stocks[j] for j in current_portfolio]}")
         
-        for i, date in enumerate(rebalance_dates):
-            if date not in prices.index:
+        for i, (date, row) in enumerate(zip(rebalance_dates, rows)):
+            if row < 0:
                 continue
-                
-            current_prices = prices.loc[date]
-            
-            # Calculer la valeur du portefeuille
-            portfolio_value = cash
-            for stock, qty in holdings.items():
-                if qty > 0 and stock in current_prices.index:
-                    portfolio_value += qty * current_prices[stock]
-            
-            portfolio_values.append({'date': date, 'value': portfolio_value})
             
+            profiler.count('random_stoploss.rebalances')
             if i == 0:
                 # Premier rebalancement - achat initial
-                allocation_per_stock = init_cash / n_stocks
-                for stock in current_portfolio:
-                    if stock in current_prices.index and current_prices[stock] > 0:
-                        qty = int(allocation_per_stock / current_prices[stock])
-                        holdings[stock] = qty
-                        cash -= qty * current_prices[stock]
-            else:
-                # Verifier les actions a evincer
-                hist_prices = prices.loc[:date]
+                log.record(date, row, buys=current_portfolio, portfolio=current_portfolio)
+                continue
+            
+            stocks_to_evict = []
+            new_stocks = []
+            if row + 1 >= lookback_days:
+                # Performance sur le lookback des actions detenues
+                with profiler.phase('random_stoploss.signal'):
+                    portfolio_idx = np.asarray(current_portfolio)
+                    start_prices = values[row + 1 - lookback_days, portfolio_idx]
+                    performances = (values[row, portfolio_idx] - start_prices) / start_prices
                 
-                if len(hist_prices) >= lookback_days:
-                    performances = self.calculate_performance(hist_prices, lookback_days)
-                    
-                    stocks_to_evict = []
-                    for stock in current_portfolio:
-                        if stock in performances.index:
-                            if performances[stock] < self.config.stop_loss_threshold:
-                                stocks_to_evict.append(stock)
+                with profiler.phase('random_stoploss.selection'):
+                    stocks_to_evict = portfolio_idx[performances < self.config.stop_loss_threshold].tolist()
+                    n_to_add = len(stocks_to_evict)
                     
-                    if len(stocks_to_evict) > 0:
+                    if n_to_add > 0:
+                        profiler.count('random_stoploss.evictions', n_to_add)
                         if verbose:
-                            print(f"{date.strftime('%Y-%m-%d')} - Actions evincees: {stocks_to_evict}")
-                        
-                        # Vendre les actions evincees
-                        for stock in stocks_to_evict:
-                            if holdings[stock] > 0 and stock in current_prices.index:
-                                cash += holdings[stock] * current_prices[stock]
-                                holdings[stock] = 0
-                        
-                        # Selectionner de nouvelles actions
-                        available = [s for s in all_stocks if s not in current_portfolio]
-                        n_to_add = len(stocks_to_evict)
+                            print(f"{date.strftime('%Y-%m-%d')} - Actions evincees: "
+                                  f"{[all_stocks[j] for j in stocks_to_evict]}")
                         
+                        # Selectionner de nouvelles actions (les evincees sont vendues
+                        # meme s'il n'y a plus assez d'actions disponibles)
+                        available = np.flatnonzero(~selection_mask(portfolio_idx, len(all_stocks)))
                         if len(available) >= n_to_add:
-                            new_stocks = np.random.choice(available, size=n_to_add, replace=False).tolist()
-                            
-                            # Mettre a jour le portefeuille
+                            new_stocks = self.draw(available, n_to_add, row).tolist()
                             for old_stock in stocks_to_evict:
                                 current_portfolio.remove(old_stock)
                             current_portfolio.extend(new_stocks)
-                            
-                            # Acheter les nouvelles actions
-                            allocation_per_stock = cash / n_to_add if n_to_add > 0 else 0
-                            for stock in new_stocks:
-                                if stock in current_prices.index and current_prices[stock] > 0:
-                                    qty = int(allocation_per_stock / current_prices[stock])
-                                    holdings[stock] = qty
-                                    cash -= qty * current_prices[stock]
+            
+            log.record(date, row, sells=stocks_to_evict, buys=new_stocks, portfolio=current_portfolio)
+        
+        return log, values
+    
+    def run_backtest_simple(self, prices: pd.DataFrame, verbose: bool = False) -> Dict:
+        """
+        Execute le backtest avec une implementation simplifiee
+        
+        La selection est enregistree (record_trade_log) puis rejouee par le noyau
+        sequentiel de comptabilite (compile si Numba est installe, voir strategies/kernels.py).
+        Valorisation a chaque debut de mois, avant les ordres.
+        (stop_check='daily': moteur evenementiel run_backtest_event_driven,
+        engine='vectorbt': execution par vectorbt, run_backtest_vectorbt)
+        """
+        if self.config.stop_check == 'daily':
+            if self.config.engine != 'native':
+                raise ValueError(f"stop_check='daily' n'est disponible qu'avec le moteur natif "
+                                 f"(engine='{self.config.engine}')")
+            return self.run_backtest_event_driven(prices, verbose)
+        if self.config.engine == 'vectorbt':
+            return self.run_backtest_vectorbt(prices, verbose)
+        
+        init_cash = self.config.init_cash
+        log, values = self.record_trade_log(prices, verbose)
+        
+        with profiler.phase('random_stoploss.execution'):
+            sizer, lots = resolve_sizer(self.config.sizer, prices.columns)
+            replay = replay_trade_log(log, values, [self.config.cost_model], init_cash, sizer=sizer, lots=lots)
+        
+        portfolio_values = [{'date': date, 'value': value}
+                            for date, value in zip(log.dates, replay['values_before'][:, 0])]
         
         # Calculer les metriques finales
+        with profiler.phase('random_stoploss.metrics'):
+            metrics = self._metrics(portfolio_values, init_cash)
+        
+        return {
+            **metrics,
+            'portfolio_values': portfolio_values,
+            'initial_value': init_cash,
+            'total_fees': float(replay['total_fees'][0])
+        }
+    
+    def run_backtest_vectorbt(self, prices: pd.DataFrame, verbose: bool = False) -> Dict:
+        """
+        Meme selection executee par vectorbt (Portfolio.from_orders)
+        
+        Les quantites viennent du rejeu (memes regles de dimensionnement); vectorbt
+        fournit la valeur quotidienne et ses statistiques (resultat 'portfolio').
+        Valorisation aux debuts de mois apres les ordres du jour. Frais proportionnels uniquement.
+        """
+        rates = flat_rates([as_cost_model(self.config.cost_model)])
+        if rates is None:
+            raise ValueError("Le moteur vectorbt n'accepte que des frais proportionnels (FlatFee)")
+        
+        init_cash = self.config.init_cash
+        log, values = self.record_trade_log(prices, verbose)
+        sizer, lots = resolve_sizer(self.config.sizer, prices.columns)
+        replay = replay_trade_log(log, values, rates, init_cash, sizer=sizer, lots=lots)
+        
+        with profiler.phase('random_stoploss.vectorbt'):
+            portfolio = portfolio_from_orders(prices, order_sizes(log, replay, values.shape), init_cash, rates[0])
+            daily_values = portfolio.value()
+        
+        portfolio_values = [{'date': date, 'value': daily_values.iloc[row]}
+                            for date, row in zip(log.dates, log.rows)]
+        
+        with profiler.phase('random_stoploss.metrics'):
+            metrics = self._metrics(portfolio_values, init_cash)
+        
+        return {
+            **metrics,
+            'portfolio_values': portfolio_values,
+            'initial_value': init_cash,
+            'total_fees': float(np.sum(portfolio.orders.fees.values)),
+            'portfolio': portfolio
+        }
+    
+    @staticmethod
+    def _metrics(portfolio_values: List[Dict], init_cash: float) -> Dict:
+        """Rendement total, Sharpe et drawdown de la serie de valeurs"""
         final_value = portfolio_values[-1]['value'] if portfolio_values else init_cash
         total_return = (final_value - init_cash) / init_cash * 100
         
@@ -158,45 +252,283 @@ class RandomStopLossStrategy:
             'total_return': total_return,
             'sharpe_ratio': sharpe_ratio,
             'max_drawdown': max_drawdown,
-            'final_value': final_value,
+            'final_value': final_value
+        }
+    
+    @staticmethod
+    def next_stop_days(values: np.ndarray, lookback_days: int, threshold: float) -> np.ndarray:
+        """
+        Pour chaque (jour t, action j): premier jour >= t ou la performance
+        glissante sur lookback_days passe sous le seuil (n_jours si jamais)
+        
+        Une ligne supplementaire (= n_jours) permet de chercher a partir de t + 1
+        pour le dernier jour.
+        """
+        n_days = len(values)
+        rolling = np.full(values.shape, np.nan)
+        if lookback_days <= n_days:
+            start = values[:n_days - lookback_days + 1]
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rolling[lookback_days - 1:] = (values[lookback_days - 1:] - start) / start
+        
+        days = np.arange(n_days, dtype=np.int32)[:, None]
+        fire_day = np.where(rolling < threshold, days, np.int32(n_days))
+        next_stop = np.empty((n_days + 1, values.shape[1]), dtype=np.int32)
+        next_stop[-1] = n_days
+        # Minimum cumule a rebours: prochain declenchement a partir de chaque jour
+        next_stop[:-1] = np.minimum.accumulate(fire_day[::-1], axis=0)[::-1]
+        return next_stop
+    
+    def run_backtest_event_driven(self, prices: pd.DataFrame, verbose: bool = False) -> Dict:
+        """
+        Stop-loss verifie chaque jour de bourse (et non plus aux seuls debuts de mois)
+        
+        Les declenchements sont precalcules (next_stop_days): pour chaque position,
+        le prochain stop se lit en O(1) a partir de son jour d'entree. La boucle ne
+        parcourt que les evenements (stops), pas les jours. Le portefeuille est
+        valorise aux memes debuts de mois que run_backtest_simple.
+        """
+        all_stocks = prices.columns.tolist()
+        lookback_days = self.config.lookback_months * 21
+        n_stocks = self.config.n_stocks
+        init_cash = self.config.init_cash
+        cost_model = self.config.cost_model
+        
+        rebalance_dates = self.rebalance_dates(prices, self.config.calendar)
+        
+        values = prices.to_numpy(dtype=float)
+        last_prices = prices.ffill().to_numpy(dtype=float)
+        rows = prices.index.get_indexer(rebalance_dates)
+        n_days = len(values)
+        
+        with profiler.phase('random_stoploss.signal'):
+            next_stop = self.next_stop_days(values, lookback_days, self.config.stop_loss_threshold)
+        
+        # Achat initial au premier debut de mois
+        portfolio = self.draw_initial(len(all_stocks), rows[0]).copy()
+        in_portfolio = np.zeros(len(all_stocks), dtype=bool)
+        in_portfolio[portfolio] = True
+        holdings = np.zeros(len(all_stocks))
+        cash = init_cash
+        total_fees = 0.0
+        n_stops = 0
+        
+        sizer, lots = resolve_sizer(self.config.sizer, all_stocks)
+        
+        def buy(stocks, allocation, row):
+            # Frais reserves dans l'allocation (achat + frais <= allocation)
+            nonlocal cash, total_fees
+            buy_prices = values[row, stocks]
+            budgets = buy_budget(cost_model, np.full(len(stocks), allocation), stocks)
+            qty = sizer.quantities(budgets, buy_prices, lots[stocks])
+            priced = buy_prices > 0
+            holdings[stocks] = qty
+            cash -= np.dot(qty[priced], buy_prices[priced])
+            if cost_model is not None:
+                fees = cost_model.fees(qty[priced] * buy_prices[priced], BUY, stocks[priced]).sum()
+                cash -= fees
+                total_fees += fees
+        
+        start_row = rows[0]
+        buy(portfolio, cash / n_stocks, start_row)
+        next_event = next_stop[start_row + 1, portfolio].astype(np.int64)
+        portfolio_values = []
+        
+        for date, row in zip(rebalance_dates, rows):
+            # Traiter les stops declenches avant ce debut de mois
+            with profiler.phase('random_stoploss.execution'):
+                while len(next_event) > 0:
+                    t = next_event.min()
+                    if t >= row or t >= n_days:
+                        break
+                    slots = np.flatnonzero(next_event == t)
+                    evicted = portfolio[slots]
+                    n_stops += len(slots)
+                    if verbose:
+                        print(f"{prices.index[t].strftime('%Y-%m-%d')} - Stops: "
+                              f"{[all_stocks[j] for j in evicted]}")
+                    
+                    # Vendre au dernier prix connu
+                    sold = evicted[holdings[evicted] > 0]
+                    sale_values = holdings[sold] * last_prices[t, sold]
+                    cash += sale_values.sum()
+                    if cost_model is not None:
+                        fees = cost_model.fees(sale_values, SELL, sold).sum()
+                        cash -= fees
+                        total_fees += fees
+                    holdings[evicted] = 0
+                    
+                    # Remplacer au hasard parmi les actions hors portefeuille
+                    available = np.flatnonzero(~in_portfolio)
+                    if len(available) >= len(slots):
+                        new_stocks = self.draw(available, len(slots), t)
+                        in_portfolio[evicted] = False
+                        in_portfolio[new_stocks] = True
+                        portfolio[slots] = new_stocks
+                        buy(new_stocks, cash / len(slots), t)
+                        next_event[slots] = next_stop[t + 1, new_stocks]
+                    else:
+                        next_event[slots] = n_days
+            
+            with profiler.phase('random_stoploss.valuation'):
+                held = (holdings > 0) & ~np.isnan(last_prices[row])
+                portfolio_value = cash + np.dot(holdings[held], last_prices[row][held])
+            portfolio_values.append({'date': date, 'value': portfolio_value})
+        
+        profiler.count('random_stoploss.evictions', n_stops)
+        
+        with profiler.phase('random_stoploss.metrics'):
+            metrics = self._metrics(portfolio_values, init_cash)
+        
+        return {
+            **metrics,
             'portfolio_values': portfolio_values,
-            'initial_value': init_cash
+            'initial_value': init_cash,
+            'total_fees': total_fees,
+            'n_stops': n_stops
         }
 
 
 def run_monte_carlo_simulation(prices: pd.DataFrame, 
                                n_simulations: int = 100,
-                               config: StrategyConfig = None) -> pd.DataFrame:
+                               config: StrategyConfig = None,
+                               variance_reduction: VarianceReduction = None) -> pd.DataFrame:
     """
     Execute N simulations Monte Carlo de la strategie avec differentes graines
+    
+    variance_reduction: tirages par cles aleatoires (graine = numero de simulation)
+    avec paires antithetiques, portefeuille initial stratifie et/ou variable de
+    controle (colonnes 'pair', 'control', 'control_mean' pour
+    variance_reduction.variance_reduction_report)
     """
     results = []
     
     print(f"Lancement de {n_simulations} simulations Monte Carlo...")
     
+    scheme = variance_reduction
+    if scheme is not None:
+        n_stocks = config.n_stocks if config else 20
+        calendar = config.calendar if config else 'trading'
+        rows = prices.index.get_indexer(RandomStopLossStrategy.rebalance_dates(prices, calendar))
+        values = prices.to_numpy(dtype=float)
+        strata = strata_labels(prices.columns, values[rows[0]], scheme) if scheme.stratified else None
+        # Variable de controle: buy & hold equipondere du portefeuille initial (esperance exacte)
+        control_returns = buy_and_hold_returns(values, rows[0], rows[-1])
+        control_mean = control_expectation(control_returns, n_stocks, strata)
+    
     for i in range(n_simulations):
         if (i + 1) % 10 == 0:
             print(f"  Simulation {i + 1}/{n_simulations}")
         
-        # Creer une config avec une graine differente
-        sim_config = StrategyConfig(
-            n_stocks=config.n_stocks if config else 20,
-            lookback_months=config.lookback_months if config else 6,
-            stop_loss_threshold=config.stop_loss_threshold if config else -0.10,
-            seed=i
-        )
+        # Meme configuration, graine differente
+        sim_config = replace(config or StrategyConfig(), seed=i)
         
-        strategy = RandomStopLossStrategy(sim_config)
+        if scheme is None:
+            strategy = RandomStopLossStrategy(sim_config)
+        else:
+            sim_config = replace(sim_config, seed=None)
+            keys = simulation_keys(i, prices.shape, scheme.antithetic)
+            strategy = RandomStopLossStrategy(sim_config, random_keys=keys, initial_strata=strata)
         result = strategy.run_backtest_simple(prices, verbose=False)
+        profiler.count('random_stoploss.simulations')
         
         if result:
-            results.append({
+            row = {
                 'simulation': i + 1,
                 'seed': i,
                 'total_return': result['total_return'],
                 'sharpe_ratio': result['sharpe_ratio'],
                 'max_drawdown': result['max_drawdown'],
                 'final_value': result['final_value']
+            }
+            if scheme is not None and scheme.antithetic:
+                row['pair'] = i // 2
+            if scheme is not None and scheme.control_variate:
+                row['control'] = control_returns[strategy.initial_portfolio].mean()
+                row['control_mean'] = control_mean
+            results.append(row)
+    
+    return pd.DataFrame(results)
+
+
+def selection_groups(configs: Dict[str, StrategyConfig]) -> List[Tuple[StrategyConfig, List[str]]]:
+    """
+    Configurations regroupees par selection (memes parametres hors frais et graine):
+    un journal d'ordres par groupe, rejoue pour tous ses modeles de couts
+
+    Returns:
+        [(configuration commune sans frais, noms des configurations du groupe)]
+    """
+    groups = []
+    for name, config in configs.items():
+        selection = replace(config, cost_model=None, seed=None)
+        for common, names in groups:
+            if common == selection:
+                names.append(name)
+                break
+        else:
+            groups.append((selection, [name]))
+    return groups
+
+
+def run_paired_monte_carlo(prices: pd.DataFrame,
+                           configs: Dict[str, StrategyConfig],
+                           n_simulations: int = 50,
+                           seed: int = 0) -> pd.DataFrame:
+    """
+    Simulations appariees (nombres aleatoires communs): a chaque simulation,
+    toutes les configurations tirent leurs actions avec les memes cles aleatoires
+    (comparaison par differences appariees: variance_reduction.paired_differences)
+    
+    Par simulation, le journal d'ordres est enregistre une fois par groupe de
+    selection (selection_groups) et rejoue en un seul appel replay_trade_log
+    sur l'axe des configurations du groupe: seules les variantes de frais sont
+    vectorisees. Des configurations qui changent la selection (n_stocks,
+    lookback, seuil, dimensionnement...) ont des journaux differents, donc un
+    enregistrement chacune; stop_check='daily' et engine='vectorbt' passent par
+    run_backtest_simple.
+    
+    Returns:
+        DataFrame une ligne par (simulation, config)
+    """
+    results = []
+    groups = selection_groups(configs)
+    
+    print(f"Lancement de {n_simulations} simulations appariees ({len(configs)} configurations, "
+          f"{len(groups)} journaux par simulation)...")
+    
+    for i in range(n_simulations):
+        if (i + 1) % 10 == 0:
+            print(f"  Simulation {i + 1}/{n_simulations}")
+        
+        keys = common_random_keys(seed + i, prices.shape)
+        metrics = {}
+        for common, names in groups:
+            if common.stop_check != 'rebalance' or common.engine != 'native':
+                for name in names:
+                    strategy = RandomStopLossStrategy(replace(configs[name], seed=None), random_keys=keys)
+                    metrics[name] = strategy.run_backtest_simple(prices, verbose=False)
+                continue
+            
+            log, values = RandomStopLossStrategy(common, random_keys=keys).record_trade_log(prices)
+            with profiler.phase('random_stoploss.execution'):
+                sizer, lots = resolve_sizer(common.sizer, prices.columns)
+                replay = replay_trade_log(log, values, [configs[name].cost_model for name in names],
+                                          common.init_cash, sizer=sizer, lots=lots)
+            level_metrics = value_metrics(replay['values_before'], common.init_cash)
+            for f, name in enumerate(names):
+                metrics[name] = {metric: float(level[f]) for metric, level in level_metrics.items()}
+        profiler.count('random_stoploss.simulations', len(configs))
+        
+        for name in configs:
+            results.append({
+                'simulation': i + 1,
+                'seed': seed + i,
+                'config': name,
+                'total_return': metrics[name]['total_return'],
+                'sharpe_ratio': metrics[name]['sharpe_ratio'],
+                'max_drawdown': metrics[name]['max_drawdown'],
+                'final_value': metrics[name]['final_value']
             })
     
     return pd.DataFrame(results)
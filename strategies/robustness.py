@@ -0,0 +1,87 @@
+"""
+Robustesse des strategies sur des historiques reechantillonnes (data/bootstrap.py)
+
+Chaque chemin de prix est construit une fois et evalue par toutes les
+configurations (Momentum et Random + Stop-Loss) et par le benchmark
+equipondere: les comparaisons sont appariees par chemin.
+"""
+from dataclasses import replace
+from typing import Dict, Union
+
+import pandas as pd
+
+from data.bootstrap import BlockBootstrap, BootstrapConfig
+from strategies.momentum import MomentumConfig, MomentumStrategy
+from strategies.profiling import profiler
+from strategies.random_stoploss import RandomStopLossStrategy, StrategyConfig
+from strategies.variance_reduction import RandomKeys, common_random_keys
+
+
+def equal_weight_return(prices: pd.DataFrame) -> float:
+    """Rendement total (%) du portefeuille equipondere de toutes les actions (benchmark de run_strategy)"""
+    benchmark_cum = (1 + prices.pct_change().mean(axis=1)).cumprod()
+    return (benchmark_cum.iloc[-1] - 1) * 100
+
+
+def run_strategy(prices: pd.DataFrame, config: Union[MomentumConfig, StrategyConfig],
+                 random_keys: RandomKeys = None) -> Dict:
+    """Backtest d'une configuration sur une matrice de prix (strategie deduite du type de config)"""
+    if isinstance(config, MomentumConfig):
+        return MomentumStrategy(config).run_backtest_simple(prices)
+    return RandomStopLossStrategy(replace(config, seed=None), random_keys=random_keys).run_backtest_simple(prices)
+
+
+def run_bootstrap_simulation(prices: pd.DataFrame,
+                             configs: Dict[str, Union[MomentumConfig, StrategyConfig]],
+                             bootstrap: BootstrapConfig = None) -> pd.DataFrame:
+    """
+    Evalue chaque configuration sur bootstrap.n_paths historiques reechantillonnes
+
+    Les tirages de la strategie aleatoire utilisent des cles aleatoires propres
+    a chaque chemin (reproductibles, independantes de l'ordre des configurations).
+
+    Returns:
+        DataFrame une ligne par (chemin, config): metriques et rendement du benchmark
+    """
+    bootstrap = bootstrap or BootstrapConfig()
+    results = []
+
+    print(f"Bootstrap {bootstrap.method}: {bootstrap.n_paths} chemins, "
+          f"blocs de {bootstrap.block_days} jours, {len(configs)} configurations")
+
+    for path_id, path in BlockBootstrap(prices, bootstrap).paths():
+        if (path_id + 1) % 50 == 0:
+            print(f"  Chemin {path_id + 1}/{bootstrap.n_paths}")
+
+        benchmark = equal_weight_return(path)
+        keys = common_random_keys(bootstrap.seed + path_id, path.shape)
+        for name, config in configs.items():
+            with profiler.phase('robustness.backtest'):
+                result = run_strategy(path, config, keys)
+            results.append({
+                'path': path_id,
+                'config': name,
+                'total_return': result['total_return'],
+                'sharpe_ratio': result['sharpe_ratio'],
+                'max_drawdown': result['max_drawdown'],
+                'benchmark_return': benchmark,
+                'outperformance': result['total_return'] - benchmark
+            })
+        profiler.count('robustness.paths')
+
+    return pd.DataFrame(results)
+
+
+def bootstrap_summary(results: pd.DataFrame) -> pd.DataFrame:
+    """Distribution des resultats par configuration sur l'ensemble des chemins"""
+    grouped = results.groupby('config', sort=False)
+    return pd.DataFrame({
+        'return_mean': grouped['total_return'].mean(),
+        'return_p5': grouped['total_return'].quantile(0.05),
+        'return_p95': grouped['total_return'].quantile(0.95),
+        'sharpe_mean': grouped['sharpe_ratio'].mean(),
+        'drawdown_mean': grouped['max_drawdown'].mean(),
+        'outperformance_mean': grouped['outperformance'].mean(),
+        'win_rate_vs_benchmark': grouped['outperformance'].apply(lambda x: (x > 0).mean() * 100),
+        'n_paths': grouped.size()
+    })
@@ -0,0 +1,82 @@
+"""
+Couche de selection par indices entiers (colonnes de la matrice de prix)
+Top-k par argpartition et differences de portefeuille par masques booleens,
+partagee par le momentum, l'analyse des frais et la rotation geographique
+"""
+import numpy as np
+from typing import Tuple
+
+
+def valid_scores_mask(scores: np.ndarray) -> np.ndarray:
+    """Scores exploitables: ni NaN ni -inf (convention: -inf = exclu)"""
+    return ~np.isnan(scores) & (scores != -np.inf)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """
+    Indices des k meilleurs scores, tries par score decroissant
+
+    Meme resultat que Series.nlargest(k) (keep='first'): a egalite de score,
+    la colonne la plus a gauche passe devant. Les scores NaN ou -inf sont ignores.
+    Cout O(n + k log k) au lieu d'un tri complet.
+    """
+    valid_idx = np.flatnonzero(valid_scores_mask(scores))
+    if k <= 0 or len(valid_idx) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    valid = scores[valid_idx]
+    if k < len(valid):
+        # Valeur du k-ieme meilleur score
+        kth = np.partition(valid, len(valid) - k)[len(valid) - k]
+        above = valid > kth
+        n_ties = k - above.sum()
+        # Completer avec les ex-aequo les plus a gauche (comme nlargest)
+        keep = above | ((valid == kth) & (np.cumsum(valid == kth) <= n_ties))
+        valid_idx = valid_idx[keep]
+        valid = valid[keep]
+
+    order = np.lexsort((valid_idx, -valid))
+    return valid_idx[order]
+
+
+def buffered_top_k(scores: np.ndarray, k: int, current: np.ndarray, buffer: int = 0) -> np.ndarray:
+    """
+    Top-k avec bande de conservation (reduit la rotation du portefeuille)
+
+    Une position detenue (masque current) est conservee tant que son rang
+    reste < k + buffer; les places restantes vont aux meilleurs scores.
+    Avec buffer=0, identique a top_k_indices.
+
+    Returns:
+        Indices cibles tries par score decroissant
+    """
+    if buffer <= 0:
+        return top_k_indices(scores, k)
+
+    wide = top_k_indices(scores, k + buffer)
+    selected = current[wide]
+    if selected.sum() > k:
+        # Plus de positions conservees que de places: garder les mieux classees
+        selected &= np.cumsum(selected) <= k
+    # Completer avec les meilleurs rangs non conserves (tous dans le top k)
+    n_new = k - selected.sum()
+    candidates = np.flatnonzero(~selected[:k])[:n_new]
+    selected[candidates] = True
+    return wide[selected]
+
+
+def selection_mask(indices: np.ndarray, n_assets: int) -> np.ndarray:
+    """Masque booleen des actifs selectionnes"""
+    mask = np.zeros(n_assets, dtype=bool)
+    mask[indices] = True
+    return mask
+
+
+def rebalance_diff(current: np.ndarray, target: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Achats et ventes entre deux masques de portefeuille
+
+    Returns:
+        (to_buy, to_sell): masques booleens sur l'univers
+    """
+    return target & ~current, current & ~target
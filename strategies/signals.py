@@ -0,0 +1,214 @@
+"""
+Signaux de classement (facteurs) pour le moteur Momentum
+
+Un signal est une fonction vectorisee: matrice de prix (jours x actions),
+lookback et saut en jours -> matrice de scores de meme forme. Le score de la
+ligne r n'utilise que les prix des lignes 0..r; NaN = action non classable.
+
+Les variantes du momentum (total, saut du dernier mois, normalise par la
+volatilite, residuel) derivent toutes de tableaux cumules calcules une fois
+par matrice de prix (log-prix, sommes cumulees des log-rendements et de leurs
+carres): chaque combinaison lookback/saut coute une soustraction par date.
+
+Les scores sont mis en cache par matrice de prix: les simulations Monte
+Carlo et les configurations d'une grille qui partagent un signal ne le
+recalculent pas. Plusieurs signaux se combinent par somme ponderee de leurs
+rangs en centiles a chaque date.
+
+    @register_signal('mon_facteur')
+    def mon_facteur(prices, lookback_days, skip_days): ...
+
+    MomentumConfig(lookback_months=12, skip_months=1)  # momentum 12-1
+    MomentumConfig(signals={'momentum': 0.5, 'low_volatility': 0.5})
+"""
+import weakref
+from typing import Callable, Dict, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from strategies.profiling import profiler
+
+
+SIGNALS: Dict[str, Callable[[pd.DataFrame, int, int], np.ndarray]] = {}
+
+
+def register_signal(name: str):
+    """Decorateur: enregistre un signal sous un nom (utilisable dans MomentumConfig.signals)"""
+    def decorator(function):
+        SIGNALS[name] = function
+        return function
+    return decorator
+
+
+def _window_difference(cumulative: np.ndarray, start_lag: int, end_lag: int) -> np.ndarray:
+    """cumulative[r - end_lag] - cumulative[r - start_lag] pour chaque ligne r (NaN avant start_lag)"""
+    difference = np.full(cumulative.shape, np.nan)
+    if start_lag < len(cumulative):
+        n = len(cumulative)
+        difference[start_lag:] = cumulative[start_lag - end_lag:n - end_lag] - cumulative[:n - start_lag]
+    return difference
+
+
+def _window(lookback_days: int, skip_days: int) -> Tuple[int, int]:
+    """Decalages (debut, fin) de la fenetre: prix des lignes r + 1 - lookback_days a r - skip_days"""
+    if not 0 <= skip_days < lookback_days - 1:
+        raise ValueError(f"Saut de {skip_days} jours incompatible avec un lookback de {lookback_days} jours")
+    return lookback_days - 1, skip_days
+
+
+def log_momentum(prices: pd.DataFrame, lookback_days: int, skip_days: int = 0) -> np.ndarray:
+    """Log-rendement de la fenetre (NaN si un des deux prix manque)"""
+    start_lag, end_lag = _window(lookback_days, skip_days)
+    return _window_difference(cumulative_arrays(prices)['log_price'], start_lag, end_lag)
+
+
+def window_volatility(prices: pd.DataFrame, lookback_days: int, skip_days: int = 0) -> np.ndarray:
+    """Ecart-type des log-rendements journaliers de la fenetre (NaN si un jour manque)"""
+    start_lag, end_lag = _window(lookback_days, skip_days)
+    arrays = cumulative_arrays(prices)
+    n = start_lag - end_lag
+    count = _window_difference(arrays['count'], start_lag, end_lag)
+    total = _window_difference(arrays['sum'], start_lag, end_lag)
+    squares = _window_difference(arrays['sum_squares'], start_lag, end_lag)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        variance = np.maximum(squares - total * total / n, 0.0) / (n - 1)
+    return np.where(count == n, np.sqrt(variance), np.nan)
+
+
+@register_signal('momentum')
+def momentum(prices: pd.DataFrame, lookback_days: int, skip_days: int = 0) -> np.ndarray:
+    """Log-rendement sur le lookback, hors skip_days derniers jours (12-1: 252 et 21)"""
+    return log_momentum(prices, lookback_days, skip_days)
+
+
+@register_signal('vol_scaled_momentum')
+def vol_scaled_momentum(prices: pd.DataFrame, lookback_days: int, skip_days: int = 0) -> np.ndarray:
+    """Momentum divise par la volatilite journaliere de la meme fenetre"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return log_momentum(prices, lookback_days, skip_days) / window_volatility(prices, lookback_days, skip_days)
+
+
+@register_signal('residual_momentum')
+def residual_momentum(prices: pd.DataFrame, lookback_days: int, skip_days: int = 0) -> np.ndarray:
+    """
+    Momentum residuel face a l'indice equipondere: rendement de la fenetre non
+    explique par le beta (estime sur la meme fenetre), divise par la volatilite
+    residuelle. Soustraire l'indice seul (beta = 1) ne changerait pas le classement.
+    """
+    start_lag, end_lag = _window(lookback_days, skip_days)
+    arrays = cumulative_arrays(prices)
+    n = start_lag - end_lag
+    window = {name: _window_difference(arrays[name], start_lag, end_lag)
+              for name in ('count', 'sum', 'sum_squares', 'market', 'market_squares', 'cross')}
+    market = window['market'][:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        market_variance = (window['market_squares'][:, None] - market * market / n) / (n - 1)
+        covariance = (window['cross'] - window['sum'] * market / n) / (n - 1)
+        variance = (window['sum_squares'] - window['sum'] * window['sum'] / n) / (n - 1)
+        beta = covariance / market_variance
+        residual_std = np.sqrt(np.maximum(variance - beta * covariance, 0.0))
+        score = (window['sum'] - beta * market) / residual_std
+    return np.where(window['count'] == n, score, np.nan)
+
+
+@register_signal('low_volatility')
+def low_volatility(prices: pd.DataFrame, lookback_days: int, skip_days: int = 0) -> np.ndarray:
+    """Volatilite journaliere de la fenetre, de signe oppose (les moins volatiles en tete)"""
+    return -window_volatility(prices, lookback_days, skip_days)
+
+
+# Scores par matrice de prix (par identite, liberes avec elle):
+# {id(prices): (reference faible, {'cumulative': tableaux, (signal, lookback, saut): scores})}
+_CACHE: Dict[int, Tuple[weakref.ref, Dict]] = {}
+
+
+def _cache_for(prices: pd.DataFrame) -> Dict:
+    key = id(prices)
+    cached = _CACHE.get(key)
+    if cached is None or cached[0]() is not prices:
+        cached = _CACHE[key] = (weakref.ref(prices, lambda _, key=key: _CACHE.pop(key, None)), {})
+    return cached[1]
+
+
+def cumulative_arrays(prices: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """
+    Tableaux cumules d'une matrice de prix, calcules une fois (jours x actions)
+
+    log_price: log des prix (NaN si manquant)
+    sum / sum_squares / count: sommes cumulees des log-rendements journaliers
+    observes, de leurs carres et de leur nombre
+    market / market_squares: log-rendement de l'indice equipondere (moyenne des
+    titres cotes) et son carre, cumules (un par jour)
+    cross: somme cumulee des produits rendement du titre x rendement de l'indice
+    """
+    cache = _cache_for(prices)
+    if 'cumulative' not in cache:
+        with profiler.phase('signals.cumulative'):
+            values = prices.to_numpy(dtype=float)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                log_price = np.log(values)
+            returns = np.diff(log_price, axis=0)
+            observed = np.isfinite(returns)
+            returns = np.where(observed, returns, 0.0)
+            market = returns.sum(axis=1) / np.maximum(observed.sum(axis=1), 1)
+
+            def cumulative(daily):
+                total = np.zeros((len(values),) + daily.shape[1:])
+                np.cumsum(daily, axis=0, out=total[1:])
+                return total
+
+            cache['cumulative'] = {
+                'log_price': log_price,
+                'sum': cumulative(returns),
+                'sum_squares': cumulative(returns * returns),
+                'count': cumulative(observed.astype(float)),
+                'market': cumulative(market),
+                'market_squares': cumulative(market * market),
+                'cross': cumulative(returns * market[:, None]),
+            }
+    return cache['cumulative']
+
+
+def signal_scores(prices: pd.DataFrame, name: str, lookback_days: int, skip_days: int = 0) -> np.ndarray:
+    """
+    Scores d'un signal (jours x actions), calcules une fois par matrice de prix
+
+    Les prix ne doivent pas etre modifies en place apres un premier appel.
+    Le resultat est partage: le copier avant de le modifier.
+    """
+    if name not in SIGNALS:
+        raise ValueError(f"Signal inconnu: {name} (disponibles: {', '.join(SIGNALS)})")
+    cache = _cache_for(prices)
+    key = (name, lookback_days, skip_days)
+    if key not in cache:
+        with profiler.phase('signals.compute'):
+            cache[key] = SIGNALS[name](prices, lookback_days, skip_days)
+        profiler.count('signals.computed')
+    return cache[key]
+
+
+def combined_scores(prices: pd.DataFrame, signals: Union[str, Dict[str, float], None], lookback_days: int,
+                    skip_days: int = 0) -> np.ndarray:
+    """
+    Scores de classement d'une configuration
+
+    signals: nom d'un signal, {nom: poids} ou None (momentum)
+    Un seul signal: ses scores bruts. Plusieurs: somme ponderee des rangs en
+    centiles de chaque signal a chaque date (NaN si un des signaux manque).
+    """
+    signals = {signals or 'momentum': 1.0} if not isinstance(signals, dict) else signals
+    if len(signals) == 1:
+        return signal_scores(prices, next(iter(signals)), lookback_days, skip_days)
+
+    cache = _cache_for(prices)
+    key = ('combined', tuple(sorted(signals.items())), lookback_days, skip_days)
+    if key not in cache:
+        with profiler.phase('signals.combine'):
+            total = np.zeros(prices.shape)
+            for name, weight in signals.items():
+                scores = signal_scores(prices, name, lookback_days, skip_days)
+                ranks = pd.DataFrame(np.where(np.isinf(scores), np.nan, scores)).rank(axis=1, pct=True)
+                total += weight * ranks.to_numpy()
+            cache[key] = total
+    return cache[key]
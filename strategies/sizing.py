@@ -0,0 +1,96 @@
+"""
+Dimensionnement des positions: actions entieres, fractionnaires ou par lots
+Calcul vectorise sur toutes les actions achetees d'un rebalancement;
+option de reinvestissement de l'arrondi (pas de tresorerie oisive)
+"""
+import numpy as np
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple
+
+from strategies.cost_models import exchange_of
+
+
+SIZING_MODES = ('integer', 'fractional', 'lots')
+
+# Quotites de negociation usuelles (lots de 100 a Tokyo), 1 ailleurs
+DEFAULT_LOT_SIZES = {'T': 100}
+
+
+@dataclass
+class Sizer:
+    """
+    mode:
+        'integer': nombre entier d'actions (comportement historique)
+        'fractional': fractions d'actions (par pas de fraction_step)
+        'lots': multiples de la quotite de la place de cotation (lot_sizes)
+    fill_cash: reinvestit le reliquat d'arrondi en unites supplementaires,
+               attribuees aux plus gros restes (methode du plus fort reste)
+    """
+    mode: str = 'integer'
+    fill_cash: bool = False
+    lot_sizes: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_LOT_SIZES))
+    fraction_step: float = 1e-6  # Plus petite fraction negociable (mode 'fractional')
+
+    def __post_init__(self):
+        if self.mode not in SIZING_MODES:
+            raise ValueError(f"Mode de dimensionnement inconnu: {self.mode} (attendu: {SIZING_MODES})")
+
+    @property
+    def unit(self) -> float:
+        """Unite de negociation sans quotites par colonne"""
+        return self.fraction_step if self.mode == 'fractional' else 1.0
+
+    def lot_array(self, tickers: Sequence[str]) -> np.ndarray:
+        """
+        Unite de negociation de chaque colonne, a calculer une fois par backtest:
+        1 action, quotite de la place ('lots') ou fraction_step ('fractional')
+        """
+        if self.mode != 'lots':
+            return np.full(len(tickers), self.unit)
+        return np.array([self.lot_sizes.get(exchange_of(t), 1) for t in tickers], dtype=float)
+
+    def quantities(self, allocation, prices: np.ndarray, lots: np.ndarray = None) -> np.ndarray:
+        """
+        Quantites a acheter pour un montant cible par position
+
+        Args:
+            allocation: montant par position (scalaire, ou tableau diffusable
+                        sur prices, ex: (niveaux, 1) pour le rejeu)
+            prices: prix d'achat (derniere dimension = actions); prix NaN ou <= 0 = pas d'achat
+            lots: unites de negociation alignees sur prices (lot_array),
+                  1 action par defaut (fraction_step en mode 'fractional')
+
+        Returns:
+            Quantites (0 pour les actions non achetables)
+        """
+        prices = np.asarray(prices, dtype=float)
+        allocation = np.maximum(np.asarray(allocation, dtype=float), 0.0)
+        tradable = prices > 0
+        safe_prices = np.where(tradable, prices, 1.0)
+
+        units = np.broadcast_to(self.unit if lots is None else lots, prices.shape)
+        unit_cost = safe_prices * units
+        qty = np.where(tradable, np.floor(allocation / unit_cost) * units, 0.0)
+
+        if self.fill_cash:
+            # Reliquat d'arrondi des ordres executables (le montant prevu pour
+            # un titre sans prix reste en tresorerie)
+            budget = np.where(tradable, allocation, 0.0).sum(axis=-1)
+            leftover = budget - np.sum(qty * safe_prices, axis=-1)
+            remainder = np.where(tradable, allocation - qty * safe_prices, -np.inf)
+
+            # Une unite de plus aux plus gros restes tant que le reliquat le permet
+            order = np.argsort(-remainder, axis=-1, kind='stable')
+            sorted_cost = np.take_along_axis(np.where(tradable, unit_cost, np.inf), order, axis=-1)
+            affordable = np.cumsum(sorted_cost, axis=-1) <= np.expand_dims(leftover, -1)
+            extra = np.zeros(prices.shape)
+            np.put_along_axis(extra, order, affordable * np.take_along_axis(units, order, axis=-1), axis=-1)
+            qty = qty + extra
+
+        return qty
+
+
+def resolve_sizer(sizer: Optional[Sizer], tickers: Sequence[str]) -> Tuple[Sizer, np.ndarray]:
+    """Sizer d'une configuration (None = actions entieres) et quotites des colonnes"""
+    sizer = sizer or Sizer()
+    return sizer, sizer.lot_array(tickers)
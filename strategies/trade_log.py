@@ -0,0 +1,285 @@
+"""
+Journal de transactions compact et rejeu vectorise sur plusieurs niveaux de frais
+
+La selection (quels titres vendre / acheter, a quelle date) ne depend pas des
+frais: elle est calculee une seule fois et enregistree. Le rejeu applique
+ensuite un vecteur de modeles de couts en une passe; les quantites, qui dependent
+de la tresorerie (donc des frais), y sont recalculees pour tous les niveaux a la fois.
+"""
+import numpy as np
+import pandas as pd
+from typing import Dict, List, Sequence
+
+from strategies.cost_models import BUY, SELL, FlatFee, as_cost_model, flat_rates, level_budgets, level_fees
+from strategies.kernels import USE_NUMBA, compiled, kernel_supported, replay_kernel
+from strategies.sizing import Sizer
+
+
+class TradeLog:
+    """
+    Ordres de chaque rebalancement: (date, ligne de prix, indices vendus, indices achetes)
+    Les indices sont les colonnes de la matrice de prix; les prix et les
+    quantites sont lus / recalcules au rejeu.
+    """
+
+    def __init__(self):
+        self.dates = []
+        self.rows = []
+        self.portfolios = []
+        self._sells = []
+        self._buys = []
+
+    def record(self, date, row: int, sells: Sequence[int] = (), buys: Sequence[int] = (),
+               portfolio: List[int] = None):
+        """Enregistre un rebalancement (ventes executees avant les achats)"""
+        self.dates.append(date)
+        self.rows.append(row)
+        self._sells.append(np.asarray(sells, dtype=np.int64))
+        self._buys.append(np.asarray(buys, dtype=np.int64))
+        if portfolio is not None:
+            self.portfolios.append(list(portfolio))
+
+    def sells(self, k: int) -> np.ndarray:
+        return self._sells[k]
+
+    def buys(self, k: int) -> np.ndarray:
+        return self._buys[k]
+
+    def flatten(self):
+        """
+        Journal aplati pour le noyau compile: (rows, sell_ptr, sell_idx, buy_ptr, buy_idx)
+        Les ordres du rebalancement k sont sell_idx[sell_ptr[k]:sell_ptr[k + 1]] (idem achats)
+        """
+        def concat(orders):
+            ptr = np.zeros(len(orders) + 1, dtype=np.int64)
+            ptr[1:] = np.cumsum([len(o) for o in orders])
+            flat = np.concatenate(orders) if orders else np.empty(0, dtype=np.int64)
+            return ptr, flat
+
+        sell_ptr, sell_idx = concat(self._sells)
+        buy_ptr, buy_idx = concat(self._buys)
+        return np.asarray(self.rows, dtype=np.int64), sell_ptr, sell_idx, buy_ptr, buy_idx
+
+    @property
+    def n_orders(self) -> int:
+        return sum(len(s) for s in self._sells) + sum(len(b) for b in self._buys)
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __repr__(self):
+        return f"TradeLog({len(self)} rebalancements, {self.n_orders} ordres)"
+
+
+def replay_trade_log(log: TradeLog, values: np.ndarray, costs: Sequence,
+                     init_cash: float, check_cash: bool = False, sizer: Sizer = None,
+                     lots: np.ndarray = None, engine: str = 'auto') -> Dict:
+    """
+    Rejoue le journal pour chaque niveau de couts (dimension F)
+
+    Ventes et valorisation: dernier prix connu (mark_prices), comme
+    run_backtest_simple; une position sans cotation ce jour-la garde sa valeur.
+    Achats: au prix du jour seulement (pas d'achat sans cotation).
+    Tresorerie repartie egalement entre les ordres du rebalancement,
+    frais reserves dans chaque part (buy_budget), quantites selon sizer
+    (entieres par defaut); avec check_cash, un achat (frais compris) doit
+    rester finance.
+
+    Args:
+        values: matrice de prix (dates x titres)
+        costs: un taux (0.001 = 0.1%) ou un CostModel par niveau
+        sizer: dimensionnement des positions (None = actions entieres)
+        lots: unites de negociation par colonne (sizer.lot_array(tickers))
+        engine: 'numpy' (vectorise sur les niveaux), 'kernel' (noyau sequentiel,
+                compile par Numba) ou 'auto' (noyau si Numba est disponible et
+                que les frais sont proportionnels)
+
+    Returns:
+        Dict de tableaux: values_before / values_after (rebalancements x F),
+        total_fees, n_transactions, buy_volume, sell_volume (F,),
+        sell_executed / buy_executed (liste par rebalancement de masques ordres x F),
+        buy_quantity (liste par rebalancement de quantites achetees ordres x F)
+    """
+    models = [as_cost_model(cost) for cost in costs]
+    sizer = sizer or Sizer()
+    rates = flat_rates(models)
+    if engine == 'auto':
+        engine = 'kernel' if USE_NUMBA and kernel_supported(rates, sizer) else 'numpy'
+    if engine == 'kernel':
+        return _replay_with_kernel(log, values, models, rates, init_cash, check_cash, sizer, lots)
+    n_levels = len(models)
+    n_events = len(log)
+    marks = mark_prices(values, log.rows)
+
+    cash = np.full(n_levels, float(init_cash))
+    holdings = np.zeros((n_levels, values.shape[1]))
+    total_fees = np.zeros(n_levels)
+    buy_volume = np.zeros(n_levels)
+    sell_volume = np.zeros(n_levels)
+    n_transactions = np.zeros(n_levels, dtype=np.int64)
+    values_before = np.empty((n_events, n_levels))
+    values_after = np.empty((n_events, n_levels))
+    sell_executed = []
+    buy_executed = []
+    buy_quantity = []
+
+    for k, row in enumerate(log.rows):
+        prices = values[row]
+        priced = np.nan_to_num(marks[k])
+        values_before[k] = cash + holdings @ priced
+
+        # Ventes: seulement les positions effectivement detenues a ce niveau
+        sell_idx = log.sells(k)
+        qty = holdings[:, sell_idx]
+        sold = qty > 0
+        sale_values = np.where(sold, qty * priced[sell_idx], 0.0)
+        fees = np.where(sold, level_fees(models, rates, sale_values, SELL, sell_idx), 0.0)
+        cash += (sale_values - fees).sum(axis=1)
+        total_fees += fees.sum(axis=1)
+        sell_volume += sale_values.sum(axis=1)
+        n_transactions += sold.sum(axis=1)
+        holdings[:, sell_idx] = 0
+        sell_executed.append(sold.T)
+
+        # Achats: l'allocation est fixee avant les achats, donc quantites et
+        # frais se calculent pour tous les ordres d'un coup
+        buy_idx = log.buys(k)
+        bought = np.zeros((len(buy_idx), n_levels), dtype=bool)
+        quantity = np.zeros((len(buy_idx), n_levels))
+        if len(buy_idx) > 0:
+            buy_prices = prices[buy_idx]
+            budgets = level_budgets(models, rates, cash / len(buy_idx), buy_idx)
+            buy_qty = sizer.quantities(budgets, np.broadcast_to(buy_prices, (n_levels, len(buy_idx))),
+                                       None if lots is None else lots[buy_idx])
+            ok = buy_qty > 0
+            cost = np.where(ok, buy_qty * buy_prices, 0.0)
+            fees = np.where(ok, level_fees(models, rates, cost, BUY, buy_idx), 0.0)
+
+            if check_cash:
+                # Chaque achat doit rester finance: sequentiel sur les ordres
+                for j in range(len(buy_idx)):
+                    ok[:, j] &= cost[:, j] + fees[:, j] <= cash
+                    cash -= np.where(ok[:, j], cost[:, j] + fees[:, j], 0.0)
+                cost = np.where(ok, cost, 0.0)
+                fees = np.where(ok, fees, 0.0)
+            else:
+                cash -= (cost + fees).sum(axis=1)
+
+            holdings[:, buy_idx] = np.where(ok, buy_qty, holdings[:, buy_idx])
+            total_fees += fees.sum(axis=1)
+            buy_volume += cost.sum(axis=1)
+            n_transactions += ok.sum(axis=1)
+            bought = ok.T
+            quantity = np.where(ok, buy_qty, 0.0).T
+        buy_executed.append(bought)
+        buy_quantity.append(quantity)
+
+        values_after[k] = cash + holdings @ priced
+
+    return {
+        'costs': models,
+        'fee_rates': rates,
+        'values_before': values_before,
+        'values_after': values_after,
+        'total_fees': total_fees,
+        'n_transactions': n_transactions,
+        'buy_volume': buy_volume,
+        'sell_volume': sell_volume,
+        'sell_executed': sell_executed,
+        'buy_executed': buy_executed,
+        'buy_quantity': buy_quantity
+    }
+
+
+def _replay_with_kernel(log: TradeLog, values: np.ndarray, models: List, rates: np.ndarray,
+                        init_cash: float, check_cash: bool, sizer: Sizer, lots: np.ndarray) -> Dict:
+    """replay_trade_log par le noyau sequentiel, un appel par niveau de frais"""
+    if not kernel_supported(rates, sizer):
+        raise ValueError("Le noyau exige des frais proportionnels (FlatFee) et fill_cash=False")
+
+    rows, sell_ptr, sell_idx, buy_ptr, buy_idx = log.flatten()
+    values = np.ascontiguousarray(values, dtype=float)
+    lots = np.full(values.shape[1], sizer.unit) if lots is None else np.asarray(lots, dtype=float)
+    n_levels = len(models)
+    kernel = compiled(replay_kernel)
+    marks = mark_prices(values, rows)
+    results = [kernel(values, marks, rows, sell_ptr, sell_idx, buy_ptr, buy_idx, float(init_cash),
+                      float(rate), lots, check_cash)
+               for rate in rates]
+
+    # Masques executes: (ordres x niveaux) par rebalancement, comme le rejeu NumPy
+    sold = np.stack([result[2] for result in results], axis=1).reshape(-1, n_levels)
+    bought = np.stack([result[3] for result in results], axis=1).reshape(-1, n_levels)
+    quantities = np.stack([result[4] for result in results], axis=1).reshape(-1, n_levels)
+    totals = np.stack([result[5] for result in results])
+
+    return {
+        'costs': models,
+        'fee_rates': rates,
+        'values_before': np.stack([result[0] for result in results], axis=1).reshape(-1, n_levels),
+        'values_after': np.stack([result[1] for result in results], axis=1).reshape(-1, n_levels),
+        'total_fees': totals[:, 0],
+        'n_transactions': totals[:, 3].astype(np.int64),
+        'buy_volume': totals[:, 1],
+        'sell_volume': totals[:, 2],
+        'sell_executed': [sold[sell_ptr[k]:sell_ptr[k + 1]] for k in range(len(rows))],
+        'buy_executed': [bought[buy_ptr[k]:buy_ptr[k + 1]] for k in range(len(rows))],
+        'buy_quantity': [quantities[buy_ptr[k]:buy_ptr[k + 1]] for k in range(len(rows))]
+    }
+
+
+def mark_prices(values: np.ndarray, rows: Sequence[int]) -> np.ndarray:
+    """
+    Dernier prix connu de chaque colonne aux lignes rows (rebalancements x titres),
+    NaN avant la premiere cotation: prix de valorisation et de vente du rejeu
+    """
+    rows = np.asarray(rows, dtype=np.int64)
+    if len(rows) == 0:
+        return np.empty((0, values.shape[1]))
+    return pd.DataFrame(values[:rows.max() + 1]).ffill().to_numpy(dtype=float)[rows]
+
+
+def value_metrics(values: np.ndarray, init_cash: float) -> Dict[str, np.ndarray]:
+    """
+    Metriques de chaque colonne d'une matrice de valeurs (rebalancements x F),
+    memes conventions que les backtests (Sharpe annualise sur 252, en %)
+    """
+    n_levels = values.shape[1]
+    if len(values) == 0:
+        zeros = np.zeros(n_levels)
+        return {'final_value': np.full(n_levels, float(init_cash)), 'total_return': zeros,
+                'sharpe_ratio': zeros, 'max_drawdown': zeros, 'volatility': zeros}
+
+    final_value = values[-1]
+    returns = values[1:] / values[:-1] - 1
+    mean = returns.mean(axis=0) if len(returns) > 0 else np.zeros(n_levels)
+    std = returns.std(axis=0, ddof=1) if len(returns) > 1 else np.zeros(n_levels)
+    valid = (len(returns) > 1) & (std > 0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(valid, mean / std * np.sqrt(252), 0.0)
+    cummax = np.maximum.accumulate(values, axis=0)
+    drawdown = ((values - cummax) / cummax).min(axis=0) * 100
+
+    return {
+        'final_value': final_value,
+        'total_return': (final_value - init_cash) / init_cash * 100,
+        'sharpe_ratio': sharpe,
+        'max_drawdown': np.where(valid, drawdown, 0.0),
+        'volatility': np.where(valid, std * np.sqrt(252) * 100, 0.0)
+    }
+
+
+def sweep_frame(replay: Dict, metrics: Dict[str, np.ndarray]) -> pd.DataFrame:
+    """Une ligne par niveau de frais (fee_pct = NaN pour un modele non proportionnel)"""
+    rates = replay['fee_rates']
+    return pd.DataFrame({
+        'fee_pct': rates if rates is not None else [m.rate if type(m) is FlatFee else np.nan
+                                                    for m in replay['costs']],
+        'cost_model': [repr(m) for m in replay['costs']],
+        **metrics,
+        'total_fees': replay['total_fees'],
+        'n_transactions': replay['n_transactions'],
+        'buy_volume': replay['buy_volume'],
+        'sell_volume': replay['sell_volume']
+    })
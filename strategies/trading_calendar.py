@@ -0,0 +1,114 @@
+"""
+Calendrier de bourse: dates de rebalancement a partir de l'index des prix
+
+Chaque periode (semaine, mois, trimestre, annee) est ramenee a son premier
+(ou dernier) jour de bourse par un seul searchsorted de ses bornes dans
+l'index: un mois qui commence un week-end ou un jour ferie est rebalance
+le jour de bourse suivant au lieu d'etre ignore.
+
+La premiere periode n'est retenue que si les donnees commencent dans ses
+premiers jours (week-end, jour ferie); une periode entamee en cours de
+route est ignoree, comme la derniere pour anchor='last'.
+
+    rebalance_dates(prices.index, 'M')             # premiers jours de bourse des mois
+    rebalance_dates(prices.index, 'Q', 'last')     # derniers jours des trimestres
+    rebalance_dates(prices.index, ['2020-03-16'])  # calendrier personnalise
+
+legacy_rebalance_dates garde l'ancienne regle (debuts de periode calendaires
+presents tels quels dans l'index) pour les resultats publies qui n'ont pas
+encore ete recalcules avec ce calendrier (config calendar='legacy').
+"""
+from typing import Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+
+CALENDARS = ('trading', 'legacy')
+FREQUENCIES = {'W': 'hebdomadaire', 'M': 'mensuel', 'Q': 'trimestriel', 'Y': 'annuel'}
+MAX_START_GAP_DAYS = 4  # Ecart maximal entre la borne d'une periode et son premier jour de bourse
+
+Schedule = Union[str, Sequence]
+
+
+def period_bounds(first: np.datetime64, last: np.datetime64, freq: str) -> np.ndarray:
+    """Bornes de debut des periodes couvrant first..last, plus la borne suivante (datetime64[ns])"""
+    if freq == 'W':
+        # Semaines du lundi (le 1970-01-05 est un lundi)
+        first_day = first.astype('datetime64[D]').astype(np.int64)
+        start = first_day - (first_day - 4) % 7
+        end = last.astype('datetime64[D]').astype(np.int64) + 7
+        bounds = np.arange(start, end + 1, 7).astype('datetime64[D]')
+    elif freq in ('M', 'Q'):
+        step = 1 if freq == 'M' else 3
+        start = first.astype('datetime64[M]').astype(np.int64)
+        start -= start % step
+        end = last.astype('datetime64[M]').astype(np.int64) + step
+        bounds = np.arange(start, end + 1, step).astype('datetime64[M]')
+    elif freq == 'Y':
+        bounds = np.arange(first.astype('datetime64[Y]'), last.astype('datetime64[Y]') + 2)
+    else:
+        raise ValueError(f"Frequence inconnue: {freq} (disponibles: {', '.join(FREQUENCIES)})")
+    return bounds.astype('datetime64[ns]')
+
+
+def rebalance_rows(index: pd.DatetimeIndex, schedule: Schedule = 'M', anchor: str = 'first') -> np.ndarray:
+    """
+    Lignes de l'index des dates de rebalancement (triees, sans doublon)
+
+    Args:
+        index: index des prix (jours de bourse tries)
+        schedule: 'W', 'M', 'Q', 'Y' ou liste de dates (premier jour de bourse a partir de chacune)
+        anchor: 'first' (premier jour de bourse de la periode) ou 'last' (dernier)
+    """
+    if len(index) == 0:
+        return np.empty(0, dtype=np.int64)
+    dates = index.to_numpy(dtype='datetime64[ns]')
+
+    if not isinstance(schedule, str):
+        targets = pd.DatetimeIndex(schedule).to_numpy(dtype='datetime64[ns]')
+        rows = np.searchsorted(dates, targets, side='left')
+        return np.unique(rows[rows < len(dates)])
+
+    bounds = period_bounds(dates[0], dates[-1], schedule)
+    starts = np.searchsorted(dates, bounds, side='left')
+    # Periodes contenant au moins un jour de bourse
+    has_days = starts[1:] > starts[:-1]
+    max_gap = np.timedelta64(MAX_START_GAP_DAYS, 'D')
+    if anchor == 'first':
+        rows = starts[:-1]
+        # Premiere periode entamee avant le debut des donnees
+        has_days[0] &= dates[0] - bounds[0] <= max_gap
+    elif anchor == 'last':
+        rows = starts[1:] - 1
+        has_days[-1] &= bounds[-1] - np.timedelta64(1, 'D') - dates[-1] <= max_gap
+    else:
+        raise ValueError(f"Ancrage inconnu: {anchor} ('first' ou 'last')")
+    return rows[has_days]
+
+
+def rebalance_dates(index: pd.DatetimeIndex, schedule: Schedule = 'M', anchor: str = 'first') -> pd.DatetimeIndex:
+    """Dates de rebalancement (jours de bourse de l'index), voir rebalance_rows"""
+    return index[rebalance_rows(index, schedule, anchor)]
+
+
+def legacy_rebalance_dates(index: pd.DatetimeIndex, freq: str = 'M') -> pd.DatetimeIndex:
+    """
+    Ancienne regle: debuts de mois (ou de trimestre pour 'Q') presents dans l'index,
+    tous les 21 (ou 63) jours si moins de 2 dates correspondent
+    """
+    dates = pd.date_range(start=index[0], end=index[-1], freq='QS' if freq == 'Q' else 'MS')
+    rebalance = index[index.isin(dates)]
+    if len(rebalance) < 2:
+        rebalance = index[::63 if freq == 'Q' else 21]
+    return rebalance
+
+
+def schedule_dates(index: pd.DatetimeIndex, freq: str = 'M', calendar: str = 'trading') -> pd.DatetimeIndex:
+    """Dates de rebalancement des strategies selon le calendrier choisi (premier jour a defaut)"""
+    if calendar == 'legacy':
+        return legacy_rebalance_dates(index, freq)
+    if calendar != 'trading':
+        raise ValueError(f"Calendrier inconnu: {calendar} (disponibles: {', '.join(CALENDARS)})")
+    dates = rebalance_dates(index, freq)
+    return dates if len(dates) > 0 else index[:1]
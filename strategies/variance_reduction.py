@@ -0,0 +1,241 @@
+"""
+Reduction de variance des simulations Monte Carlo
+
+Nombres aleatoires communs: chaque simulation dispose de cles aleatoires
+(jours x actions) partagees par toutes les configurations comparees, tirees
+a la demande ligne par ligne (seules les lignes de rebalancement et de stop
+sont lues: la memoire ne depend pas de la taille du panel).
+Les tirages sans remise (portefeuille initial, remplacements) prennent les
+cles les plus elevees parmi les candidates: deux configurations tirent les
+memes actions tant que leurs choix coincident, et la difference entre
+configurations est estimee par simulation appariee.
+
+Les memes cles servent aux schemas d'une seule configuration (VarianceReduction):
+paires antithetiques (cles u et 1 - u), portefeuille initial stratifie (par
+tranches de prix ou par secteur) et variable de controle (rendement buy & hold
+equipondere du portefeuille initial, d'esperance connue).
+"""
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from strategies.selection import top_k_indices
+
+
+class RandomKeys:
+    """
+    Cles aleatoires uniformes d'une simulation (lignes de prix x actions):
+    keys[row] tire la ligne avec un generateur graine par (seed, row), donc
+    identique quel que soit l'ordre ou le nombre de lignes lues
+    complement: cles 1 - u (simulation antithetique)
+    """
+
+    def __init__(self, seed: int, shape: Tuple[int, int], complement: bool = False):
+        self.seed = seed
+        self.shape = tuple(shape)
+        self.complement = complement
+
+    def __getitem__(self, row: int) -> np.ndarray:
+        if not 0 <= row < self.shape[0]:
+            raise IndexError(f"Ligne {row} hors des {self.shape[0]} lignes de prix")
+        keys = np.random.default_rng([self.seed, int(row)]).random(self.shape[1])
+        return 1.0 - keys if self.complement else keys
+
+    def __repr__(self):
+        return f"RandomKeys(seed={self.seed}, shape={self.shape}, complement={self.complement})"
+
+
+def common_random_keys(seed: int, shape: Tuple[int, int]) -> RandomKeys:
+    """Cles aleatoires uniformes d'une simulation (lignes de prix x actions)"""
+    return RandomKeys(seed, shape)
+
+
+@dataclass
+class VarianceReduction:
+    """
+    antithetic: simulations par paires, cles u puis 1 - u
+    stratified: portefeuille initial reparti entre strates au prorata de leur taille
+    control_variate: correction par le buy & hold equipondere du portefeuille initial
+    n_strata: nombre de tranches de prix (quantiles du prix initial) sans strata
+    strata: strate de chaque ticker (ex: secteur), prioritaire sur les tranches de prix
+    """
+    antithetic: bool = False
+    stratified: bool = False
+    control_variate: bool = False
+    n_strata: int = 5
+    strata: Optional[Dict[str, str]] = None
+
+
+def simulation_keys(index: int, shape: Tuple[int, int], antithetic: bool = False, seed: int = 0) -> RandomKeys:
+    """Cles de la simulation index (antithetic: la simulation impaire reprend 1 - u de sa paire)"""
+    if not antithetic:
+        return common_random_keys(seed + index, shape)
+    return RandomKeys(seed + index // 2, shape, complement=bool(index % 2))
+
+
+def draw_by_keys(keys: np.ndarray, candidates: np.ndarray, size: int) -> np.ndarray:
+    """
+    Tirage sans remise de size actions parmi candidates: les cles les plus
+    elevees (meme loi que np.random.choice(candidates, size, replace=False))
+    """
+    scores = np.full(len(keys), -np.inf)
+    scores[candidates] = keys[candidates]
+    return top_k_indices(scores, size)
+
+
+def mean_confidence_interval(samples: np.ndarray, confidence: float = 0.95) -> Tuple[float, float, float]:
+    """Moyenne et intervalle de confiance (approximation normale)"""
+    samples = np.asarray(samples, dtype=float)
+    mean = samples.mean()
+    if len(samples) < 2:
+        return mean, np.nan, np.nan
+    half_width = NormalDist().inv_cdf(0.5 + confidence / 2) * samples.std(ddof=1) / np.sqrt(len(samples))
+    return mean, mean - half_width, mean + half_width
+
+
+def paired_differences(results: pd.DataFrame, baseline: str, candidate: str,
+                       metrics: Sequence[str] = ('total_return', 'sharpe_ratio', 'max_drawdown'),
+                       confidence: float = 0.95) -> pd.DataFrame:
+    """
+    Differences appariees candidate - baseline par simulation
+
+    Args:
+        results: resultats par (simulation, config) (run_paired_monte_carlo)
+
+    Returns:
+        DataFrame par metrique: moyennes, difference moyenne et son intervalle de
+        confiance, correlation entre configurations et gain de variance (nombre de
+        simulations independantes equivalent a une simulation appariee)
+    """
+    table = results.pivot(index='simulation', columns='config', values=list(metrics))
+    rows = []
+    for metric in metrics:
+        a = table[(metric, baseline)].to_numpy(dtype=float)
+        b = table[(metric, candidate)].to_numpy(dtype=float)
+        diff = b - a
+        mean_diff, ci_low, ci_high = mean_confidence_interval(diff, confidence)
+        var_diff = diff.var(ddof=1) if len(diff) > 1 else np.nan
+        rows.append({
+            'metric': metric,
+            'baseline_mean': a.mean(),
+            'candidate_mean': b.mean(),
+            'mean_diff': mean_diff,
+            'ci_low': ci_low,
+            'ci_high': ci_high,
+            'correlation': np.corrcoef(a, b)[0, 1] if len(diff) > 1 else np.nan,
+            # Variance d'une difference independante / variance appariee
+            'variance_reduction': (a.var(ddof=1) + b.var(ddof=1)) / var_diff if var_diff > 0 else np.inf,
+        })
+    return pd.DataFrame(rows)
+
+
+def price_strata(start_prices: np.ndarray, n_strata: int) -> np.ndarray:
+    """Tranches de prix initial (quantiles); -1 pour les actions sans prix"""
+    labels = np.full(len(start_prices), -1)
+    priced = start_prices > 0
+    if priced.any():
+        edges = np.quantile(start_prices[priced], np.linspace(0, 1, n_strata + 1)[1:-1])
+        labels[priced] = np.searchsorted(edges, start_prices[priced], side='right')
+    return labels
+
+
+def strata_labels(tickers: Sequence[str], start_prices: np.ndarray, scheme: VarianceReduction) -> np.ndarray:
+    """Strate (entier) de chaque colonne: secteurs fournis ou tranches de prix"""
+    if scheme.strata is None:
+        return price_strata(start_prices, scheme.n_strata)
+    _, labels = np.unique([str(scheme.strata.get(t, '')) for t in tickers], return_inverse=True)
+    return labels
+
+
+def stratum_allocation(labels: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Nombre d'actions par strate, au prorata de la taille des strates
+    (methode du plus fort reste)
+
+    Returns:
+        (strates, effectifs a tirer)
+    """
+    strata, counts = np.unique(labels, return_counts=True)
+    quota = counts / counts.sum() * size
+    allocation = np.floor(quota).astype(int)
+    order = np.argsort(-(quota - allocation), kind='stable')
+    allocation[order[:size - allocation.sum()]] += 1
+    return strata, allocation
+
+
+def stratified_draw(keys: np.ndarray, size: int, labels: np.ndarray) -> np.ndarray:
+    """Tirage stratifie sur toutes les colonnes: cles les plus elevees de chaque strate"""
+    strata, allocation = stratum_allocation(labels, size)
+    picks = [draw_by_keys(keys, np.flatnonzero(labels == stratum), n)
+             for stratum, n in zip(strata, allocation) if n > 0]
+    return np.concatenate(picks) if picks else np.empty(0, dtype=np.int64)
+
+
+def buy_and_hold_returns(values: np.ndarray, start_row: int, end_row: int) -> np.ndarray:
+    """Rendement buy & hold (%) de chaque colonne, 0 si l'action n'est pas achetable au depart"""
+    start = values[start_row]
+    end = pd.DataFrame(values[:end_row + 1]).ffill().to_numpy()[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = (end / start - 1) * 100
+    return np.where((start > 0) & np.isfinite(returns), returns, 0.0)
+
+
+def control_expectation(returns: np.ndarray, size: int, labels: Optional[np.ndarray] = None) -> float:
+    """
+    Esperance exacte du buy & hold equipondere d'un portefeuille tire au hasard
+    (tirage uniforme, ou stratifie si labels)
+    """
+    if labels is None:
+        return float(returns.mean())
+    strata, allocation = stratum_allocation(labels, size)
+    return float(sum(n * returns[labels == stratum].mean() for stratum, n in zip(strata, allocation)) / size)
+
+
+def effective_sample_size(per_simulation_variance: float, estimator_variance: float) -> float:
+    """Nombre de simulations independantes donnant la meme precision que l'estimateur"""
+    return per_simulation_variance / estimator_variance if estimator_variance > 0 else np.inf
+
+
+def variance_reduction_report(results: pd.DataFrame, metric: str = 'total_return') -> pd.DataFrame:
+    """
+    Precision de la moyenne de metric selon l'estimateur
+
+    Args:
+        results: simulations de run_monte_carlo_simulation(variance_reduction=...),
+                 colonnes optionnelles 'pair' (antithetique) et 'control', 'control_mean'
+
+    Returns:
+        DataFrame par estimateur: moyenne, erreur standard, taille d'echantillon
+        effective (ess) et gain par rapport au nombre de simulations
+        (la stratification reduit deja la variance par simulation: son gain
+        se lit en comparant l'ecart-type a celui d'un tirage simple)
+    """
+    y = results[metric].to_numpy(dtype=float)
+    n = len(y)
+    per_simulation_variance = y.var(ddof=1)
+    rows = [('simple', y.mean(), per_simulation_variance / n)]
+
+    # Unites independantes: paires antithetiques (moyenne de la paire) ou simulations
+    units = results.groupby('pair') if 'pair' in results.columns else None
+    if units is not None:
+        pair_y = units[metric].mean().to_numpy()
+        rows.append(('antithetique', pair_y.mean(), pair_y.var(ddof=1) / len(pair_y)))
+
+    if 'control' in results.columns:
+        c = results['control'].to_numpy(dtype=float)
+        mu = results['control_mean'].iloc[0]
+        if units is not None:
+            y, c = pair_y, units['control'].mean().to_numpy()
+        beta = np.cov(y, c, ddof=1)[0, 1] / c.var(ddof=1) if c.var(ddof=1) > 0 else 0.0
+        adjusted = y - beta * (c - mu)
+        name = 'antithetique + controle' if units is not None else 'variable de controle'
+        rows.append((name, adjusted.mean(), adjusted.var(ddof=1) / len(adjusted)))
+
+    report = pd.DataFrame(rows, columns=['estimator', 'mean', 'variance'])
+    report['std_error'] = np.sqrt(report['variance'])
+    report['ess'] = [effective_sample_size(per_simulation_variance, v) for v in report['variance']]
+    report['ess_ratio'] = report['ess'] / n
+    return report.drop(columns='variance')
@@ -0,0 +1,63 @@
+"""
+Moteur d'execution optionnel vectorbt (charge a la demande)
+
+vectorbt (et ses dependances numba, plotly...) n'est importe que lorsque ce
+moteur est selectionne: les scripts et les processus de calcul qui ne
+l'utilisent pas n'en paient pas le cout au demarrage.
+"""
+import numpy as np
+import pandas as pd
+
+from strategies.trade_log import TradeLog
+
+
+_vbt = None
+
+
+def load_vectorbt():
+    """Importe vectorbt a la premiere utilisation"""
+    global _vbt
+    if _vbt is None:
+        try:
+            import vectorbt
+        except ImportError as exc:
+            raise ImportError("Le moteur 'vectorbt' necessite le paquet vectorbt (pip install vectorbt)") from exc
+        _vbt = vectorbt
+    return _vbt
+
+
+def order_sizes(log: TradeLog, replay: dict, shape, level: int = 0) -> np.ndarray:
+    """
+    Matrice d'ordres (dates x titres) d'un niveau du rejeu, au format de
+    Portfolio.from_orders: NaN = pas d'ordre, -inf = vente de toute la
+    position, quantite achetee sinon
+    """
+    size = np.full(shape, np.nan)
+    for k, row in enumerate(log.rows):
+        sold = replay['sell_executed'][k][:, level]
+        size[row, log.sells(k)[sold]] = -np.inf
+        bought = replay['buy_executed'][k][:, level]
+        size[row, log.buys(k)[bought]] = replay['buy_quantity'][k][bought, level]
+    return size
+
+
+def portfolio_from_orders(prices: pd.DataFrame, size: np.ndarray, init_cash: float,
+                          fee_rate: float = 0.0, **kwargs):
+    """
+    Portefeuille vectorbt a tresorerie partagee entre les titres
+    (call_seq='auto': les ventes d'une date sont executees avant les achats)
+    """
+    vbt = load_vectorbt()
+    return vbt.Portfolio.from_orders(
+        prices,
+        size=size,
+        size_type='amount',
+        direction='longonly',
+        fees=fee_rate,
+        init_cash=init_cash,
+        cash_sharing=True,
+        group_by=True,
+        call_seq='auto',
+        freq='1D',
+        **kwargs
+    )
@@ -14,6 +14,8 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from data.download_data import download_stock_data
+from strategies.selection import top_k_indices
+from strategies.trading_calendar import schedule_dates
 
 
 # ETF représentatifs par région (tickers Yahoo Finance)
@@ -32,6 +34,16 @@ GEO_ETF = {
 }
 
 
+# Ancien calendrier tant que data/geo_diversification_results.csv n'a pas ete
+# recalcule (ETF a re-telecharger); 'trading' = premier jour de bourse de chaque periode
+CALENDAR = 'legacy'
+
+
+def rebalance_mask(index, freq):
+    """Jours de rebalancement de l'index (strategies/trading_calendar.py, calendrier CALENDAR)"""
+    return index.isin(schedule_dates(index, freq, CALENDAR))
+
+
 def load_geo_data(start_date='2010-01-01', end_date='2024-12-31'):
     """
     Télécharge les données des ETF géographiques
@@ -136,37 +148,26 @@ def strategy_momentum_rotation(prices, lookback_months=12, top_n=2, rebalance_fr
     lookback_days = lookback_months * 21
     returns = prices.pct_change().dropna()
     
-    # Déterminer les dates de rebalancement
-    if rebalance_freq == 'Q':
-        rebalance_dates = pd.date_range(start=returns.index[0], end=returns.index[-1], freq='QS')
-    else:
-        rebalance_dates = pd.date_range(start=returns.index[0], end=returns.index[-1], freq='MS')
+    # Jours de rebalancement (debut de chaque periode)
+    is_rebalance = rebalance_mask(returns.index, rebalance_freq)
+    returns_arr = returns.to_numpy(dtype=float)
     
-    rebalance_dates = returns.index[returns.index.isin(rebalance_dates)]
-    
-    portfolio_returns = []
+    portfolio_returns = np.zeros(len(returns_arr))
     current_selection = None
     
-    for date in returns.index:
+    for t in range(len(returns_arr)):
         # Vérifier si c'est une date de rebalancement
-        if date in rebalance_dates:
+        if is_rebalance[t]:
             # Calculer le momentum
-            start_idx = max(0, returns.index.get_loc(date) - lookback_days)
-            hist_returns = returns.iloc[start_idx:returns.index.get_loc(date)]
-            
-            momentum = (1 + hist_returns).prod() - 1
-            momentum = momentum.dropna().sort_values(ascending=False)
+            start_idx = max(0, t - lookback_days)
+            momentum = np.prod(1 + returns_arr[start_idx:t], axis=0) - 1
             
-            # Sélectionner les top_n
-            current_selection = momentum.head(top_n).index.tolist()
+            # Sélectionner les top_n (indices de colonnes)
+            current_selection = top_k_indices(momentum, top_n)
         
         # Calculer le rendement du jour
-        if current_selection:
-            day_return = returns.loc[date, current_selection].mean()
-        else:
-            day_return = 0
-        
-        portfolio_returns.append(day_return)
+        if current_selection is not None and len(current_selection) > 0:
+            portfolio_returns[t] = np.nanmean(returns_arr[t, current_selection])
     
     portfolio_returns = pd.Series(portfolio_returns, index=returns.index)
     
@@ -185,18 +186,14 @@ def strategy_risk_parity(prices, vol_lookback_months=3, rebalance_freq='M'):
     vol_lookback_days = vol_lookback_months * 21
     returns = prices.pct_change().dropna()
     
-    if rebalance_freq == 'M':
-        rebalance_dates = pd.date_range(start=returns.index[0], end=returns.index[-1], freq='MS')
-    else:
-        rebalance_dates = pd.date_range(start=returns.index[0], end=returns.index[-1], freq='QS')
-    
-    rebalance_dates = returns.index[returns.index.isin(rebalance_dates)]
+    # Jours de rebalancement (debut de chaque periode)
+    is_rebalance = rebalance_mask(returns.index, rebalance_freq)
     
     portfolio_returns = []
     current_weights = None
     
-    for date in returns.index:
-        if date in rebalance_dates:
+    for date, rebalance in zip(returns.index, is_rebalance):
+        if rebalance:
             # Calculer la volatilité
             start_idx = max(0, returns.index.get_loc(date) - vol_lookback_days)
             hist_returns = returns.iloc[start_idx:returns.index.get_loc(date)]
@@ -241,8 +238,7 @@ def strategy_us_vs_world(prices, lookback_months=6):
         print("[!] Données SPY ou ACWI non disponibles pour cette stratégie")
         return None, None
     
-    rebalance_dates = pd.date_range(start=returns.index[0], end=returns.index[-1], freq='MS')
-    rebalance_dates = returns.index[returns.index.isin(rebalance_dates)]
+    is_rebalance = rebalance_mask(returns.index, 'M')
     
     # ETF internationaux disponibles
     intl_etfs = [t for t in ['IEV', 'EWJ', 'EEM', 'VWO', 'EPP'] if t in returns.columns]
@@ -251,9 +247,9 @@ def strategy_us_vs_world(prices, lookback_months=6):
     us_weight = 0.50  # Default
     intl_per_etf = 0.10 if intl_etfs else 0
     
-    for date in returns.index:
+    for date, rebalance in zip(returns.index, is_rebalance):
         # Déterminer l'allocation
-        if date in rebalance_dates:
+        if rebalance:
             start_idx = max(0, returns.index.get_loc(date) - lookback_days)
             hist_returns = returns.iloc[start_idx:returns.index.get_loc(date)]
             
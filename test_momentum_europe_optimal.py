@@ -14,6 +14,7 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from strategies.momentum import MomentumStrategy, MomentumConfig
+from data.quality import load_clean_prices
 
 
 def load_europe_data():
@@ -23,17 +24,9 @@ def load_europe_data():
     # Fichier principal
     eu_file = 'data/european_prices_clean.csv'
     if os.path.exists(eu_file):
-        prices = pd.read_csv(eu_file, index_col=0, parse_dates=True)
-        
-        # Nettoyage
-        min_data = len(prices) * 0.7
-        valid_cols = prices.columns[prices.count() >= min_data]
-        prices = prices[valid_cols].dropna(axis=0, how='all')
-        prices = prices.fillna(method='ffill').fillna(method='bfill')
-        
-        # Tz-naive
-        if prices.index.tz is not None:
-            prices.index = prices.index.tz_localize(None)
+        # Nettoyage en cache (data/quality.py); seances sans aucun prix retirees,
+        # les NaN restants (actions pas encore cotees) sont ignores par la strategie
+        prices = load_clean_prices(eu_file, min_coverage=0.7, drop_rows='all')
         
         print(f"  Periode: {prices.index[0].strftime('%Y-%m-%d')} a {prices.index[-1].strftime('%Y-%m-%d')}")
         print(f"  Actions: {prices.shape[1]}")
@@ -47,22 +40,12 @@ def load_europe_extended():
     
     eu_file = 'data/european_prices_2007_2024.csv'
     if os.path.exists(eu_file):
-        prices = pd.read_csv(eu_file, index_col=0, parse_dates=True)
-        
-        min_data = len(prices) * 0.5
-        valid_cols = prices.columns[prices.count() >= min_data]
-        prices = prices[valid_cols]
+        prices = load_clean_prices(eu_file, min_coverage=0.5, drop_rows='all')
         
         if len(prices.columns) == 0 or len(prices) == 0:
             print("  [!] Donnees insuffisantes apres filtrage")
             return None
         
-        prices = prices.dropna(axis=0, how='all')
-        prices = prices.fillna(method='ffill').fillna(method='bfill')
-        
-        if prices.index.tz is not None:
-            prices.index = prices.index.tz_localize(None)
-        
         if len(prices.index) > 0:
             print(f"  Periode: {prices.index[0].strftime('%Y-%m-%d')} a {prices.index[-1].strftime('%Y-%m-%d')}")
             print(f"  Actions: {prices.shape[1]}")
@@ -98,11 +81,7 @@ def calculate_benchmark_metrics(prices):
 
 def test_period(prices, period_name, start_date, end_date, config, n_sim=30):
     """Teste une periode specifique"""
-    # Convertir dates
-    if isinstance(prices.index, pd.DatetimeIndex) and prices.index.tz is not None:
-        prices = prices.copy()
-        prices.index = prices.index.tz_localize(None)
-    
+    # Convertir dates (index normalise a l'ingestion: jours de seance)
     start_ts = pd.Timestamp(start_date)
     end_ts = pd.Timestamp(end_date)
     
@@ -123,6 +102,7 @@ def test_period(prices, period_name, start_date, end_date, config, n_sim=30):
             n_stocks=config.n_stocks,
             lookback_months=config.lookback_months,
             rebalancing_freq=config.rebalancing_freq,
+            calendar=config.calendar,
             init_cash=100_000,
             seed=i
         )
@@ -172,7 +152,10 @@ def main():
         n_stocks=10,
         lookback_months=3,
         rebalancing_freq='Q',
-        init_cash=100_000
+        init_cash=100_000,
+        # Ancien calendrier tant que les resultats publies n'ont pas ete recalcules
+        # (donnees europeennes a re-telecharger), voir strategies/trading_calendar.py
+        calendar='legacy'
     )
     
     all_results = []
@@ -14,6 +14,8 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from strategies.momentum import MomentumStrategy, MomentumConfig, run_monte_carlo_simulation
+from strategies.orchestrator import Dataset, Job, run_jobs
+from data.quality import load_clean_prices
 
 
 def load_us_data():
@@ -31,12 +33,8 @@ def load_eu_data():
     # Utiliser le fichier CSV existant
     eu_file = 'data/european_prices_clean.csv'
     if os.path.exists(eu_file):
-        prices = pd.read_csv(eu_file, index_col=0, parse_dates=True)
-        # Filtrer les colonnes avec suffisamment de donnees
-        min_data = len(prices) * 0.8  # Au moins 80% de donnees
-        valid_cols = prices.columns[prices.count() >= min_data]
-        prices = prices[valid_cols].dropna(axis=0, how='all')
-        prices = prices.fillna(method='ffill').fillna(method='bfill')
+        # Nettoyage en cache (data/quality.py), au moins 80% de donnees
+        prices = load_clean_prices(eu_file, min_coverage=0.8)
         return prices, "Europe EURO STOXX"
     else:
         print(f"  Fichier non trouve: {eu_file}")
@@ -48,10 +46,7 @@ def load_eu_extended_data():
     print("\n[Chargement donnees Europe etendues...]")
     eu_file = 'data/european_prices_2007_2024.csv'
     if os.path.exists(eu_file):
-        prices = pd.read_csv(eu_file, index_col=0, parse_dates=True)
-        valid_cols = prices.columns[prices.count() >= len(prices) * 0.7]
-        prices = prices[valid_cols].dropna(axis=0, how='all')
-        prices = prices.fillna(method='ffill').fillna(method='bfill')
+        prices = load_clean_prices(eu_file, min_coverage=0.7)
         return prices, "Europe 2007-2024"
     return None, None
 
@@ -86,13 +81,6 @@ def calculate_benchmark_metrics(prices):
 
 def test_period(prices, period_name, start_date, end_date, config, n_sim=30):
     """Teste la strategie sur une periode specifique"""
-    # S'assurer que l'index est un DatetimeIndex tz-naive
-    prices = prices.copy()
-    if not isinstance(prices.index, pd.DatetimeIndex):
-        prices.index = pd.to_datetime(prices.index, utc=True).tz_localize(None)
-    elif prices.index.tz is not None:
-        prices.index = prices.index.tz_localize(None)
-    
     # Convertir les dates en Timestamp
     start_ts = pd.Timestamp(start_date)
     end_ts = pd.Timestamp(end_date)
@@ -168,7 +156,10 @@ def main():
         lookback_months=12,
         rebalancing_freq='M',
         init_cash=100_000,
-        seed=42
+        seed=42,
+        # Ancien calendrier tant que les resultats publies n'ont pas ete recalcules
+        # (donnees europeennes a re-telecharger), voir strategies/trading_calendar.py
+        calendar='legacy'
     )
     
     print("\n[Configuration]")
@@ -176,61 +167,52 @@ def main():
     print(f"  Lookback: {config.lookback_months} mois")
     print(f"  Rebalancement: Mensuel")
     
-    all_results = []
-    
-    # ============================================================
-    # 1. TEST US (2018-2024)
-    # ============================================================
-    us_prices, us_name = load_us_data()
-    
-    us_periods = {
-        'Complete': ('2018-01-01', '2024-12-31'),
-        'Pre-COVID': ('2018-01-01', '2020-02-01'),
-        'COVID-Crise': ('2020-02-01', '2020-04-01'),
-        'COVID-Recovery': ('2020-04-01', '2021-12-31'),
-        'Bear Market 2022': ('2022-01-01', '2022-12-31'),
-        'Bull 2023-2024': ('2023-01-01', '2024-12-31'),
-    }
-    
-    us_results = test_market(us_prices, us_name, config, us_periods)
-    if len(us_results) > 0:
-        all_results.append(us_results)
-    
     # ============================================================
-    # 2. TEST EUROPE (2010-2024)
+    # ETUDE: US (2018-2024), Europe (2010-2024), Europe etendue (2007-2024)
     # ============================================================
-    eu_prices, eu_name = load_eu_data()
-    
-    if eu_prices is not None:
-        eu_periods = {
-            'Complete': (eu_prices.index[0].strftime('%Y-%m-%d'), eu_prices.index[-1].strftime('%Y-%m-%d')),
+    if not os.path.exists('data/stock_prices.csv'):
+        load_us_data()
+    markets = [
+        ("US S&P 500", Dataset('data/stock_prices.csv'), {
+            'Complete': ('2018-01-01', '2024-12-31'),
+            'Pre-COVID': ('2018-01-01', '2020-02-01'),
+            'COVID-Crise': ('2020-02-01', '2020-04-01'),
+            'COVID-Recovery': ('2020-04-01', '2021-12-31'),
+            'Bear Market 2022': ('2022-01-01', '2022-12-31'),
+            'Bull 2023-2024': ('2023-01-01', '2024-12-31'),
+        }),
+        # Au moins 80% de donnees, trous combles
+        ("Europe EURO STOXX", Dataset('data/european_prices_clean.csv', min_coverage=0.8, fill=True), {
+            'Complete': (None, None),
             '2010-2015': ('2010-01-01', '2015-12-31'),
             '2015-2020': ('2015-01-01', '2020-12-31'),
             '2020-2024': ('2020-01-01', '2024-12-31'),
-        }
-        
-        eu_results = test_market(eu_prices, eu_name, config, eu_periods)
-        if len(eu_results) > 0:
-            all_results.append(eu_results)
-    
-    # ============================================================
-    # 3. TEST EUROPE ETENDU (2007-2024) - Crise 2008
-    # ============================================================
-    eu_ext_prices, eu_ext_name = load_eu_extended_data()
-    
-    if eu_ext_prices is not None and len(eu_ext_prices) > 0:
-        start_str = eu_ext_prices.index[0].strftime('%Y-%m-%d') if hasattr(eu_ext_prices.index[0], 'strftime') else str(eu_ext_prices.index[0])[:10]
-        end_str = eu_ext_prices.index[-1].strftime('%Y-%m-%d') if hasattr(eu_ext_prices.index[-1], 'strftime') else str(eu_ext_prices.index[-1])[:10]
-        eu_ext_periods = {
-            'Complete': (start_str, end_str),
+        }),
+        # Crise 2008
+        ("Europe 2007-2024", Dataset('data/european_prices_2007_2024.csv', min_coverage=0.7, fill=True), {
+            'Complete': (None, None),
             'Financial Crisis': ('2007-01-01', '2009-12-31'),
             'Post-Crisis': ('2010-01-01', '2014-12-31'),
             'Recent': ('2015-01-01', '2024-12-31'),
-        }
-        
-        eu_ext_results = test_market(eu_ext_prices, eu_ext_name, config, eu_ext_periods)
-        if len(eu_ext_results) > 0:
-            all_results.append(eu_ext_results)
+        }),
+    ]
+    jobs = [Job(market, period, start, end, dataset, config, min_days=50)
+            for market, dataset, periods in markets if os.path.exists(dataset.path)
+            for period, (start, end) in periods.items()]
+    results = run_jobs(jobs)
+
+    all_results = []
+    if len(results) > 0:
+        all_results.append(pd.DataFrame({
+            'period': results['period'], 'market': results['market'],
+            'start': results['start'], 'end': results['end'], 'days': results['days'],
+            'strat_return': results['strategy_return_mean'], 'strat_sharpe': results['strategy_sharpe_mean'],
+            'strat_dd': results['strategy_dd_mean'], 'strat_vol': results['strategy_vol_mean'],
+            'bench_return': results['benchmark_return'], 'bench_sharpe': results['benchmark_sharpe'],
+            'bench_dd': results['benchmark_max_dd'], 'outperformance': results['outperformance'],
+            'sharpe_diff': results['strategy_sharpe_mean'] - results['benchmark_sharpe'],
+            'dd_diff': results['strategy_dd_mean'] - results['benchmark_max_dd']
+        }))
     
     # ============================================================
     # RESUME GLOBAL
@@ -12,16 +12,24 @@ import warnings
 warnings.filterwarnings('ignore')
 
 from data.download_data import get_sp500_tickers, download_stock_data
-from data.download_european_data import get_eurostoxx50_tickers, get_extended_period_data
+from data.download_european_data import get_extended_period_data
+from strategies.orchestrator import Dataset, Job, run_jobs
 from strategies.random_stoploss import RandomStopLossStrategy, StrategyConfig, run_monte_carlo_simulation
 
 
+# Colonnes de data/multi_market_results.csv
+RESULT_COLUMNS = ['period', 'start', 'end', 'days', 'strategy_return_mean', 'strategy_return_std',
+                  'strategy_sharpe_mean', 'strategy_dd_mean', 'benchmark_return', 'benchmark_max_dd',
+                  'outperformance', 'win_rate_vs_benchmark', 'market']
+
+
 def test_single_period(prices, period_name, start_date, end_date, config, n_simulations=30):
     """
     Teste la strategie sur une periode specifique
+    prices peut etre un DataFrame ou un PriceStore (seule la periode est lue)
     """
-    # Filtrer les donnees pour la periode
-    period_prices = prices.loc[start_date:end_date]
+    # Filtrer les donnees pour la periode (sans les seances sans aucun prix)
+    period_prices = prices.loc[start_date:end_date].dropna(axis=0, how='all')
     
     if len(period_prices) < 100:
         print(f"  Periode trop courte: {len(period_prices)} jours")
@@ -110,73 +118,52 @@ def compare_markets():
         lookback_months=6,
         stop_loss_threshold=-0.10,
         init_cash=100_000,
-        seed=None
+        seed=None,
+        # Ancien calendrier tant que les resultats publies n'ont pas ete recalcules
+        # (donnees europeennes a re-telecharger), voir strategies/trading_calendar.py
+        calendar='legacy'
     )
     
-    all_results = []
-    
-    # 1. Marche Americain - Periode recente (2018-2024)
-    print("\n[1/4] Chargement des donnees US (2018-2024)...")
-    try:
-        us_tickers = get_sp500_tickers(100)
-        us_prices = download_stock_data(us_tickers, start_date='2018-01-01', end_date='2024-12-31')
-        
-        us_periods = {
+    # Etude declarative: (marche, periode, donnees) -> un job par periode
+    us_data = Dataset('data/stock_prices.csv')
+    if not os.path.exists(us_data.path):
+        download_stock_data(get_sp500_tickers(100), start_date='2018-01-01', end_date='2024-12-31')
+    # Utiliser les donnees europeennes deja telechargees
+    eu_file = 'data/european_prices_clean.csv'
+    if not os.path.exists(eu_file):
+        eu_file = 'data/european_prices_2007_2024.csv'
+    eu_data = Dataset(eu_file)
+
+    markets = [
+        ('US', us_data, {
             'US 2018-2024 (Bull)': ('2018-01-01', '2024-12-31'),
             'US COVID Crash': ('2020-02-01', '2020-05-01'),
             'US Post-COVID': ('2020-06-01', '2021-12-31'),
             'US 2022 Bear': ('2022-01-01', '2022-12-31'),
-        }
-        
-        us_results = test_market(us_prices, "US S&P 500", config, us_periods)
-        us_results['market'] = 'US'
-        all_results.append(us_results)
-    except Exception as e:
-        print(f"Erreur US: {e}")
-    
-    # 2. Marche Europeen - Periode etendue (2007-2024)
-    print("\n[2/4] Chargement des donnees Europe (2007-2024)...")
-    try:
-        eu_tickers = get_eurostoxx50_tickers()
-        # Utiliser les donnees europeennes deja telechargees
-        eu_prices = pd.read_csv('data/european_prices_clean.csv', index_col=0, parse_dates=True)
-        
-        eu_periods = {
+        }),
+        ('Europe', eu_data, {
             'EU 2007-2024': ('2007-01-01', '2024-12-31'),
             'EU Crise 2008': ('2007-10-01', '2009-03-01'),
             'EU Dette 2010-2012': ('2010-01-01', '2012-12-31'),
             'EU COVID': ('2020-02-01', '2020-05-01'),
             'EU 2022 Energy': ('2022-01-01', '2022-12-31'),
-        }
-        
-        eu_results = test_market(eu_prices, "Europe EURO STOXX 50", config, eu_periods)
-        eu_results['market'] = 'Europe'
-        all_results.append(eu_results)
-    except Exception as e:
-        print(f"Erreur Europe: {e}")
-    
-    # 3. Marche US - Periode etendue (2007-2024) pour comparaison
-    print("\n[3/4] Chargement des donnees US etendues (2007-2024)...")
-    try:
-        # Pour US, utiliser la periode etendue disponible dans le cache
-        us_prices_extended = download_stock_data(us_tickers, start_date='2018-01-01', end_date='2024-12-31')
-        
-        us_ext_periods = {
+        }),
+        # Pour US, la periode etendue disponible dans le cache (meme store)
+        ('US Extended', us_data, {
             'US 2007-2024': ('2007-01-01', '2024-12-31'),
             'US Crise 2008': ('2007-10-01', '2009-03-01'),
             'US Dette 2011': ('2011-05-01', '2011-12-01'),
             'US COVID': ('2020-02-01', '2020-05-01'),
-        }
-        
-        us_ext_results = test_market(us_prices_extended, "US S&P 500 (Etendu)", config, us_ext_periods)
-        us_ext_results['market'] = 'US Extended'
-        all_results.append(us_ext_results)
-    except Exception as e:
-        print(f"Erreur US etendu: {e}")
+        }),
+    ]
+    jobs = [Job(market, period, start, end, dataset, config, n_simulations=30)
+            for market, dataset, periods in markets for period, (start, end) in periods.items()]
+
+    # Jobs repartis sur un pool de processus, une table pour tous les marches
+    results = run_jobs(jobs)
     
-    # Combiner tous les resultats
-    if len(all_results) > 0:
-        combined_results = pd.concat(all_results, ignore_index=True)
+    if len(results) > 0:
+        combined_results = results[RESULT_COLUMNS]
         combined_results.to_csv('data/multi_market_results.csv', index=False)
         
         # Afficher le tableau comparatif
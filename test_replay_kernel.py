@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Verification du rejeu du journal d'ordres: noyau sequentiel (strategies/kernels.py)
+contre le rejeu vectorise NumPy (strategies/trade_log.py), sur les memes graines
+
+Le noyau est appele tel quel (Python pur, sans Numba) et par replay_trade_log
+(engine='kernel': compile si Numba est installe, Python sinon).
+
+    python test_replay_kernel.py
+    python -m pytest test_replay_kernel.py
+"""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+import pandas as pd
+
+from data.synthetic_data import SyntheticConfig, generate_synthetic_prices
+from strategies.kernels import replay_kernel
+from strategies.random_stoploss import StrategyConfig, RandomStopLossStrategy
+from strategies.sizing import Sizer
+from strategies.trade_log import TradeLog, mark_prices, replay_trade_log
+
+
+RATES = [0.0, 0.001, 0.005]
+SEEDS = [0, 1, 2]
+SIZERS = [Sizer('integer'), Sizer('fractional'), Sizer('lots')]
+
+
+def synthetic_logs():
+    """Journaux de la strategie aleatoire sur un univers synthetique (une graine par journal)"""
+    prices = generate_synthetic_prices(SyntheticConfig(n_tickers=120, n_years=6, seed=1))
+    for seed in SEEDS:
+        np.random.seed(seed)
+        log, values = RandomStopLossStrategy(StrategyConfig()).record_trade_log(prices)
+        yield seed, prices, log, values
+
+
+def python_kernel_replay(log, values, rate, check_cash, lots):
+    """Noyau Python pur (sans compilation) sur le journal aplati"""
+    rows, sell_ptr, sell_idx, buy_ptr, buy_idx = log.flatten()
+    values = np.ascontiguousarray(values, dtype=float)
+    return replay_kernel(values, mark_prices(values, rows), rows, sell_ptr, sell_idx, buy_ptr, buy_idx,
+                         100_000.0, float(rate), np.asarray(lots, dtype=float), check_cash)
+
+
+def test_kernel_matches_numpy():
+    for seed, prices, log, values in synthetic_logs():
+        for sizer in SIZERS:
+            lots = sizer.lot_array(prices.columns)
+            for check_cash in [False, True]:
+                reference = replay_trade_log(log, values, RATES, 100_000, check_cash, sizer, lots, engine='numpy')
+                kernel = replay_trade_log(log, values, RATES, 100_000, check_cash, sizer, lots, engine='kernel')
+                for key in ['values_before', 'values_after', 'total_fees', 'buy_volume', 'sell_volume']:
+                    np.testing.assert_allclose(kernel[key], reference[key], rtol=1e-9)
+                np.testing.assert_array_equal(kernel['n_transactions'], reference['n_transactions'])
+
+                for f, rate in enumerate(RATES):
+                    before, after, _, bought, _, totals = python_kernel_replay(log, values, rate, check_cash, lots)
+                    np.testing.assert_allclose(before, reference['values_before'][:, f], rtol=1e-9)
+                    np.testing.assert_allclose(after, reference['values_after'][:, f], rtol=1e-9)
+                    np.testing.assert_allclose(totals[0], reference['total_fees'][f], rtol=1e-9)
+                    assert int(totals[3]) == reference['n_transactions'][f]
+
+
+def test_gap_keeps_last_price():
+    """Une position sans cotation un jour de rebalancement garde son dernier prix (pas 0)"""
+    index = pd.bdate_range('2020-01-01', periods=6)
+    values = np.array([[10.0, 20.0], [11.0, 20.0], [np.nan, 21.0], [np.nan, 22.0], [12.0, 22.0], [13.0, 23.0]])
+    log = TradeLog()
+    log.record(index[0], 0, buys=[0, 1])
+    log.record(index[2], 2)
+    log.record(index[3], 3, sells=[0])
+    log.record(index[5], 5)
+    for engine in ['numpy', 'kernel']:
+        replay = replay_trade_log(log, values, [0.0], 1_000, sizer=Sizer('fractional'), engine=engine)
+        held = replay['values_before'][:, 0]
+        assert np.all(held > 0.9 * 1_000), (engine, held)
+        # Vente au dernier prix connu (11) le jour sans cotation
+        np.testing.assert_allclose(replay['sell_volume'][0], 500 / 10 * 11, rtol=1e-6)
+
+
+def main():
+    print("="*70)
+    print("TEST REJEU: NOYAU / NUMPY")
+    print("="*70)
+    test_kernel_matches_numpy()
+    print(f"  Parite noyau / NumPy: OK ({len(SEEDS)} graines, {len(SIZERS)} dimensionnements, "
+          f"{len(RATES)} niveaux de frais)")
+    test_gap_keeps_last_price()
+    print("  Valorisation au dernier prix connu: OK")
+
+
+if __name__ == "__main__":
+    main()
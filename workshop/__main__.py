@@ -0,0 +1,63 @@
+"""
+Point d'entree unique des experiences
+
+    python -m workshop run experiments/multi_market.yaml [autre.yaml ...]
+    python -m workshop run experiments/momentum_grid.yaml --workers 4
+    python -m workshop run experiments/multi_market.yaml --dry-run
+
+Toutes les experiences d'une invocation partagent un seul processus
+principal (imports, stores convertis) et un seul pool de processus: les
+jeux de donnees ouverts par un processus du pool servent a toutes les
+etapes. --workers 1 execute tout dans le processus principal.
+"""
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from workshop.experiment import experiment_steps, load_experiment, run_experiment
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+USAGE = "Usage: python -m workshop run <experience.yaml> [...] [--workers N] [--dry-run]"
+
+
+def main(args):
+    if not args or args[0] != 'run':
+        print(USAGE)
+        return 1
+    args = args[1:]
+    workers = os.cpu_count() or 1
+    if '--workers' in args:
+        position = args.index('--workers')
+        workers = int(args[position + 1])
+        del args[position:position + 2]
+    # Chemins relatifs au repertoire courant, execution depuis la racine du projet
+    paths = [os.path.abspath(a) for a in args if not a.startswith('--')]
+    if not paths:
+        print(USAGE)
+        return 1
+    os.chdir(ROOT)
+
+    if '--dry-run' in args:
+        for path in paths:
+            for name, jobs, output in experiment_steps(load_experiment(path)):
+                print(f"[{os.path.basename(path)}] {name}: {len(jobs)} jobs -> {output or '(non sauvegarde)'}")
+                for job in jobs:
+                    print(f"  {job.market} | {job.period} | {job.start or 'debut'} -> {job.end or 'fin'}"
+                          f"{' | ' + str(job.tags) if job.tags else ''}")
+        return 0
+
+    if workers <= 1:
+        for path in paths:
+            run_experiment(path, max_workers=1)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for path in paths:
+                run_experiment(path, pool=pool)
+    print(f"\n[OK] {len(paths)} experience(s) executee(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,144 @@
+"""
+Experiences declaratives: donnees, strategies et etapes decrites dans un fichier
+
+Format (YAML, ou JSON si l'extension est .json):
+
+    datasets:
+      us: {path: data/stock_prices.csv}
+      eu: {path: data/european_prices_2007_2024.csv, min_coverage: 0.7}  # prix nettoyes (fill: false = bruts)
+    strategies:
+      random: {type: random_stoploss, n_stocks: 20, stop_loss_threshold: -0.10}
+      momentum: {type: momentum, lookback_months: 12, cost_model: {type: FlatFee, rate: 0.001}}
+    steps:
+      - name: multi_marches                  # etude: marches x periodes
+        kind: study
+        strategy: random
+        n_simulations: 30
+        output: data/multi_market_results.csv
+        markets:
+          US: {dataset: us, periods: {'US 2022 Bear': [2022-01-01, 2022-12-31]}}
+      - name: grille_momentum                # grille: produit des parametres sur une periode
+        kind: grid
+        strategy: momentum
+        dataset: us
+        period: [2018-01-01, 2024-12-31]     # ou absent: toutes les donnees
+        grid: {n_stocks: [10, 20], lookback_months: [6, 12]}
+
+Chaque etape devient une liste de Job executee par strategies/orchestrator.py.
+cost_model accepte un taux (frais proportionnels), une classe de
+strategies/cost_models.py ({type: ..., parametres}) ou une liste de modeles
+(CompositeCost); sizer accepte les parametres de strategies/sizing.Sizer.
+"""
+import itertools
+import json
+import os
+from concurrent.futures import Executor
+from dataclasses import replace
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from strategies import cost_models
+from strategies.momentum import MomentumConfig
+from strategies.orchestrator import Dataset, Job, run_jobs
+from strategies.random_stoploss import StrategyConfig
+from strategies.sizing import Sizer
+
+
+STRATEGIES = {'random_stoploss': StrategyConfig, 'momentum': MomentumConfig}
+STEP_KINDS = ('study', 'grid')
+
+
+def load_experiment(path: str) -> Dict:
+    """Lit un fichier d'experience (YAML, ou JSON)"""
+    with open(path) as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("Les experiences YAML necessitent PyYAML (pip install pyyaml), "
+                              "ou utiliser un fichier .json") from None
+        return yaml.safe_load(f)
+
+
+def build_cost_model(spec):
+    """Modele de frais: taux, {type: classe, parametres} ou liste de modeles"""
+    if spec is None or isinstance(spec, (int, float)):
+        return cost_models.as_cost_model(spec) if spec else None
+    if isinstance(spec, list):
+        return cost_models.CompositeCost([build_cost_model(s) for s in spec])
+    params = dict(spec)
+    model = getattr(cost_models, params.pop('type'), None)
+    if not (isinstance(model, type) and issubclass(model, cost_models.CostModel)):
+        raise ValueError(f"Modele de frais inconnu: {spec['type']}")
+    return model(**params)
+
+
+def build_config(spec: Dict):
+    """Configuration de strategie depuis {type: random_stoploss|momentum, parametres}"""
+    params = dict(spec)
+    kind = params.pop('type', 'random_stoploss')
+    if kind not in STRATEGIES:
+        raise ValueError(f"Strategie inconnue: {kind} (disponibles: {', '.join(STRATEGIES)})")
+    if 'cost_model' in params:
+        params['cost_model'] = build_cost_model(params['cost_model'])
+    if params.get('sizer') is not None:
+        params['sizer'] = Sizer(**params['sizer'])
+    return STRATEGIES[kind](**params)
+
+
+def _date(value):
+    """Borne de periode en texte (YAML lit les dates non quotees comme des dates)"""
+    return None if value is None else str(value)
+
+
+def step_jobs(step: Dict, datasets: Dict[str, Dataset], strategies: Dict[str, object]) -> List[Job]:
+    """Jobs d'une etape"""
+    kind = step.get('kind', 'study')
+    strategy = step['strategy']
+    config = strategies[strategy] if isinstance(strategy, str) else build_config(strategy)
+    options = {'n_simulations': step.get('n_simulations', 30), 'min_days': step.get('min_days', 100)}
+
+    if kind == 'study':
+        return [Job(market, period, _date(start), _date(end), datasets[market_spec['dataset']], config, **options)
+                for market, market_spec in step['markets'].items()
+                for period, (start, end) in market_spec['periods'].items()]
+
+    if kind == 'grid':
+        start, end = step.get('period') or (None, None)
+        names = list(step['grid'])
+        jobs = []
+        for values in itertools.product(*(step['grid'][name] for name in names)):
+            params = dict(zip(names, values))
+            jobs.append(Job(step['dataset'], step.get('name', 'grid'), _date(start), _date(end),
+                            datasets[step['dataset']], replace(config, **params), tags=params, **options))
+        return jobs
+
+    raise ValueError(f"Type d'etape inconnu: {kind} (disponibles: {', '.join(STEP_KINDS)})")
+
+
+def experiment_steps(experiment: Dict) -> List[Tuple[str, List[Job], Optional[str]]]:
+    """Etapes resolues: [(nom, jobs, fichier de sortie)]"""
+    datasets = {name: Dataset(**spec) for name, spec in experiment.get('datasets', {}).items()}
+    strategies = {name: build_config(spec) for name, spec in experiment.get('strategies', {}).items()}
+    return [(step.get('name', f"etape_{i + 1}"), step_jobs(step, datasets, strategies), step.get('output'))
+            for i, step in enumerate(experiment['steps'])]
+
+
+def run_experiment(path: str, max_workers: int = None, pool: Executor = None) -> Dict[str, pd.DataFrame]:
+    """
+    Execute toutes les etapes d'un fichier d'experience
+
+    Les etapes partagent le pool (et donc les jeux de donnees deja ouverts par
+    ses processus) et les stores convertis.
+
+    Returns:
+        Dict {nom de l'etape: table de resultats}
+    """
+    experiment = load_experiment(path)
+    results = {}
+    for name, jobs, output in experiment_steps(experiment):
+        print(f"\n[{os.path.basename(path)}] {name}: {len(jobs)} jobs")
+        results[name] = run_jobs(jobs, max_workers=max_workers, output=output, pool=pool)
+    return results